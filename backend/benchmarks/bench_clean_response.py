@@ -0,0 +1,173 @@
+"""
+clean_response benchmark and golden-output check.
+
+Replays a corpus of raw model outputs through prompts.clean_response for every
+reply kind and checks each result against clean_response_golden.json, then times
+the current implementation against the legacy one (a frozen copy of the original
+sequential re.sub version kept below). A rule change that alters output fails the
+check; regenerate the corpus only when the change is intended:
+    python benchmarks/bench_clean_response.py
+    python benchmarks/bench_clean_response.py --regenerate
+Run from backend/.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompts import clean_response  # noqa: E402
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "clean_response_golden.json")
+
+KINDS = [
+    {"is_greeting": False, "is_first_response": False, "is_feedback": False},
+    {"is_greeting": True, "is_first_response": False, "is_feedback": False},
+    {"is_greeting": False, "is_first_response": True, "is_feedback": False},
+    {"is_greeting": False, "is_first_response": False, "is_feedback": True},
+]
+
+SAMPLES = [
+    "Hi Jane, nice to meet you! How's your day going?",
+    "That sounds like solid work! How did you test the Python service you built for that project?",
+    "Thanks so much for chatting today! Do you have any questions about the role or the team?",
+    "We work in two-week agile sprints with a lot of ownership. Any other questions?",
+    "Wow, that's really impressive work on the dashboard! What was the hardest bug you fixed?",
+    "Great question! Let's dive into your experience at Hexaware. What did you build there?",
+    "I'm an AI language model, but I can help.\nWhat did you do at Hexaware?",
+    "<think>pick a topic</think>How did you use Python at Hexaware?",
+    "[Recruiter] Here's my attempt: How did you handle scaling the payments service?",
+    "Output: What trade-offs did you consider when migrating to Kubernetes?",
+    "(Recruiter response, technical phase) How did you use SQL in that project?",
+    "Haha, that's super cool, like a champ! What did your team think of it?",
+    "!!! How would you explain a hash map to a new engineer?",
+    "Hello! I'm excited to be here for this interview today. Tell me about yourself",
+    "That's fascinating stuff. Let's explore your leadership. How did you lead the migration?",
+    "Note: keep it short. Can you walk me through the realtime analytics dashboard? It sounds great.",
+    "This is quite interesting! Mega work. Ultra fast too. Why did you choose React?",
+    "Let’s jump into the coding part. How would you reverse a linked list in Python, step by step, "
+    "explaining your choice of pointers, edge cases, and complexity, including what happens with empty "
+    "lists and single nodes, and how you would test it?",
+    "I’m with you today for the interview. What drew you to this role",
+    "Nice! What did you learn. What would you do differently? Anything else?",
+    "   Thanks for a great conversation! Strengths: you explained your Python projects clearly and tied "
+    "them to measurable results. Improvements: structure problem-solving answers step by step. Score: 7/10.",
+    "",
+    "?",
+    "That's great.",
+    "Here is the output (interview phase): [draft] <b>What</b> did you build?",
+    "Let's that sounds like magic wizardry, just-works. How did it scale?",
+    "That’s amazing! That’s great! How did you measure the results?",
+    "One. Two. Three. Four",
+    "Could you tell me more about your experience with AWS, especially Lambda and DynamoDB, and how you "
+    "designed the data model for high write throughput across regions with failover?",
+    "Rock star effort!\n\nHow did you coordinate with QA?\n\nThanks!",
+    "Wow that's İmpressive! ſuper job. Thıs is great. Let'ſ chat. What did you build?",
+]
+
+FRAGMENTS = [
+    "Wow, that's really impressive!", "Great question!", "Let's dive into", "Hello!", "haha", "lol",
+    "super", "That’s interesting.", "I'm excited about this interview today.", "<i>", "</i>", "[note]",
+    "(recruiter aside)", "Output:", "Note:", "Here's the response:", "How did you test it?",
+    "What did you build at Hexaware?", "Tell me about your Python work.", "We use agile sprints.",
+    "Any other questions?", "Nice work!", "...", "!!", "\n", "  ", "I’m an AI", "magic", "Why?",
+    "This is so great and fun.", "Let’s explore", "the team", "with React and SQL", "step by step",
+]
+
+def legacy_strip_phrases(text):
+    text = re.sub(r"(?i)^.*\bI['’]?m an AI\b.*", "", text)
+    text = re.sub(r"<[^>]+>", "", text)
+    text = re.sub(r"\[.*?\]", "", text)
+    text = re.sub(r"(?i)(here is the output|output:|here's (my|the) (attempt|response|start)|note:).*?(?=\w|$)", "", text)
+    text = re.sub(r"(?i)\(.*?(recruiter|interview|response|phase).*?\)", "", text)
+    text = re.sub(r"(?i)(haha|lol|like a champ|rock star|super|mega|ultra|wizardry|magic|just-works)", "", text)
+    text = re.sub(r"^[^\w\s]+", "", text)
+    text = re.sub(r"(?i)(great question|let['’]?s get started|excited to (chat|be here)|i['’]?m (with you|excited|here).*?(today|interview)|hello)", "", text)
+    text = re.sub(r"(?i)(wow|that['’]?s|this is|I['’]?m) (really |so |quite )?(amazing|impressive|fascinating|interesting|great)[^!.]*[!.]", "", text)
+    text = re.sub(r"(?i)let['’]?s (dive into|jump into|explore|unpack|that |the )?", "", text)
+    return text
+
+def legacy_clean_response(text, is_greeting=False, is_first_response=False, is_feedback=False):
+    text = legacy_strip_phrases(text.strip())
+    if not is_greeting and not is_first_response and not is_feedback and not text.endswith("?"):
+        text = f"{text}?"
+    if not is_greeting and not is_first_response and not is_feedback:
+        sentences = re.split(r'(?<=[.!?])\s+', text)
+        words = text.split()
+        if len(words) > 25:
+            text = " ".join(words[:25]) + ("?" if "?" not in text else "")
+        if len(sentences) > 1:
+            question_indices = [i for i, s in enumerate(sentences) if "?" in s]
+            if question_indices:
+                text = sentences[question_indices[0]]
+            else:
+                text = sentences[0]
+    return re.sub(r'\s+', ' ', text).strip()
+
+def corpus_inputs(generated, seed=7):
+    rng = random.Random(seed)
+    inputs = list(SAMPLES)
+    for _ in range(generated):
+        inputs.append(" ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(1, 12))))
+    return inputs
+
+def regenerate(generated):
+    corpus = [
+        dict(kind, text=text, expected=legacy_clean_response(text, **kind))
+        for text in corpus_inputs(generated)
+        for kind in KINDS
+    ]
+    with open(GOLDEN_PATH, "w", encoding="utf-8") as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=0)
+    print(f"Wrote {len(corpus)} cases to {GOLDEN_PATH}")
+
+def check(corpus):
+    failures = 0
+    for case in corpus:
+        kind = {key: case[key] for key in ("is_greeting", "is_first_response", "is_feedback")}
+        actual = clean_response(case["text"], **kind)
+        if actual != case["expected"]:
+            failures += 1
+            if failures <= 10:
+                print(f"MISMATCH {kind}\n  input:    {case['text']!r}\n  expected: {case['expected']!r}\n  actual:   {actual!r}")
+    print(f"golden check: {len(corpus) - failures}/{len(corpus)} match")
+    return failures
+
+def time_per_call(fn, cases, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        for case in cases:
+            fn(case["text"], case["is_greeting"], case["is_first_response"], case["is_feedback"])
+    return (time.perf_counter() - start) / (repeats * len(cases)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--regenerate", action="store_true", help="rewrite the golden corpus from the legacy implementation")
+    parser.add_argument("--generated", type=int, default=150, help="random fragment mixes added to the hand-written samples")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    if args.regenerate:
+        regenerate(args.generated)
+        return
+
+    with open(GOLDEN_PATH, encoding="utf-8") as f:
+        corpus = json.load(f)
+    failures = check(corpus)
+
+    import logging
+    logging.disable(logging.DEBUG)  # clean_response logs every raw reply at DEBUG
+    # The full corpus is dense with phrases the rules remove; typical replies have none
+    typical = [case for case in corpus if case["text"] in SAMPLES[:4]]
+    for label, cases in (("golden corpus", corpus), ("typical replies", typical)):
+        legacy_us = time_per_call(legacy_clean_response, cases, args.repeats)
+        current_us = time_per_call(clean_response, cases, args.repeats)
+        print(f"{label}: legacy {legacy_us:6.1f} us/call, current {current_us:6.1f} us/call ({legacy_us / current_us:.2f}x)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Concurrent-interview benchmark for the async DeepSeek client against the fake server.
+
+Each simulated interview makes a greeting call followed by several question calls.
+With the async client they overlap on one event loop; wall time should stay close to
+one interview's duration until LLM_MAX_CONCURRENCY is reached. Run from backend/:
+    python benchmarks/bench_concurrent_interviews.py --interviews 50 --turns 5
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_deepseek  # noqa: E402
+
+async def interview(index, turns, prompts, in_flight, peak):
+    start = time.perf_counter()
+    in_flight[0] += 1
+    peak[0] = max(peak[0], in_flight[0])
+    greeting = await prompts.generate_greeting(f"Candidate{index}")
+    for _ in range(turns):
+        await prompts.run_deepseek_prompt("As the recruiter, ask a follow-up question about their Python project.")
+    in_flight[0] -= 1
+    return greeting, time.perf_counter() - start
+
+async def run(args):
+    # Imported after the environment points the client at the fake server
+    import llm
+    import prompts
+
+    in_flight, peak = [0], [0]
+    start = time.perf_counter()
+    results = await asyncio.gather(*(interview(i, args.turns, prompts, in_flight, peak) for i in range(args.interviews)))
+    wall = time.perf_counter() - start
+    await llm.close_client()
+
+    durations = sorted(elapsed for _, elapsed in results)
+    calls = args.interviews * (args.turns + 1)
+    print(f"interviews={args.interviews} turns={args.turns} llm_calls={calls} max_concurrency={llm.LLM_MAX_CONCURRENCY}")
+    print(f"wall={wall:.2f}s serial_estimate={sum(durations):.2f}s overlap={sum(durations) / wall:.1f}x "
+          f"peak_interviews_in_flight={peak[0]}")
+    print(f"interview duration p50={durations[len(durations) // 2]:.2f}s max={durations[-1]:.2f}s "
+          f"calls/s={calls / wall:.1f}")
+    print(f"sample greeting: {results[0][0]}")
+    print(f"llm stats: {llm.get_llm_stats()}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--ttft-ms", type=float, default=200.0)
+    parser.add_argument("--tokens-per-second", type=float, default=100.0)
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    fake_deepseek.start_in_thread(args.port, args.ttft_ms, args.tokens_per_second)
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{args.port}"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "fake")
+    if args.max_concurrency:
+        os.environ["LLM_MAX_CONCURRENCY"] = str(args.max_concurrency)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Embedding micro-batching benchmark: batch-of-one encode calls vs the shared batcher.
+
+Simulates many interviews each issuing single-query encodes (as log_message and
+search_documents do) from their own threads. Run from backend/:
+    python benchmarks/bench_embedding_batching.py --clients 32 --queries 20 --wait-ms 2
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+from embedding_batcher import EmbeddingBatcher  # noqa: E402
+
+def run_clients(encode, clients, queries):
+    def client(client_id):
+        latencies = []
+        for i in range(queries):
+            # Unique text per call so nothing is served by the embedding cache
+            text = f"client {client_id} answer {i}: I optimized the Python data pipeline at Hexaware"
+            start = time.perf_counter()
+            encode([text])
+            latencies.append(time.perf_counter() - start)
+        return latencies
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = [lat for result in pool.map(client, range(clients)) for lat in result]
+    wall = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "throughput_qps": len(latencies) / wall,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--wait-ms", type=float, default=2.0)
+    parser.add_argument("--max-batch", type=int, default=64)
+    args = parser.parse_args()
+
+    model = utils.get_model()
+    model.encode(["warmup"], convert_to_numpy=True)
+
+    direct = run_clients(lambda texts: model.encode(texts, convert_to_numpy=True), args.clients, args.queries)
+    batcher = EmbeddingBatcher(model, max_batch_size=args.max_batch, max_wait_ms=args.wait_ms)
+    batched = run_clients(batcher.encode, args.clients, args.queries)
+    stats = batcher.stats()
+    batcher.close()
+
+    print(f"clients={args.clients} queries/client={args.queries} wait_ms={args.wait_ms} max_batch={args.max_batch}")
+    print(f"{'path':>8} {'qps':>9} {'p50_ms':>8} {'p95_ms':>8}")
+    for name, result in (("direct", direct), ("batched", batched)):
+        print(f"{name:>8} {result['throughput_qps']:>9.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f}")
+    print(f"batcher: avg_batch={stats['avg_batch_size']} encoder_items/s={stats['items_per_second']} "
+          f"queue_wait p50={stats['queue_wait_ms_p50']}ms p95={stats['queue_wait_ms_p95']}ms")
+
+if __name__ == "__main__":
+    main()
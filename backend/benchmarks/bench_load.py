@@ -0,0 +1,225 @@
+"""
+End-to-end load test: scripted interviews against the FastAPI app and the fake LLM.
+
+Starts the fake DeepSeek server and the backend app (uvicorn, in this process) and
+replays complete interviews over HTTP at a fixed concurrency: resume PDF upload to
+/start-interview, /next-question through every phase and the closing Q&A, then
+/feedback. Reports p50/p95/p99 latency per endpoint, interview and request
+throughput, event-loop lag of the app's loop and peak RSS. The app, the fake LLM and
+the load generator share this process, so RSS includes the harness (reported as a
+baseline taken before the app starts). Run from backend/:
+    python benchmarks/bench_load.py --interviews 40 --concurrency 10
+    python benchmarks/bench_load.py --interviews 40 --concurrency 10 --stream --ttft-ms 400
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # noqa: E402
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import fake_deepseek  # noqa: E402
+
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build Python services on AWS. You will design APIs with "
+    "FastAPI, model data in PostgreSQL, and work in an agile team with code review and on-call. "
+    "Experience with testing, CI/CD and distributed systems is a plus."
+)
+
+# One answer per phase, a candidate question in the closing Q&A, then the sign-off
+ANSWERS = [
+    "I'm doing well, thanks for asking!",
+    "At Hexaware I built a payments API in FastAPI that handled about a thousand requests per second.",
+    "I also led a realtime analytics dashboard in React backed by a Kafka pipeline.",
+    "I use Python daily, mostly asyncio services with SQLAlchemy and pytest.",
+    "I set up our AWS infrastructure with Terraform, including Lambda and DynamoDB.",
+    "The hardest problem was a race condition in our retry logic; I reproduced it with a stress test.",
+    "I would use a hash map from value to index and scan the list once, so it is linear time.",
+    "When QA and product disagreed on scope I set up a short call and we agreed on a phased release.",
+    "I mentored two junior engineers through their first on-call rotations.",
+    "I like that the role owns services end to end and the team values testing.",
+    "It would be a great next step for me.",
+    "What is the team like?",
+    "no",
+]
+
+def make_resume(index):
+    """A one-page text PDF; the index varies the bytes so the resume cache does not hit."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), (
+        f"Candidate {index}. Software engineer at Hexaware for {index % 7 + 2} years. "
+        "Built a Python FastAPI payments service handling 1k requests per second. "
+        "Led a migration to Kubernetes and Terraform on AWS. "
+        "Projects: realtime analytics dashboard in React with Kafka; ML feature store in Spark. "
+        "Skills: Python, SQL, AWS, Docker, pytest. Mentored junior engineers."
+    ))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.first_event = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, endpoint, elapsed, first_event=None, ok=True):
+        self.latencies[endpoint].append(elapsed)
+        if first_event is not None:
+            self.first_event[endpoint].append(first_event)
+        if not ok:
+            self.errors[endpoint] += 1
+
+async def post(client, recorder, endpoint, stream, **kwargs):
+    """POST to endpoint (or its /stream variant) and return the final JSON reply."""
+    path = f"{endpoint}/stream" if stream else endpoint
+    start = time.perf_counter()
+    if not stream:
+        response = await client.post(path, **kwargs)
+        recorder.add(path, time.perf_counter() - start, ok=response.status_code == 200)
+        return response.json() if response.status_code == 200 else None
+
+    first_event, final = None, None
+    async with client.stream("POST", path, **kwargs) as response:
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            final = line
+    ok = response.status_code == 200 and final is not None
+    recorder.add(path, time.perf_counter() - start, first_event, ok=ok)
+    if not ok:
+        return None
+    return json.loads(final[len("data: "):])
+
+async def interview(client, recorder, index, resume, stream):
+    start = time.perf_counter()
+    reply = await post(
+        client, recorder, "/start-interview", stream,
+        data={"name": f"Candidate{index}", "job_description": JOB_DESCRIPTION},
+        files={"resume": ("resume.pdf", resume, "application/pdf")}
+    )
+    if reply is None:
+        return None
+    session_id = reply["session_id"]
+    turns = 0
+    for answer in ANSWERS:
+        reply = await post(client, recorder, "/next-question", stream, data={"session_id": session_id, "answer": answer})
+        turns += 1
+        if reply is None or reply.get("is_interview_over"):
+            break
+    await post(client, recorder, "/feedback", False, data={"session_id": session_id})
+    return turns, time.perf_counter() - start
+
+async def run(args, resumes):
+    recorder = Recorder()
+    semaphore = asyncio.Semaphore(args.concurrency)
+    limits = httpx.Limits(max_connections=args.concurrency * 2, max_keepalive_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.app_port}", timeout=120, limits=limits) as client:
+        async def bounded(index):
+            async with semaphore:
+                return await interview(client, recorder, index, resumes[index], args.stream)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(args.interviews)))
+        wall = time.perf_counter() - start
+    return recorder, [r for r in results if r is not None], wall
+
+def start_app(port, app_state):
+    """Run the backend app on a background thread with an event-loop lag probe."""
+    import main
+    from utils import get_rss_bytes
+
+    async def probe_loop():
+        interval = 0.01
+        while True:
+            before = time.perf_counter()
+            await asyncio.sleep(interval)
+            app_state["lag"].append(time.perf_counter() - before - interval)
+            app_state["peak_rss"] = max(app_state["peak_rss"], get_rss_bytes())
+
+    async def start_probe():
+        app_state["probe"] = asyncio.create_task(probe_loop())
+
+    main.app.router.on_startup.append(start_probe)
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="backend-app", daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            sys.exit("backend app failed to start")
+        time.sleep(0.05)
+    # Model warmup runs in the background after startup; wait for it like a load balancer would
+    while (ready := httpx.get(f"http://127.0.0.1:{port}/readyz")).status_code != 200:
+        if ready.json().get("status") == "failed":
+            sys.exit(f"backend app failed to warm up: {ready.json()['detail']}")
+        time.sleep(0.05)
+    return server
+
+def report(args, recorder, results, wall, app_state, baseline_rss):
+    requests = sum(len(values) for values in recorder.latencies.values())
+    print(f"interviews={len(results)}/{args.interviews} concurrency={args.concurrency} stream={args.stream} "
+          f"ttft_ms={args.ttft_ms} tokens_per_second={args.tokens_per_second}")
+    print(f"wall={wall:.2f}s interviews/s={len(results) / wall:.2f} requests/s={requests / wall:.1f}")
+    if results:
+        durations = [elapsed for _, elapsed in results]
+        print(f"interview duration p50={percentile(durations, 0.5):.2f}s p95={percentile(durations, 0.95):.2f}s "
+              f"turns/interview={sum(turns for turns, _ in results) / len(results):.1f}")
+    print(f"{'endpoint':<28} {'n':>5} {'err':>4} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8} {'first_p50':>10}")
+    for endpoint, values in sorted(recorder.latencies.items()):
+        ms = [v * 1000 for v in values]
+        first = recorder.first_event.get(endpoint)
+        first_p50 = f"{percentile(first, 0.5) * 1000:10.1f}" if first else f"{'-':>10}"
+        print(f"{endpoint:<28} {len(ms):5d} {recorder.errors[endpoint]:4d} {percentile(ms, 0.5):8.1f} "
+              f"{percentile(ms, 0.95):8.1f} {percentile(ms, 0.99):8.1f} {first_p50}")
+    lag = [v * 1000 for v in app_state["lag"]] or [0.0]
+    print(f"event-loop lag ms: p50={percentile(lag, 0.5):.1f} p99={percentile(lag, 0.99):.1f} max={max(lag):.1f}")
+    print(f"rss: baseline={baseline_rss / 2**20:.0f}MiB peak={app_state['peak_rss'] / 2**20:.0f}MiB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interviews", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--stream", action="store_true", help="use the Server-Sent Events endpoints")
+    parser.add_argument("--ttft-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=60.0)
+    parser.add_argument("--app-port", type=int, default=8031)
+    parser.add_argument("--llm-port", type=int, default=8032)
+    parser.add_argument("--same-resume", action="store_true", help="upload identical PDFs so the resume cache hits")
+    args = parser.parse_args()
+
+    fake_deepseek.start_in_thread(args.llm_port, args.ttft_ms, args.tokens_per_second)
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "fake")
+    os.environ.setdefault("RESUME_CACHE_DIR", tempfile.mkdtemp(prefix="resume-cache-"))
+    resumes = [make_resume(0 if args.same_resume else i) for i in range(args.interviews)]
+
+    from utils import get_rss_bytes
+    baseline_rss = get_rss_bytes()
+    app_state = {"lag": [], "peak_rss": 0}
+    server = start_app(args.app_port, app_state)
+    logging.disable(logging.INFO)  # Per-turn debug logging would dominate the profile
+    app_state["lag"].clear()  # Drop startup lag
+
+    recorder, results, wall = asyncio.run(run(args, resumes))
+    report(args, recorder, results, wall, app_state, baseline_rss)
+    server.should_exit = True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+log_message benchmark: per-turn cost of eager vs lazy message annotation.
+
+One turn logs the candidate's answer and the next AI question, as /next-question
+does. "eager" (MESSAGE_ANNOTATIONS=eager, the old behaviour) extracts keywords and
+runs a resume and a job description search for every message; "lazy" stores the
+message only and annotates on request through get_message_annotations. Every
+message is unique, so the embedding cache does not hide the encoder cost.
+Run from backend/:
+    python benchmarks/bench_log_message.py --turns 40
+    SESSION_STORE=sqlite SESSION_DB_PATH=/tmp/bench.db python benchmarks/bench_log_message.py
+"""
+import argparse
+import logging
+import os
+import statistics
+import sys
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import memory  # noqa: E402
+from utils import chunk_text, embed_chunks, warmup_models  # noqa: E402
+from vector_store import SessionVectors  # noqa: E402
+
+RESUME = (
+    "Software engineer at Hexaware for four years. Built a Python FastAPI payments service handling "
+    "1k requests per second. Led a migration to Kubernetes and Terraform on AWS. Projects: realtime "
+    "analytics dashboard in React with Kafka; ML feature store in Spark. Skills: Python, SQL, AWS, "
+    "Docker, pytest. Mentored junior engineers and ran the on-call rotation. "
+) * 6
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer to build Python services on AWS. You will design APIs with "
+    "FastAPI, model data in PostgreSQL, and work in an agile team with code review and on-call. "
+) * 3
+
+def new_session():
+    session_id = str(uuid.uuid4())
+    resume_chunks = chunk_text(RESUME)
+    job_desc_chunks = chunk_text(JOB_DESCRIPTION)
+    vectors = SessionVectors.from_embeddings({"resume": embed_chunks(resume_chunks), "job_description": embed_chunks(job_desc_chunks)})
+    memory.create_session(session_id, "Bench", resume_chunks, RESUME, job_desc_chunks, JOB_DESCRIPTION, vectors)
+    return session_id
+
+def run(mode, turns):
+    memory.MESSAGE_ANNOTATIONS = mode
+    session_id = new_session()
+    timings = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        memory.log_message(session_id, "user", f"[{mode} {turn}] I built the payments API in FastAPI and tested it with pytest.")
+        memory.log_message(session_id, "ai", f"[{mode} {turn}] How did you keep the Kafka pipeline consistent under load?")
+        timings.append((time.perf_counter() - start) * 1000)
+    stored = memory.estimate_session_bytes(memory._store.get(session_id))
+    start = time.perf_counter()
+    memory.get_message_annotations(session_id, -1)
+    on_demand = (time.perf_counter() - start) * 1000
+    memory.clear_session(session_id)
+    return timings, stored, on_demand
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=40)
+    args = parser.parse_args()
+
+    warmup_models()
+    logging.disable(logging.DEBUG)  # log_message logs every message at DEBUG
+    print(f"{'mode':>6} {'turns':>6} {'p50_ms':>8} {'p95_ms':>8} {'session_kb':>10} {'annotate_one_ms':>16}")
+    results = {}
+    for mode in ("eager", "lazy"):
+        timings, stored, on_demand = run(mode, args.turns)
+        results[mode] = statistics.median(timings)
+        p95 = sorted(timings)[int(0.95 * (len(timings) - 1))]
+        print(f"{mode:>6} {args.turns:>6} {results[mode]:>8.2f} {p95:>8.2f} {stored / 1024:>10.1f} {on_demand:>16.2f}")
+    print(f"per-turn speedup: {results['eager'] / results['lazy']:.1f}x")
+
+if __name__ == "__main__":
+    main()
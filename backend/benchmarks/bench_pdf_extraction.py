@@ -0,0 +1,82 @@
+"""
+PDF extraction benchmark: serial vs process-pool extraction of synthetic scanned resumes.
+
+Builds image-only PDFs (each page is a rendered bitmap with no text layer, like a
+scan) and extracts them with workers=0 (the old inline path) and with the pool.
+OCR needs the tesseract binary on PATH; without it the numbers cover page
+rendering only. Run from backend/:
+    python benchmarks/bench_pdf_extraction.py --pages 4 --documents 4 --workers 4
+"""
+import argparse
+import os
+import shutil
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # noqa: E402
+
+import utils  # noqa: E402
+
+LINES = [
+    "Jane Doe - Senior Software Engineer",
+    "Hexaware Technologies, 2019-2024",
+    "Built a Python FastAPI payments service handling 2k requests per second.",
+    "Migrated batch jobs from cron to Airflow, cutting failures by 40%.",
+    "Led a team of four engineers on a realtime analytics dashboard in React.",
+    "Skills: Python, SQL, AWS, Docker, Kubernetes, PyTorch, FAISS"
+]
+
+def scanned_pdf(pages, scan_dpi=200):
+    """Build a PDF whose pages are bitmaps only, as a scanner would produce."""
+    source = fitz.open()
+    for page_num in range(pages):
+        page = source.new_page()
+        y = 72
+        for line in LINES * 4:
+            page.insert_text((72, y), f"{line} (p{page_num + 1})", fontsize=11)
+            y += 18
+    scanned = fitz.open()
+    for page in source:
+        pix = page.get_pixmap(matrix=fitz.Matrix(scan_dpi / 72, scan_dpi / 72))
+        target = scanned.new_page(width=page.rect.width, height=page.rect.height)
+        target.insert_image(target.rect, pixmap=pix)
+    data = scanned.tobytes()
+    source.close()
+    scanned.close()
+    return data
+
+def run(documents, workers):
+    start = time.perf_counter()
+    characters = sum(len(utils.extract_text_from_pdf(pdf, workers=workers)) for pdf in documents)
+    return time.perf_counter() - start, characters
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=4)
+    parser.add_argument("--documents", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=utils.PDF_WORKERS or 4)
+    args = parser.parse_args()
+
+    if not utils.OCR_AVAILABLE or shutil.which("tesseract") is None:
+        print("note: pytesseract or the tesseract binary is missing; OCR calls fail fast and only rendering is timed")
+    documents = [scanned_pdf(args.pages) for _ in range(args.documents)]
+    total_pages = args.pages * args.documents
+
+    # Warm the pool so worker start-up is not counted against the parallel run
+    utils.extract_text_from_pdf(documents[0], workers=args.workers)
+
+    serial_seconds, serial_chars = run(documents, workers=0)
+    parallel_seconds, parallel_chars = run(documents, workers=args.workers)
+    utils.shutdown_pdf_pool()
+
+    print(f"documents={args.documents} pages/doc={args.pages} workers={args.workers} "
+          f"ocr_dpi={utils.OCR_MIN_DPI}-{utils.OCR_MAX_DPI} budget={utils.PDF_TIME_BUDGET_SECONDS}s")
+    print(f"{'mode':>9} {'seconds':>8} {'pages/s':>8} {'chars':>7}")
+    print(f"{'serial':>9} {serial_seconds:>8.2f} {total_pages / serial_seconds:>8.1f} {serial_chars:>7}")
+    print(f"{'parallel':>9} {parallel_seconds:>8.2f} {total_pages / parallel_seconds:>8.1f} {parallel_chars:>7}")
+    print(f"speedup: {serial_seconds / parallel_seconds:.2f}x")
+
+if __name__ == "__main__":
+    main()
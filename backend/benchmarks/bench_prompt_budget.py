@@ -0,0 +1,94 @@
+"""
+Follow-up prompt budget benchmark: estimated prompt tokens per turn over a long
+interview, without a budget and with FOLLOWUP_PROMPT_TOKEN_BUDGET.
+
+Replays --turns question/answer exchanges through generate_followup_question against
+the fake DeepSeek server, moving through the interview phases. Every question is
+unique, so the "topics discussed" list grows each turn as it does in a real
+interview. Reports the prompt size sent per turn with no budget (near-duplicate
+chunks are still dropped) and with the budget, and what the budget trimmed.
+Run from backend/:
+    python benchmarks/bench_prompt_budget.py --turns 30 --budget 700
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fake_deepseek  # noqa: E402
+from bench_log_message import JOB_DESCRIPTION, RESUME  # noqa: E402
+
+ANSWER = (
+    "In that role I owned the payments API end to end, from the FastAPI handlers to the PostgreSQL "
+    "schema, and I spent a lot of time on load testing and on the Kafka consumers that fed the "
+    "analytics dashboard, which is where most of the interesting failures showed up. "
+)
+
+async def interview(turns, budget):
+    # Imported after the environment points the client at the fake server
+    import memory
+    import prompts
+    from utils import chunk_text, embed_chunks
+    from vector_store import SessionVectors
+
+    prompts.FOLLOWUP_PROMPT_TOKEN_BUDGET = budget
+    session_id = str(uuid.uuid4())
+    resume_chunks = chunk_text(RESUME)
+    job_desc_chunks = chunk_text(JOB_DESCRIPTION)
+    vectors = SessionVectors.from_embeddings({"resume": embed_chunks(resume_chunks), "job_description": embed_chunks(job_desc_chunks)})
+    memory.create_session(session_id, "Bench", resume_chunks, RESUME, job_desc_chunks, JOB_DESCRIPTION, vectors)
+    await prompts.build_session_profile(session_id)
+
+    phases = memory.PHASE_ORDER[1:-1]
+    rows = []
+    for turn in range(turns):
+        memory.set_phase(session_id, phases[turn * len(phases) // turns])
+        memory.log_message(session_id, "ai", f"[{turn}] What was the hardest part of the work you described, and how did you handle it?")
+        memory.log_message(session_id, "user", f"[{turn}] {ANSWER}")
+        before = dict(prompts.get_prompt_stats().get("followup", {"tokens_before": 0, "tokens_after": 0}))
+        await prompts.generate_followup_question(session_id, memory.get_history(session_id))
+        after = prompts.get_prompt_stats()["followup"]
+        rows.append((after["tokens_before"] - before["tokens_before"], after["tokens_after"] - before["tokens_after"]))
+    memory.clear_session(session_id)
+    return rows
+
+async def run(turns, budget):
+    import llm
+    unbounded = await interview(turns, 0)
+    budgeted = await interview(turns, budget)
+    await llm.close_client()
+    return unbounded, budgeted
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--budget", type=int, default=700)
+    parser.add_argument("--llm-port", type=int, default=8072)
+    args = parser.parse_args()
+
+    fake_deepseek.start_in_thread(args.llm_port, 20, 2000)
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "fake")
+    logging.disable(logging.INFO)
+    from utils import warmup_models
+    warmup_models()
+
+    unbounded, budgeted = asyncio.run(run(args.turns, args.budget))
+    print(f"turns={args.turns} budget={args.budget} (estimated tokens)")
+    print(f"{'turn':>5} {'no_budget':>10} {'budgeted':>9} {'trimmed':>8}")
+    marks = sorted({0, args.turns // 4, args.turns // 2, 3 * args.turns // 4, args.turns - 1})
+    for turn in marks:
+        _, sent_unbounded = unbounded[turn]
+        before, sent = budgeted[turn]
+        print(f"{turn + 1:>5} {sent_unbounded:>10} {sent:>9} {before - sent:>8}")
+    total_unbounded = sum(row[1] for row in unbounded)
+    total_budgeted = sum(row[1] for row in budgeted)
+    print(f"prompt tokens over the interview: {total_unbounded} -> {total_budgeted} "
+          f"({100 * (1 - total_budgeted / total_unbounded):.0f}% fewer)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Bulk screening benchmark: one /screen-candidates request vs one /start-interview call
+per resume, for the same job description.
+
+Starts the fake DeepSeek server and the backend app (uvicorn, in this process), then
+creates --candidates sessions each way and reports the wall time until every session
+has its documents ingested and its greeting, plus the stage timings /screen-candidates
+returns. "single" sends the /start-interview calls --concurrency at a time and waits
+for their background ingestion; every run uses fresh resumes so the resume cache does
+not hit. Run from backend/:
+    python benchmarks/bench_screening.py --candidates 32 --concurrency 8
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+import fake_deepseek  # noqa: E402
+from bench_load import JOB_DESCRIPTION, make_resume, start_app  # noqa: E402
+
+async def wait_ready(session_ids):
+    """Poll the in-process session store until background ingestion has finished."""
+    import memory
+    pending = set(session_ids)
+    while pending:
+        pending = {session_id for session_id in pending if memory.get_ingestion_status(session_id)["status"] == "pending"}
+        await asyncio.sleep(0.01)
+
+async def single(client, resumes, concurrency):
+    limit = asyncio.Semaphore(concurrency)
+
+    async def start(index, resume):
+        async with limit:
+            response = await client.post(
+                "/start-interview",
+                data={"name": f"Candidate{index}", "job_description": JOB_DESCRIPTION},
+                files={"resume": ("resume.pdf", resume, "application/pdf")}
+            )
+            response.raise_for_status()
+            return response.json()["session_id"]
+
+    session_ids = await asyncio.gather(*(start(i, resume) for i, resume in enumerate(resumes)))
+    await wait_ready(session_ids)
+    return len(session_ids), None
+
+async def bulk(client, resumes, concurrency):
+    response = await client.post(
+        "/screen-candidates",
+        data={"job_description": JOB_DESCRIPTION},
+        files=[("resumes", (f"candidate{i}.pdf", resume, "application/pdf")) for i, resume in enumerate(resumes)]
+    )
+    response.raise_for_status()
+    body = response.json()
+    return sum(candidate["status"] == "ready" for candidate in body["candidates"]), body["timings"]
+
+async def run(port, mode, resumes, concurrency):
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=600) as client:
+        start = time.perf_counter()
+        ready, timings = await mode(client, resumes, concurrency)
+        return ready, time.perf_counter() - start, timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--candidates", type=int, default=32)
+    parser.add_argument("--concurrency", type=int, default=8, help="parallel /start-interview calls in single mode")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--app-port", type=int, default=8061)
+    parser.add_argument("--llm-port", type=int, default=8062)
+    args = parser.parse_args()
+
+    fake_deepseek.start_in_thread(args.llm_port, 50, 500)
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "fake")
+    os.environ.setdefault("RESUME_CACHE_DIR", tempfile.mkdtemp(prefix="resume-cache-"))
+    os.environ.setdefault("MAX_SCREENING_RESUMES", str(args.candidates))
+    start_app(args.app_port, {"lag": [], "peak_rss": 0})
+    logging.disable(logging.INFO)
+
+    print(f"candidates={args.candidates} concurrency={args.concurrency}")
+    print(f"{'mode':<8} {'run':>4} {'ready':>6} {'wall_s':>7} {'ms/candidate':>13}  stages")
+    offset = 0
+    for repeat in range(args.repeats):
+        for name, mode in (("single", single), ("bulk", bulk)):
+            resumes = [make_resume(offset + i) for i in range(args.candidates)]
+            offset += args.candidates
+            ready, wall, timings = asyncio.run(run(args.app_port, mode, resumes, args.concurrency))
+            stages = " ".join(f"{stage}={ms:.0f}" for stage, ms in (timings or {}).items())
+            print(f"{name:<8} {repeat + 1:>4} {ready:>6} {wall:>7.2f} {wall * 1000 / args.candidates:>13.1f}  {stages}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Session bookkeeping benchmark: per-turn cost of the existence check, question counting
+and topic membership with session dicts and lists vs the slotted Session.
+
+Builds --sessions sessions with --history messages each (half of them AI questions,
+all in asked_topics) in an in-memory store, both ways. "dict" repeats the old
+bookkeeping: `session_id in get_all_session_ids()` (a copy of every key), two history
+scans to count questions, and `in` checks on the asked_topics, tracked_context and
+used_transitions lists. "slotted" goes through the memory API with the running
+question_count and set-backed membership. Each turn checks entries already recorded,
+the latest ones, so nothing is written. Also reports the memory per session, and the
+cost of a write: log_message on the same sessions with a byte budget set, which keeps
+each session's size estimate up to date.
+Run from backend/:
+    python benchmarks/bench_session_bookkeeping.py --sessions 5000 --history 400
+"""
+import argparse
+import gc
+import logging
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import memory  # noqa: E402
+from session import Session  # noqa: E402
+
+def make_history(length):
+    history = []
+    for turn in range(length // 2):
+        history.append({"role": "ai", "content": f"Question {turn} about the payments service you built?", "phase": "technical"})
+        history.append({"role": "user", "content": f"Answer {turn} about load testing and Kafka consumers.", "phase": "technical"})
+    return history
+
+def make_dict(history, topics, transitions):
+    return {
+        "user_name": "Bench", "history": [dict(message) for message in history], "phase": "technical",
+        "asked_topics": [m["content"] for m in history if m["role"] == "ai"],
+        "tracked_context": list(topics), "used_transitions": list(transitions),
+        "awaiting_candidate_question": False
+    }
+
+def make_session(history, topics, transitions):
+    session = Session("Bench")
+    session.phase = "technical"
+    for message in history:
+        session.add_message(dict(message))
+        if message["role"] == "ai":
+            session.add_asked_topic(message["content"])
+    for topic in topics:
+        session.add_tracked_context(topic)
+    for transition in transitions:
+        session.add_used_transition(transition)
+    return session
+
+def dict_turn(sessions, session_id, question, topic, transition):
+    """The pre-Session per-turn bookkeeping of /next-question."""
+    if session_id not in list(sessions.keys()):
+        return
+    session = sessions[session_id]
+    history = session["history"]
+    # should_continue_interview, then the phase map in main.next_question
+    len([m for m in history if m["role"] == "ai" and m["content"].endswith("?")])
+    len([m for m in history if m["role"] == "ai" and m["content"].endswith("?")])
+    question in session["asked_topics"]
+    topic in session["tracked_context"]
+    transition in session["used_transitions"]
+
+def slotted_turn(session_id, question, topic, transition):
+    if not memory.session_exists(session_id):
+        return
+    history = memory.get_history(session_id)
+    memory.should_continue_interview(session_id, history)
+    memory.get_question_count(session_id)
+    # All already recorded, so nothing is written
+    memory._store.get(session_id).add_asked_topic(question)
+    memory.add_tracked_context(session_id, topic)
+    memory.track_used_transition(session_id, transition)
+
+def log_turn(session_id, question, topic, transition):
+    memory.log_message(session_id, "user", f"Answer about {topic}.")
+
+def per_turn_us(turn, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        turn(*args)
+        timings.append((time.perf_counter() - start) * 1e6)
+    return statistics.median(timings), sorted(timings)[int(0.95 * (len(timings) - 1))]
+
+def bytes_per_session(build, count):
+    gc.collect()
+    tracemalloc.start()
+    sessions = [build() for _ in range(count)]
+    used = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sessions
+    return used / count
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=5000)
+    parser.add_argument("--history", type=int, default=400)
+    parser.add_argument("--topics", type=int, default=50)
+    parser.add_argument("--turns", type=int, default=2000)
+    parser.add_argument("--memory-sessions", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    memory.SESSION_MAX_COUNT = 0
+    memory.SESSION_MAX_BYTES = 0
+
+    history = make_history(args.history)
+    topics = [f"topic {i}" for i in range(args.topics)]
+    transitions = [f"transition {i}" for i in range(args.topics)]
+    ids = [f"session-{i}" for i in range(args.sessions)]
+    dicts = {session_id: make_dict(history, topics, transitions) for session_id in ids}
+    for session_id in ids:
+        memory._store.put(session_id, make_session(history, topics, transitions))
+
+    rng = random.Random(0)
+    # The most recent entries: a list check has to scan all the way to them
+    question = history[-2]["content"]
+    turns = [(rng.choice(ids), question, topics[-1], transitions[-1]) for _ in range(args.turns)]
+    dict_p50, dict_p95 = per_turn_us(lambda *turn: dict_turn(dicts, *turn), turns)
+    slotted_p50, slotted_p95 = per_turn_us(slotted_turn, turns)
+    memory.SESSION_MAX_BYTES = 2**62
+    log_p50, log_p95 = per_turn_us(log_turn, turns)
+    dict_bytes = bytes_per_session(lambda: make_dict(history, topics, transitions), args.memory_sessions)
+    slotted_bytes = bytes_per_session(lambda: make_session(history, topics, transitions), args.memory_sessions)
+
+    print(f"sessions={args.sessions} history={args.history} topics={args.topics} turns={args.turns}")
+    print(f"{'state':<8} {'turn_p50_us':>12} {'turn_p95_us':>12} {'bytes/session':>14}")
+    print(f"{'dict':<8} {dict_p50:>12.1f} {dict_p95:>12.1f} {dict_bytes:>14,.0f}")
+    print(f"{'slotted':<8} {slotted_p50:>12.1f} {slotted_p95:>12.1f} {slotted_bytes:>14,.0f}")
+    print(f"log_message with a byte budget: p50 {log_p50:.1f}us, p95 {log_p95:.1f}us")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Session-start benchmark: latency and RSS as the number of concurrent sessions grows.
+
+Run from backend/:
+    python benchmarks/bench_session_start.py --levels 1 4 16
+    python benchmarks/bench_session_start.py --legacy   # one model load per call, as before
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sentence_transformers import SentenceTransformer  # noqa: E402
+
+import utils  # noqa: E402
+from memory import create_session, clear_session  # noqa: E402
+from vector_store import SessionVectors  # noqa: E402
+
+RESUME_TEXT = " ".join(
+    f"Built project {i} in Python and FastAPI at Hexaware, improving latency by {i * 3}%. "
+    f"Led a team of {i % 5 + 2} engineers on data pipelines with Spark and SQL."
+    for i in range(40)
+)
+JOB_DESC_TEXT = " ".join(
+    f"Requirement {i}: experience with distributed systems, Python, cloud services and testing."
+    for i in range(15)
+)
+
+# Models created in legacy mode, kept alive as the old sessions did
+_legacy_models = []
+
+def legacy_embed_chunks(chunks):
+    """The pre-registry behaviour: a fresh SentenceTransformer per call."""
+    model = SentenceTransformer(utils.EMBEDDING_MODEL_NAME)
+    return model.encode(chunks, convert_to_numpy=True)
+
+def start_session(legacy):
+    start = time.perf_counter()
+    session_id = str(uuid.uuid4())
+    resume_chunks = utils.chunk_text(RESUME_TEXT)
+    job_desc_chunks = utils.chunk_text(JOB_DESC_TEXT)
+    if legacy:
+        embed = legacy_embed_chunks
+    else:
+        embed = utils.embed_chunks
+    vectors = SessionVectors.from_embeddings({"resume": embed(resume_chunks), "job_description": embed(job_desc_chunks)})
+    create_session(session_id, "Bench", resume_chunks, RESUME_TEXT,
+                   job_desc_chunks, JOB_DESC_TEXT, vectors)
+    if legacy:
+        # create_session used to load its own model as well
+        _legacy_models.append(SentenceTransformer(utils.EMBEDDING_MODEL_NAME))
+    return session_id, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--legacy", action="store_true", help="load a model per call like the old code")
+    args = parser.parse_args()
+
+    if not args.legacy:
+        utils.warmup_models()
+    print(f"mode={'legacy' if args.legacy else 'shared'} baseline_rss={utils.get_rss_bytes() / 2**20:.1f}MiB")
+    session_ids = []
+    print(f"{'sessions':>8} {'p50_ms':>9} {'max_ms':>9} {'wall_s':>8} {'rss_mib':>9}")
+
+    for level in args.levels:
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            results = list(pool.map(lambda _: start_session(args.legacy), range(level)))
+        wall = time.perf_counter() - wall
+        latencies = [elapsed * 1000 for _, elapsed in results]
+        print(f"{level:>8} {statistics.median(latencies):>9.1f} {max(latencies):>9.1f} "
+              f"{wall:>8.2f} {utils.get_rss_bytes() / 2**20:>9.1f}")
+        # Sessions stay alive across levels so RSS reflects the cumulative total
+        session_ids.extend(session_id for session_id, _ in results)
+    print(f"loaded models: {utils.get_model_stats()['models']}")
+    for session_id in session_ids:
+        clear_session(session_id)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+Session store benchmark: per-turn read/write overhead and multi-worker sharing.
+
+Per-turn mode replays interview turns against each backend (one turn is roughly
+what /next-question does: several reads, two history appends with writes).
+Shared mode starts several worker processes on one SQLite file; each continues
+sessions created by the others and checks that state and session vectors round-trip.
+Run from backend/:
+    python benchmarks/bench_session_store.py --turns 30
+    python benchmarks/bench_session_store.py --shared --workers 4 --sessions 8
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np  # noqa: E402
+
+from session import Session  # noqa: E402
+from session_store import InMemorySessionStore, SQLiteSessionStore  # noqa: E402
+from vector_store import SessionVectors  # noqa: E402
+
+DIMENSION = 384
+
+def make_embeddings(rows, seed):
+    return np.random.default_rng(seed).standard_normal((rows, DIMENSION)).astype(np.float32)
+
+def new_session(seed):
+    return Session(
+        "Bench",
+        [f"resume chunk {i} " * 40 for i in range(40)],
+        "resume text " * 2000,
+        [f"job chunk {i} " * 40 for i in range(15)],
+        "job description " * 500,
+        SessionVectors.from_embeddings({
+            "resume": make_embeddings(40, seed), "job_description": make_embeddings(15, seed + 1)
+        })
+    )
+
+def message(role, turn):
+    return {
+        "role": role,
+        "content": f"{role} message for turn {turn} about Python services and testing " * 3,
+        "keywords": ["python", "services", "testing"],
+        "context": {"resume": [{"text": "resume chunk " * 40, "distance": 0.5}] * 3, "job_description": []}
+    }
+
+def run_turn(store, session_id, turn):
+    """One /next-question turn: reads for phase checks, two logged messages."""
+    timings = {}
+    start = time.perf_counter()
+    for _ in range(4):
+        store.get(session_id)
+    timings["read"] = (time.perf_counter() - start) / 4
+    start = time.perf_counter()
+    for role in ("user", "ai"):
+        session = store.get(session_id)
+        session.add_message(message(role, turn))
+        store.put(session_id, session)
+    timings["write"] = (time.perf_counter() - start) / 2
+    return timings
+
+def per_turn(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": InMemorySessionStore(),
+            "sqlite": SQLiteSessionStore(os.path.join(tmp, "sessions.db"))
+        }
+        print(f"{'store':>7} {'history':>7} {'read_us':>9} {'write_us':>9}")
+        for name, store in stores.items():
+            session_id = str(uuid.uuid4())
+            store.put(session_id, new_session(0))
+            # A fresh process has to deserialize the session vectors once
+            if name == "sqlite":
+                cold = SQLiteSessionStore(store.path)
+                start = time.perf_counter()
+                cold.get(session_id)
+                print(f"{name:>7} {'cold':>7} {(time.perf_counter() - start) * 1e6:>9.1f} {'':>9}")
+            for turn in range(1, args.turns + 1):
+                samples = [run_turn(store, session_id, turn) for _ in range(args.repeat)]
+                if turn in (1, args.turns // 2, args.turns):
+                    read = statistics.median(s["read"] for s in samples) * 1e6
+                    write = statistics.median(s["write"] for s in samples) * 1e6
+                    history = len(store.get(session_id).history)
+                    print(f"{name:>7} {history:>7} {read:>9.1f} {write:>9.1f}")
+
+def shared_worker(path, worker, workers, sessions, rounds, queue):
+    store = SQLiteSessionStore(path)
+    mine = []
+    for i in range(sessions):
+        session_id = f"w{worker}-s{i}"
+        store.put(session_id, new_session(worker * 1000 + i))
+        mine.append(session_id)
+    queue.put(("created", worker))
+    errors = 0
+    # Worker w continues the sessions created by worker w+1, round by round
+    other = (worker + 1) % workers
+    for turn in range(rounds):
+        for i in range(sessions):
+            session_id = f"w{other}-s{i}"
+            session = None
+            while session is None:
+                session = store.get(session_id)
+            embeddings = make_embeddings(40, other * 1000 + i)
+            found = session.vectors.search(embeddings[:1], 1, ("resume",))["resume"]
+            errors += int(found[0][0][0] != 0)
+            session.add_message(message("user", turn))
+            store.put(session_id, session)
+    queue.put(("done", worker, errors))
+
+def shared(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "sessions.db")
+        SQLiteSessionStore(path)
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        start = time.perf_counter()
+        procs = [
+            ctx.Process(target=shared_worker, args=(path, w, args.workers, args.sessions, args.turns, queue))
+            for w in range(args.workers)
+        ]
+        for proc in procs:
+            proc.start()
+        results = [queue.get() for _ in range(2 * args.workers)]
+        for proc in procs:
+            proc.join()
+        wall = time.perf_counter() - start
+
+        store = SQLiteSessionStore(path)
+        ids = store.ids()
+        history_lengths = {len(store.get(session_id).history) for session_id in ids}
+        errors = sum(r[2] for r in results if r[0] == "done")
+        print(f"workers={args.workers} sessions={len(ids)} turns/session={args.turns} wall={wall:.2f}s")
+        print(f"history lengths seen: {sorted(history_lengths)} (expected [{args.turns}])")
+        print(f"vector round-trip mismatches: {errors}")
+        if history_lengths != {args.turns} or errors or len(ids) != args.workers * args.sessions:
+            sys.exit("shared-session check FAILED")
+        print("shared-session check passed")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--shared", action="store_true", help="run the multi-worker check instead")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--sessions", type=int, default=8)
+    args = parser.parse_args()
+    shared(args) if args.shared else per_turn(args)
+
+if __name__ == "__main__":
+    main()
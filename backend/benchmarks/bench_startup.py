@@ -0,0 +1,92 @@
+"""
+Startup benchmark: import time of the app and its heavy dependencies, and cold start
+of the server until /healthz, /sessions and /readyz answer.
+
+Every measurement runs in a fresh interpreter, so nothing is served from a warm
+sys.modules. The heavy modules (sentence_transformers and torch, faiss, the OpenAI
+SDK) are imported on first use; "loaded by import main" should list none of them.
+The server is pointed at a fake DeepSeek server started by this script. Run from
+backend/:
+    python benchmarks/bench_startup.py --repeats 3
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import httpx
+
+import fake_deepseek
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODULES = ["main", "sentence_transformers", "faiss", "openai", "fitz", "numpy"]
+HEAVY_MODULES = ["sentence_transformers", "torch", "faiss", "openai"]
+
+def import_seconds(module):
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"import {module}; print(time.perf_counter() - start)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    return float(result.stdout.strip().splitlines()[-1])
+
+def loaded_by_main():
+    code = f"import sys, main; print('loaded:' + ','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, capture_output=True, text=True, check=True)
+    # Libraries may print their own warnings to stdout
+    return result.stdout.rsplit("loaded:", 1)[-1].strip()
+
+def cold_start(port, env, timeout):
+    """Start uvicorn and time the first successful answer from each probe."""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    timings = {}
+    try:
+        while len(timings) < 3 and time.perf_counter() - start < timeout:
+            for path in ("/healthz", "/sessions", "/readyz"):
+                if path in timings:
+                    continue
+                try:
+                    response = httpx.get(f"http://127.0.0.1:{port}{path}", timeout=timeout)
+                except httpx.TransportError:
+                    break
+                if response.status_code == 200:
+                    timings[path] = time.perf_counter() - start
+                elif response.json().get("status") == "failed":
+                    timings[path] = f"failed: {response.json()['detail'][:60]}"
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return timings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--app-port", type=int, default=8051)
+    parser.add_argument("--llm-port", type=int, default=8052)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    args = parser.parse_args()
+
+    print(f"{'import':<24} {'median_s':>9}")
+    for module in MODULES:
+        seconds = statistics.median(import_seconds(module) for _ in range(args.repeats))
+        print(f"{module:<24} {seconds:>9.2f}")
+    print(f"heavy modules loaded by import main: {loaded_by_main() or 'none'}")
+
+    fake_deepseek.start_in_thread(args.llm_port, 50, 500)
+    env = dict(os.environ, DEEPSEEK_BASE_URL=f"http://127.0.0.1:{args.llm_port}", DEEPSEEK_API_KEY="fake")
+    print(f"{'cold start':<24} {'/healthz':>9} {'/sessions':>10} {'/readyz':>9}")
+    for run in range(args.repeats):
+        timings = cold_start(args.app_port, env, args.timeout)
+        cells = [timings.get(path) for path in ("/healthz", "/sessions", "/readyz")]
+        cells = [f"{cell:.2f}" if isinstance(cell, float) else str(cell or "timeout") for cell in cells]
+        print(f"{'run ' + str(run + 1):<24} {cells[0]:>9} {cells[1]:>10} {cells[2]:>9}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Resume upload benchmark: peak memory under many concurrent /start-interview uploads.
+
+Starts the fake DeepSeek server and the backend app (uvicorn, in this process), then
+sends four waves of concurrent uploads from a separate client process: valid
+resumes padded to --size-mb with an embedded attachment, oversized uploads
+(--oversize-mb, rejected with 413 from the declared Content-Length before the body
+is read), the same sent chunked with no Content-Length (rejected with 413 once the
+body read so far passes the limit) and non-PDF files named .pdf (rejected with 400
+by the signature check). Every upload is sent from the frontend's origin. Reports
+status codes, how many responses carry the CORS allow-origin header (all of them,
+rejections included, or the browser hides the error from the frontend), wall time and
+the peak RSS growth of the app process during each wave, sampled every few milliseconds;
+the client's request buffers are not counted. Run from backend/:
+    python benchmarks/bench_upload.py --uploads 32 --size-mb 8 --oversize-mb 64
+"""
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fitz  # noqa: E402
+import httpx  # noqa: E402
+
+import fake_deepseek  # noqa: E402
+from bench_load import JOB_DESCRIPTION, start_app  # noqa: E402
+
+# Multipart boundary of the chunked uploads
+BOUNDARY = "bench-upload-boundary"
+# Origin of the React dev server, allowed by the app's CORS settings
+ORIGIN = "http://localhost:3000"
+
+def make_padded_resume(size_bytes):
+    """A one-page text PDF grown to about size_bytes with an incompressible attachment."""
+    doc = fitz.open()
+    page = doc.new_page()
+    page.insert_textbox(fitz.Rect(50, 50, 550, 800), (
+        "Software engineer at Hexaware. Built a Python FastAPI payments service. "
+        "Led a migration to Kubernetes on AWS. Skills: Python, SQL, Docker, pytest."
+    ))
+    doc.embfile_add("portfolio.bin", os.urandom(max(size_bytes - 2048, 0)))
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+class PeakRss:
+    """Sample the process RSS on a background thread and keep the peak."""
+
+    def __init__(self, interval=0.005):
+        from utils import get_rss_bytes
+        self.read = get_rss_bytes
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.read())
+            time.sleep(self.interval)
+
+    def __enter__(self):
+        self.peak = self.read()
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def make_payload(kind, size_bytes):
+    if kind == "valid":
+        return make_padded_resume(size_bytes)
+    return os.urandom(size_bytes)
+
+async def _chunked_body(payload, index):
+    """A multipart form streamed in 64 KiB chunks, so httpx sends no Content-Length."""
+    yield (
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="name"\r\n\r\nCandidate{index}\r\n'
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="resume"; filename="resume.pdf"\r\n'
+        f'Content-Type: application/pdf\r\n\r\n'
+    ).encode()
+    for offset in range(0, len(payload), 65536):
+        yield payload[offset:offset + 65536]
+    yield f"\r\n--{BOUNDARY}--\r\n".encode()
+
+async def _wave(port, payload, uploads, chunked):
+    limits = httpx.Limits(max_connections=uploads)
+    headers = {"origin": ORIGIN}
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=300, limits=limits, headers=headers) as client:
+        async def upload(index):
+            try:
+                if chunked:
+                    response = await client.post(
+                        "/start-interview",
+                        content=_chunked_body(payload, index),
+                        headers={"content-type": f"multipart/form-data; boundary={BOUNDARY}"}
+                    )
+                else:
+                    response = await client.post(
+                        "/start-interview",
+                        data={"name": f"Candidate{index}", "job_description": JOB_DESCRIPTION},
+                        files={"resume": ("resume.pdf", payload, "application/pdf")}
+                    )
+                return response.status_code, response.headers.get("access-control-allow-origin") == ORIGIN
+            except httpx.HTTPError as e:
+                # The server may close the connection on a rejected body before it is sent
+                return type(e).__name__, False
+        results = await asyncio.gather(*(upload(i) for i in range(uploads)))
+        return Counter(status for status, _ in results), sum(cors for _, cors in results)
+
+def run_wave(port, kind, size_bytes, uploads):
+    """Client process: build the payload and send the wave; returns status and CORS counts."""
+    payload = make_payload(kind, size_bytes)
+    return len(payload), asyncio.run(_wave(port, payload, uploads, kind == "chunked"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uploads", type=int, default=32, help="concurrent uploads per wave")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--oversize-mb", type=float, default=64.0)
+    parser.add_argument("--app-port", type=int, default=8041)
+    parser.add_argument("--llm-port", type=int, default=8042)
+    args = parser.parse_args()
+
+    fake_deepseek.start_in_thread(args.llm_port, 50, 500)
+    os.environ["DEEPSEEK_BASE_URL"] = f"http://127.0.0.1:{args.llm_port}"
+    os.environ.setdefault("DEEPSEEK_API_KEY", "fake")
+    os.environ.setdefault("RESUME_CACHE_DIR", tempfile.mkdtemp(prefix="resume-cache-"))
+    waves = [
+        ("valid", int(args.size_mb * 2**20)),
+        ("oversized", int(args.oversize_mb * 2**20)),
+        ("chunked", int(args.oversize_mb * 2**20)),
+        ("not a pdf", int(args.size_mb * 2**20)),
+    ]
+
+    start_app(args.app_port, {"lag": [], "peak_rss": 0})
+    logging.disable(logging.INFO)
+    import main as app_main
+    print(f"uploads/wave={args.uploads} MAX_RESUME_BYTES={app_main.MAX_RESUME_BYTES / 2**20:.0f}MiB")
+    print(f"{'wave':<10} {'size_mb':>8} {'statuses':<28} {'cors':>5} {'wall_s':>7} {'rss_mb':>7} {'peak_growth_mb':>15}")
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as client:
+        client.submit(make_payload, "not a pdf", 1).result()  # Start the client process first
+        for label, size_bytes in waves:
+            with PeakRss() as rss:
+                baseline = rss.peak
+                start = time.perf_counter()
+                payload_bytes, (statuses, cors) = client.submit(run_wave, args.app_port, label, size_bytes, args.uploads).result()
+                wall = time.perf_counter() - start
+            statuses = ", ".join(f"{status}x{count}" for status, count in sorted(statuses.items(), key=str))
+            print(f"{label:<10} {payload_bytes / 2**20:>8.1f} {statuses:<28} {cors:>5} {wall:>7.2f} "
+                  f"{baseline / 2**20:>7.0f} {(rss.peak - baseline) / 2**20:>15.1f}")
+
+if __name__ == "__main__":
+    main()
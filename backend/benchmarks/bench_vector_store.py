@@ -0,0 +1,143 @@
+"""
+Vector store benchmark: per-session memory, search latency and retrieval agreement of
+SessionVectors against the two FAISS IndexFlatL2 objects a session used to hold.
+
+Each synthetic session has --resume-rows resume and --job-desc-rows job description
+chunk embeddings (normalized, clustered like real resume chunks). Memory is the RSS
+growth while --sessions sessions are alive, measured in a fresh process per store,
+plus the bytes each store reports. Latency covers one query against both documents
+(log_message annotation) and the 11-query batch build_session_profile runs, both
+returning (chunk index, distance) lists; FAISS needs one search per document,
+SessionVectors one pass over both. Agreement is the top-k overlap with FAISS float32.
+Run from backend/:
+    python benchmarks/bench_vector_store.py --sessions 2000
+"""
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import faiss  # noqa: E402
+import numpy as np  # noqa: E402
+
+from utils import get_rss_bytes  # noqa: E402
+from vector_store import SessionVectors  # noqa: E402
+
+DIMENSION = 384
+PROFILE_QUERIES = 11
+
+def normalize(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+def make_embeddings(rng, rows, centers):
+    """Rows scattered around a few shared topic centers, as chunks of one resume are."""
+    picks = centers[rng.integers(0, len(centers), rows)]
+    return normalize(picks + 0.35 * rng.standard_normal((rows, DIMENSION)))
+
+def make_sessions(count, resume_rows, job_desc_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = normalize(rng.standard_normal((12, DIMENSION)))
+    return [
+        {"resume": make_embeddings(rng, resume_rows, centers), "job_description": make_embeddings(rng, job_desc_rows, centers)}
+        for _ in range(count)
+    ], centers
+
+def faiss_session(documents):
+    indexes = {}
+    for document, embeddings in documents.items():
+        index = faiss.IndexFlatL2(DIMENSION)
+        index.add(embeddings)
+        indexes[document] = index
+    return indexes
+
+def faiss_search(indexes, queries, top_k):
+    results = {}
+    for document, index in indexes.items():
+        distances, indices = index.search(queries, top_k)
+        results[document] = [
+            [(int(i), float(d)) for i, d in zip(row_indices, row_distances)]
+            for row_indices, row_distances in zip(indices, distances)
+        ]
+    return results
+
+def build_store(name, documents):
+    if name == "faiss-f32":
+        return faiss_session(documents)
+    return SessionVectors.from_embeddings(documents, name)
+
+def reported_bytes(store):
+    if isinstance(store, dict):
+        return sum(index.ntotal * index.d * 4 for index in store.values())
+    return store.nbytes
+
+def rss_growth(name, count, resume_rows, job_desc_rows):
+    """Run in a fresh process: RSS growth from building count stores."""
+    sessions, _ = make_sessions(count, resume_rows, job_desc_rows)
+    gc.collect()
+    baseline = get_rss_bytes()
+    stores = [build_store(name, documents) for documents in sessions]
+    gc.collect()
+    return (get_rss_bytes() - baseline) / len(stores)
+
+def latency_ms(search, stores, queries, repeats):
+    timings = []
+    for _ in range(repeats):
+        for store in stores:
+            start = time.perf_counter()
+            search(store, queries)
+            timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), sorted(timings)[int(0.95 * (len(timings) - 1))]
+
+def agreement(stores, reference, queries, top_k):
+    overlaps = []
+    for store, indexes in zip(stores, reference):
+        found = store.search(queries, top_k)
+        expected = faiss_search(indexes, queries, top_k)
+        for document, rows in found.items():
+            for q, row in enumerate(rows):
+                overlaps.append(len({i for i, _ in row} & {i for i, _ in expected[document][q]}) / top_k)
+    return statistics.mean(overlaps)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--resume-rows", type=int, default=40)
+    parser.add_argument("--job-desc-rows", type=int, default=15)
+    parser.add_argument("--latency-sessions", type=int, default=200)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=3)
+    args = parser.parse_args()
+
+    sessions, centers = make_sessions(args.latency_sessions, args.resume_rows, args.job_desc_rows)
+    rng = np.random.default_rng(1)
+    single = make_embeddings(rng, 1, centers)
+    profile = make_embeddings(rng, PROFILE_QUERIES, centers)
+
+    print(f"sessions={args.sessions} rows={args.resume_rows}+{args.job_desc_rows} dim={DIMENSION} top_k={args.top_k}")
+    print(f"{'store':<10} {'bytes/session':>14} {'rss_kb/session':>15} {'1q_p50_ms':>10} {'1q_p95_ms':>10} "
+          f"{'11q_p50_ms':>11} {'11q_p95_ms':>11} {'top_k_agree':>12}")
+    reference = [faiss_session(documents) for documents in sessions]
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"), max_tasks_per_child=1) as pool:
+        for name in ("faiss-f32", "float16", "int8"):
+            growth = pool.submit(rss_growth, name, args.sessions, args.resume_rows, args.job_desc_rows).result()
+            if name == "faiss-f32":
+                stores = reference
+                search = lambda indexes, queries: faiss_search(indexes, queries, args.top_k)
+                agree = 1.0
+            else:
+                stores = [build_store(name, documents) for documents in sessions]
+                search = lambda store, queries: store.search(queries, args.top_k)
+                agree = agreement(stores, reference, profile, args.top_k)
+            one = latency_ms(search, stores, single, args.repeats)
+            batch = latency_ms(search, stores, profile, args.repeats)
+            print(f"{name:<10} {reported_bytes(stores[0]):>14,} {growth / 1024:>15.1f} {one[0]:>10.3f} {one[1]:>10.3f} "
+                  f"{batch[0]:>11.3f} {batch[1]:>11.3f} {agree:>12.3f}")
+
+if __name__ == "__main__":
+    main()
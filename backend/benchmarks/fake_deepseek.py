@@ -0,0 +1,122 @@
+"""
+Local OpenAI-compatible stand-in for the DeepSeek chat API.
+
+Serves POST /chat/completions (streaming and non-streaming) with canned interview
+replies and configurable latency, so the backend can be exercised without network
+access or API cost. Point the backend at it with DEEPSEEK_BASE_URL:
+    python benchmarks/fake_deepseek.py --port 8001 --ttft-ms 300 --tokens-per-second 40
+    DEEPSEEK_BASE_URL=http://127.0.0.1:8001 DEEPSEEK_API_KEY=fake uvicorn main:app
+"""
+import argparse
+import asyncio
+import json
+import re
+import threading
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+GREETING = "Hi {name}, nice to meet you! How's your day going?"
+QUESTION = "That sounds like solid work! How did you test the Python service you built for that project?"
+WRAP_UP = "Thanks so much for chatting today! Do you have any questions about the role or the team?"
+ANSWER = "We work in two-week agile sprints with a lot of ownership. Any other questions?"
+FEEDBACK = (
+    "Thanks for a great conversation! Strengths: you explained your Python projects clearly "
+    "and tied them to measurable results, and your teamwork examples were specific. "
+    "Improvements: structure problem-solving answers step by step and mention trade-offs "
+    "you considered. Score: 7/10 for clarity, relevance and engagement."
+)
+SUMMARY = "Discussed a Python data pipeline project; clear ownership, specific metrics, light on testing detail."
+
+def pick_reply(prompt: str) -> str:
+    """Choose a canned reply that fits the kind of prompt the backend sent."""
+    name = re.search(r"greet candidate (\S+?) for", prompt)
+    if name:
+        return GREETING.format(name=name.group(1))
+    lowered = prompt.lower()
+    if "feedback" in lowered:
+        return FEEDBACK
+    if "summarize" in lowered or "summary" in lowered:
+        return SUMMARY
+    if "answer candidate" in lowered:
+        return ANSWER
+    if "wrap up" in lowered:
+        return WRAP_UP
+    return QUESTION
+
+def tokenize(text: str):
+    """Split a reply into word-sized stream deltas that keep their whitespace."""
+    return re.findall(r"\S+\s*", text)
+
+def create_app(ttft_ms: float = 300.0, tokens_per_second: float = 40.0) -> FastAPI:
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        prompt = body["messages"][-1]["content"]
+        reply = pick_reply(prompt)
+        tokens = tokenize(reply)[: body.get("max_tokens") or None]
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        created = int(time.time())
+        model = body.get("model", "deepseek-chat")
+
+        if not body.get("stream"):
+            await asyncio.sleep(ttft_ms / 1000 + len(tokens) / tokens_per_second)
+            return JSONResponse({
+                "id": completion_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": "".join(tokens)}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(tokens), "total_tokens": len(prompt.split()) + len(tokens)}
+            })
+
+        def chunk(delta, finish_reason=None):
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+            }
+            return f"data: {json.dumps(payload)}\n\n"
+
+        async def events():
+            await asyncio.sleep(ttft_ms / 1000)
+            yield chunk({"role": "assistant", "content": ""})
+            for token in tokens:
+                yield chunk({"content": token})
+                await asyncio.sleep(1 / tokens_per_second)
+            yield chunk({}, finish_reason="stop")
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+def start_in_thread(port: int = 8001, ttft_ms: float = 300.0, tokens_per_second: float = 40.0) -> uvicorn.Server:
+    """Run the fake server on a background thread and return once it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(
+        create_app(ttft_ms, tokens_per_second), host="127.0.0.1", port=port, log_level="warning"
+    ))
+    threading.Thread(target=server.run, name="fake-deepseek", daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--ttft-ms", type=float, default=300.0, help="delay before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.ttft_ms, args.tokens_per_second), host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import List
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+class EmbeddingBatcher:
+    """
+    Collect concurrent encode requests into one batched forward pass on a worker thread.
+
+    Callers get a Future per request; the worker waits at most max_wait_ms after the
+    first queued request for others to arrive, then encodes up to max_batch_size texts
+    in a single model.encode call and splits the rows back out to each Future.
+    """
+
+    def __init__(self, model, max_batch_size: int = 64, max_wait_ms: float = 2.0, name: str = "embedding-batcher"):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._queue_waits = deque(maxlen=2048)
+        self.batches = 0
+        self.items = 0
+        self.requests = 0
+        self.encode_seconds = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """
+        Queue texts for encoding and return a Future resolving to their embedding rows.
+        """
+        future = Future()
+        if not texts:
+            future.set_result(np.zeros((0, 0), dtype=np.float32))
+            return future
+        self._queue.put((list(texts), future, time.perf_counter()))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        """
+        Encode texts through the batcher, blocking the calling thread until done.
+        """
+        return self.submit(texts).result()
+
+    def close(self) -> None:
+        """
+        Stop the worker thread after it drains the requests already queued.
+        """
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first[0])
+            deadline = time.perf_counter() + self.max_wait
+            stop = False
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item[0])
+            self._process(batch)
+            if stop:
+                return
+
+    def _process(self, batch) -> None:
+        batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        texts = [text for item in batch for text in item[0]]
+        started = time.perf_counter()
+        try:
+            embeddings = self.model.encode(texts, convert_to_numpy=True, batch_size=len(texts))
+        except Exception as e:
+            logger.error(f"Batched encode of {len(texts)} texts failed: {str(e)}")
+            for _, future, _ in batch:
+                future.set_exception(e)
+            return
+        elapsed = time.perf_counter() - started
+
+        offset = 0
+        for item_texts, future, _ in batch:
+            future.set_result(embeddings[offset:offset + len(item_texts)])
+            offset += len(item_texts)
+
+        with self._lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.items += len(texts)
+            self.encode_seconds += elapsed
+            self._queue_waits.extend(started - enqueued for _, _, enqueued in batch)
+        logger.debug(f"Encoded batch of {len(texts)} texts from {len(batch)} requests in {elapsed * 1000:.1f}ms")
+
+    def stats(self) -> dict:
+        """
+        Report batch sizes, encoder throughput and queue-wait percentiles.
+        """
+        with self._lock:
+            waits = sorted(self._queue_waits)
+            batches, requests, items, encode_seconds = self.batches, self.requests, self.items, self.encode_seconds
+
+        def percentile(p):
+            return round(waits[min(len(waits) - 1, int(p * len(waits)))] * 1000, 3) if waits else 0.0
+
+        return {
+            "batches": batches,
+            "requests": requests,
+            "items": items,
+            "avg_batch_size": round(items / batches, 2) if batches else 0.0,
+            "items_per_second": round(items / encode_seconds, 1) if encode_seconds else 0.0,
+            "queue_wait_ms_p50": percentile(0.50),
+            "queue_wait_ms_p95": percentile(0.95),
+            "queue_depth": self._queue.qsize()
+        }
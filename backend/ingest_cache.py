@@ -0,0 +1,282 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from metrics import span
+from utils import EMBEDDING_MODEL_ID, PDF_WORKERS, chunk_text, encode_texts, extract_text_from_pdf
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Resolved once at import, so the location does not depend on the working directory
+# of whatever later writes to it; created on the first write
+RESUME_CACHE_DIR = os.path.abspath(os.getenv(
+    "RESUME_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".resume_cache")
+))
+# 0 disables the cache
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+class ResumeCache:
+    """
+    On-disk cache of resume ingestion results keyed by the SHA-256 of the PDF bytes.
+
+    Each entry is a directory holding text.txt, chunks.json and one float32
+    embeddings-<model>.npy per embedding model (and non-default backend), loaded
+    with mmap_mode="r" so a hit builds its session vectors without re-extracting, re-chunking
+    or re-encoding. Entries are evicted oldest-access first once the directory
+    exceeds max_bytes.
+
+    Entry sizes are kept in an in-process LRU index, built from the directory (by
+    access time) on first use and updated by get and put, so a put only stats its own
+    entry. Entries added by other processes sharing the directory are picked up the
+    next time a process starts.
+    """
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional["OrderedDict[str, int]"] = None  # digest -> bytes, least recently used first
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def digest(pdf_bytes: bytes) -> str:
+        return hashlib.sha256(pdf_bytes).hexdigest()
+
+    def _entry(self, digest: str) -> str:
+        return os.path.join(self.root, digest)
+
+    @staticmethod
+    def _embeddings_name(model_name: str) -> str:
+        return "embeddings-" + model_name.replace("/", "__") + ".npy"
+
+    def get(self, digest: str, model_name: str = EMBEDDING_MODEL_ID) -> Optional[Tuple[str, List[str], Optional[np.ndarray]]]:
+        """
+        Get (text, chunks, embeddings) for a PDF digest, or None on a miss. embeddings
+        is None when the entry exists but was not encoded with model_name.
+        """
+        entry = self._entry(digest)
+        embeddings_path = os.path.join(entry, self._embeddings_name(model_name))
+        # Another worker may evict the entry at any point here; that is a miss too
+        try:
+            with open(os.path.join(entry, "text.txt"), encoding="utf-8") as f:
+                text = f.read()
+            with open(os.path.join(entry, "chunks.json"), encoding="utf-8") as f:
+                chunks = json.load(f)
+            embeddings = np.load(embeddings_path, mmap_mode="r") if os.path.exists(embeddings_path) else None
+            os.utime(entry)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            index = self._load_index()
+            if digest in index:
+                index.move_to_end(digest)
+        logger.debug(f"Resume cache hit: {digest[:12]}")
+        return text, chunks, embeddings
+
+    def put(self, digest: str, text: str, chunks: List[str], embeddings: Optional[np.ndarray], model_name: str = EMBEDDING_MODEL_ID) -> None:
+        """
+        Store ingestion results for a PDF digest, writing each file atomically.
+        """
+        entry = self._entry(digest)
+        os.makedirs(entry, exist_ok=True)
+        self._write(os.path.join(entry, "text.txt"), text.encode("utf-8"))
+        self._write(os.path.join(entry, "chunks.json"), json.dumps(chunks).encode("utf-8"))
+        if embeddings is not None:
+            fd, tmp_path = tempfile.mkstemp(dir=entry, suffix=".npy")
+            with os.fdopen(fd, "wb") as f:
+                np.save(f, np.ascontiguousarray(embeddings, dtype=np.float32))
+            os.replace(tmp_path, os.path.join(entry, self._embeddings_name(model_name)))
+        self._enforce_limit(keep=digest)
+
+    @staticmethod
+    def _write(path: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _entry_bytes(self, digest: str) -> int:
+        path = self._entry(digest)
+        try:
+            return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+        except OSError:
+            return 0
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        """Build the LRU index from the directory on first use; call with the lock held."""
+        if self._index is None:
+            entries = []
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    path = os.path.join(self.root, name)
+                    if os.path.isdir(path):
+                        entries.append((os.path.getmtime(path), name, self._entry_bytes(name)))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self._total_bytes = sum(self._index.values())
+        return self._index
+
+    def _enforce_limit(self, keep: Optional[str] = None) -> None:
+        """Record keep's new size, then evict least recently used entries over max_bytes."""
+        size = self._entry_bytes(keep) if keep is not None else 0
+        with self._lock:
+            index = self._load_index()
+            if keep is not None:
+                self._total_bytes += size - index.pop(keep, 0)
+                index[keep] = size
+            for name in list(index):
+                if self._total_bytes <= self.max_bytes:
+                    break
+                if name == keep:
+                    continue
+                shutil.rmtree(self._entry(name), ignore_errors=True)
+                self._total_bytes -= index.pop(name)
+                self.evictions += 1
+                logger.debug(f"Evicted resume cache entry {name[:12]}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            index = self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(index),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+_cache = ResumeCache(RESUME_CACHE_DIR, RESUME_CACHE_MAX_BYTES) if RESUME_CACHE_MAX_BYTES > 0 else None
+
+def get_resume_cache_stats() -> dict:
+    """
+    Report resume cache size and hit rate ({"enabled": False} when disabled).
+    """
+    if _cache is None:
+        return {"enabled": False}
+    return dict(_cache.stats(), enabled=True)
+
+def _put_cached(digest: str, text: str, chunks: List[str], embeddings: Optional[np.ndarray]) -> None:
+    # A full or read-only cache directory must not fail an upload that is already ingested
+    try:
+        _cache.put(digest, text, chunks, embeddings)
+    except OSError as e:
+        logger.error(f"Failed to write resume cache entry: {str(e)}")
+
+def ingest_resume(pdf_bytes: bytes):
+    """
+    Extract, chunk and embed a resume PDF, reusing cached results for PDF bytes seen
+    before.
+    Returns:
+        tuple: (text, chunks, embeddings); text is "" if extraction failed and
+        embeddings is None if embedding failed.
+    """
+    start = time.perf_counter()
+    digest = ResumeCache.digest(pdf_bytes)
+    cached = _cache.get(digest) if _cache is not None else None
+    if cached is not None:
+        text, chunks, embeddings = cached
+        if embeddings is None or len(embeddings) != len(chunks):
+            embeddings = encode_texts(chunks) if chunks else None
+            if embeddings is not None:
+                _put_cached(digest, text, chunks, embeddings)
+        logger.debug(f"Ingested cached resume {digest[:12]} in {(time.perf_counter() - start) * 1000:.1f}ms")
+        return text, chunks, embeddings
+
+    text = extract_text_from_pdf(pdf_bytes)
+    if not text:
+        return "", [], None
+    chunks = chunk_text(text)
+    try:
+        with span("embed_chunks"):
+            embeddings = encode_texts(chunks) if chunks else None
+    except Exception as e:
+        logger.error(f"Failed to embed resume chunks: {str(e)}")
+        return text, [], None
+
+    if _cache is not None:
+        _put_cached(digest, text, chunks, embeddings)
+    logger.debug(f"Ingested resume {digest[:12]} in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return text, chunks, embeddings
+
+def _extract_timed(pdf_bytes: bytes) -> Tuple[str, float]:
+    start = time.perf_counter()
+    text = extract_text_from_pdf(pdf_bytes)
+    return text, time.perf_counter() - start
+
+def ingest_resumes(pdfs: List[bytes]):
+    """
+    Ingest many resume PDFs at once. Cached PDFs are served as in ingest_resume; the
+    rest are extracted in parallel (one thread per PDF worker process) and all their
+    chunks are encoded in a single batched call.
+    Returns:
+        list: (text, chunks, embeddings, extract_seconds) per PDF in input order, with
+        the same failure values as ingest_resume; extract_seconds is 0 for cache hits.
+    """
+    start = time.perf_counter()
+    results = [None] * len(pdfs)
+    digests = [ResumeCache.digest(pdf_bytes) for pdf_bytes in pdfs]
+    to_extract, to_encode = [], []
+    for i, digest in enumerate(digests):
+        cached = _cache.get(digest) if _cache is not None else None
+        if cached is None:
+            to_extract.append(i)
+            continue
+        text, chunks, embeddings = cached
+        results[i] = [text, chunks, embeddings, 0.0]
+        if embeddings is None or len(embeddings) != len(chunks):
+            to_encode.append(i)
+
+    if to_extract:
+        with ThreadPoolExecutor(max_workers=max(PDF_WORKERS, 1), thread_name_prefix="resume-extract") as pool:
+            extracted = pool.map(_extract_timed, [pdfs[i] for i in to_extract])
+            for i, (text, seconds) in zip(to_extract, extracted):
+                results[i] = [text, chunk_text(text) if text else [], None, seconds]
+                to_encode.append(i)
+
+    to_encode = [i for i in to_encode if results[i][1]]
+    texts = [chunk for i in to_encode for chunk in results[i][1]]
+    embeddings = None
+    if texts:
+        try:
+            with span("embed_chunks"):
+                embeddings = encode_texts(texts)
+        except Exception as e:
+            logger.error(f"Failed to embed resume chunks: {str(e)}")
+
+    offset = 0
+    for i in to_encode:
+        text, chunks = results[i][:2]
+        if embeddings is None:
+            results[i][1] = []
+            continue
+        results[i][2] = embeddings[offset:offset + len(chunks)]
+        offset += len(chunks)
+        if _cache is not None:
+            _put_cached(digests[i], text, chunks, results[i][2])
+
+    logger.debug(
+        f"Ingested {len(pdfs)} resumes ({len(pdfs) - len(to_extract)} cached, {len(texts)} chunks encoded) "
+        f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+    )
+    return [tuple(result) for result in results]
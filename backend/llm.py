@@ -0,0 +1,145 @@
+import asyncio
+import importlib
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+from metrics import inc, record_stage
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+DEEPSEEK_BASE_URL = os.getenv("DEEPSEEK_BASE_URL", "https://api.deepseek.com")
+DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
+
+# Per-process limits: completions in flight, pooled connections and timeouts
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "64"))
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "1"))
+
+_client: Optional["AsyncOpenAI"] = None
+_semaphore: Optional[asyncio.Semaphore] = None
+_stats = {"requests": 0, "in_flight": 0, "waiting": 0, "errors": 0, "timeouts": 0}
+
+def get_client() -> "AsyncOpenAI":
+    """
+    Get the shared async DeepSeek client backed by a pooled HTTP client.
+    """
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI  # Deferred: the SDK takes most of a second to import
+        http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=LLM_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_MAX_CONNECTIONS
+            ),
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=LLM_CONNECT_TIMEOUT_SECONDS)
+        )
+        _client = AsyncOpenAI(
+            api_key=DEEPSEEK_API_KEY,
+            base_url=DEEPSEEK_BASE_URL,
+            http_client=http_client,
+            max_retries=LLM_MAX_RETRIES
+        )
+        logger.info(f"Created DeepSeek client for {DEEPSEEK_BASE_URL} (concurrency {LLM_MAX_CONCURRENCY})")
+    return _client
+
+async def warmup_client() -> None:
+    """
+    Import the SDK on a worker thread and create the shared client, so the first
+    completion does not block the event loop on the import.
+    """
+    await asyncio.to_thread(importlib.import_module, "openai")
+    get_client()
+
+async def close_client() -> None:
+    """
+    Close the shared client and its connection pool.
+    """
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphore
+
+async def stream_chat(messages: List[Dict[str, str]], max_tokens: int = 150, temperature: float = 0.7) -> AsyncIterator[str]:
+    """
+    Stream completion text deltas, holding one of the per-process concurrency slots
+    for the whole stream. Raises asyncio.TimeoutError if the stream exceeds
+    LLM_TIMEOUT_SECONDS.
+    """
+    _stats["waiting"] += 1
+    try:
+        await _get_semaphore().acquire()
+    finally:
+        _stats["waiting"] -= 1
+    _stats["in_flight"] += 1
+    _stats["requests"] += 1
+    inc("llm_requests_total")
+    inc("llm_prompt_tokens_total", sum(len(message["content"]) for message in messages) // 4)
+    start = time.perf_counter()
+    first_token = None
+    completion_tokens = 0
+    try:
+        async with asyncio.timeout(LLM_TIMEOUT_SECONDS):
+            stream = await get_client().chat.completions.create(
+                model=DEEPSEEK_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content is not None:
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        record_stage("llm_ttft", first_token - start)
+                    completion_tokens += 1
+                    yield chunk.choices[0].delta.content
+        record_stage("llm_total", time.perf_counter() - start)
+        logger.debug(f"LLM stream finished in {time.perf_counter() - start:.2f}s")
+    except TimeoutError:
+        _stats["timeouts"] += 1
+        inc("errors_total", stage="llm_timeout")
+        raise
+    except Exception:
+        _stats["errors"] += 1
+        inc("errors_total", stage="llm")
+        raise
+    finally:
+        inc("llm_completion_tokens_total", completion_tokens)
+        _stats["in_flight"] -= 1
+        _get_semaphore().release()
+
+async def complete_chat(messages: List[Dict[str, str]], max_tokens: int = 150, temperature: float = 0.7) -> str:
+    """
+    Run a completion and return the full text.
+    """
+    parts = []
+    async for delta in stream_chat(messages, max_tokens=max_tokens, temperature=temperature):
+        parts.append(delta)
+    return "".join(parts)
+
+def get_llm_stats() -> dict:
+    """
+    Report request, in-flight, queued, error and timeout counts for the LLM client.
+    """
+    return dict(_stats, max_concurrency=LLM_MAX_CONCURRENCY)
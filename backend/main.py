@@ -1,8 +1,18 @@
 from fastapi import FastAPI, File, Form, UploadFile, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from memory import create_session, get_phase, set_phase, log_message, get_history, should_continue_interview, mark_interview_over, mark_awaiting_candidate_question, is_candidate_questioning, get_all_session_ids, clear_session
-from prompts import generate_greeting, generate_first_response_after_greeting, generate_followup_question, generate_end_of_interview_question, generate_answer_to_candidate, generate_feedback
-from utils import extract_text_from_pdf, chunk_text, create_index, search_similar, extract_keywords
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from memory import create_session, create_sessions, get_phase, set_phase, log_message, get_history, should_continue_interview, mark_interview_over, mark_awaiting_candidate_question, is_candidate_questioning, get_all_session_ids, session_exists, get_question_count, clear_session, get_session_stats, sweep_sessions, SESSION_SWEEP_INTERVAL_SECONDS, attach_documents, set_ingestion_status, get_ingestion_status, track_ingestion, wait_for_ingestion
+from prompts import stream_tokens, build_session_profile, generate_greeting, generate_first_response_after_greeting, generate_followup_question, generate_end_of_interview_question, generate_answer_to_candidate, precompute_feedback, get_or_generate_feedback, summarize_phase_in_background, get_prompt_stats, fill_prompt_pools, get_prompt_pool_stats
+from llm import close_client, get_llm_stats, warmup_client
+from metrics import inc, observe, register_gauge, render_prometheus, start_trace, get_trace, format_server_timing
+from ingest_cache import ingest_resume, ingest_resumes, get_resume_cache_stats
+from vector_store import SessionVectors
+from utils import chunk_text, embed_chunks, extract_keywords, warmup_models, get_model_stats, shutdown_pdf_pool
+from typing import Awaitable, Callable, List, Optional
+import asyncio
+import json
+import os
+import time
 import uuid
 import logging
 import re
@@ -11,8 +21,94 @@ import re
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
+# Candidate answers that are questions, and replies that end the closing Q&A
+QUESTION_PATTERN = re.compile(r'\?$|\b(how|what|why|when|where|who|can you|could you|tell me|does|do you)\b', re.IGNORECASE)
+NO_MORE_QUESTIONS = frozenset({"no", "nah", "i'm good", "none", "nothing"})
+
+# Largest resume accepted. Starlette spools uploads to disk past 1 MiB, so only the
+# PDF itself is ever held in memory, and only once it has passed the checks below
+MAX_RESUME_BYTES = int(os.getenv("MAX_RESUME_BYTES", str(10 * 1024 * 1024)))
+# Most resumes accepted by one /screen-candidates request
+MAX_SCREENING_RESUMES = int(os.getenv("MAX_SCREENING_RESUMES", "50"))
+# Resumes /screen-candidates reads into memory and ingests at a time
+SCREENING_BATCH_SIZE = max(int(os.getenv("SCREENING_BATCH_SIZE", "8")), 1)
+# Allowance for the other form fields (Starlette caps each at 1 MiB) and multipart framing
+UPLOAD_FORM_OVERHEAD_BYTES = 2 * 1024 * 1024
+# Largest request body per upload route, with the message it is rejected with
+UPLOAD_LIMITS = {
+    "/start-interview": (MAX_RESUME_BYTES, f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MiB"),
+    "/start-interview/stream": (MAX_RESUME_BYTES, f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MiB"),
+    "/screen-candidates": (
+        MAX_RESUME_BYTES * MAX_SCREENING_RESUMES,
+        f"Resumes must total at most {MAX_RESUME_BYTES * MAX_SCREENING_RESUMES // (1024 * 1024)} MiB"
+    ),
+}
+# PDF readers accept the header anywhere in the first 1 KiB
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+class LimitUploadSize:
+    """
+    Reject resume uploads over the limit in UPLOAD_LIMITS. A declared Content-Length is
+    checked before the body is read; otherwise (chunked uploads) the body is counted as
+    it arrives and the request is answered with 413 as soon as it passes the limit. The
+    route then sees a client disconnect, and anything it sends is dropped.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        limit = UPLOAD_LIMITS.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_bytes, detail = limit[0] + UPLOAD_FORM_OVERHEAD_BYTES, limit[1]
+        reject = JSONResponse(status_code=413, content={"detail": detail})
+        try:
+            declared = int(dict(scope["headers"]).get(b"content-length", b"0"))
+        except ValueError:
+            declared = 0
+        if declared > max_bytes:
+            await reject(scope, receive, send)
+            return
+
+        received = 0
+        rejected = False
+        response_started = False
+
+        async def counted_receive():
+            nonlocal received, rejected
+            if rejected:
+                return {"type": "http.disconnect"}
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    rejected = True
+                    if not response_started:
+                        await reject(scope, receive, send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal response_started
+            if rejected:
+                return
+            response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, counted_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
 app = FastAPI()
 
+# Before CORS, so CORS wraps it and its 413s carry the CORS headers
+app.add_middleware(LimitUploadSize)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -22,10 +118,123 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+register_gauge("sessions_active", "Interview sessions currently stored.", lambda: get_session_stats()["count"])
+register_gauge("llm_in_flight", "LLM completions currently streaming.", lambda: get_llm_stats()["in_flight"])
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Count and time every request by route. A request with an X-Trace header also gets
+    its stage timings back in a Server-Timing header (streamed replies, whose headers go
+    out before the work is done, carry them in the final event instead).
+    """
+    spans = start_trace() if "x-trace" in request.headers else None
+    start = time.perf_counter()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    path = getattr(route, "path", "unmatched")
+    observe("http_request_duration_seconds", time.perf_counter() - start, path=path)
+    inc("http_requests_total", path=path, status=response.status_code)
+    if spans:
+        response.headers["Server-Timing"] = format_server_timing(spans)
+    return response
+
+@app.on_event("startup")
+async def load_models():
+    """
+    Load and warm up the shared embedding model in the background so the app serves
+    (and /healthz answers) immediately; /readyz reports when the model is loaded.
+    Requests that need the model before then wait for the same load.
+    """
+    app.state.model_warmup = asyncio.create_task(asyncio.to_thread(warmup_models))
+    app.state.model_warmup.add_done_callback(_report_warmup)
+
+def _report_warmup(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Embedding model warmup failed: {str(task.exception())}")
+
+async def _sweep_sessions_periodically():
+    while True:
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL_SECONDS)
+        try:
+            await asyncio.to_thread(sweep_sessions)
+        except Exception as e:
+            logger.error(f"Session sweep failed: {str(e)}")
+
+@app.on_event("startup")
+async def start_session_sweeper():
+    """Evict idle and over-budget sessions in the background."""
+    if SESSION_SWEEP_INTERVAL_SECONDS > 0:
+        app.state.session_sweeper = asyncio.create_task(_sweep_sessions_periodically())
+
+async def _warm_up_llm():
+    await warmup_client()
+    await fill_prompt_pools()
+
+@app.on_event("startup")
+async def start_prompt_pools():
+    """Create the LLM client and pre-generate greeting and wrap-up variants in the background."""
+    app.state.prompt_pools = asyncio.create_task(_warm_up_llm())
+
+@app.on_event("shutdown")
+async def stop_prompt_pools():
+    """Stop filling the prompt pools if startup filling is still running."""
+    filling = getattr(app.state, "prompt_pools", None)
+    if filling is not None:
+        filling.cancel()
+
+@app.on_event("shutdown")
+async def stop_session_sweeper():
+    """Stop the background session sweeper."""
+    sweeper = getattr(app.state, "session_sweeper", None)
+    if sweeper is not None:
+        sweeper.cancel()
+
+@app.on_event("shutdown")
+async def stop_pdf_pool():
+    """Stop the PDF extraction worker processes."""
+    await asyncio.to_thread(shutdown_pdf_pool)
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    """Close pooled LLM connections."""
+    await close_client()
+
+@app.get("/healthz")
+async def healthz():
+    """Liveness: the process is up and serving requests."""
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    """Readiness: the embedding model is loaded and warmed up."""
+    warmup = getattr(app.state, "model_warmup", None)
+    if warmup is None or not warmup.done():
+        return JSONResponse(status_code=503, content={"status": "warming_up"})
+    if warmup.exception() is not None:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": str(warmup.exception())})
+    return {"status": "ready"}
+
+@app.get("/models")
+async def model_stats():
+    """Report loaded embedding models, process memory, LLM client load, resume cache, prompt sizes and prompt pools."""
+    return {
+        **get_model_stats(),
+        "llm": get_llm_stats(),
+        "resume_cache": get_resume_cache_stats(),
+        "prompts": get_prompt_stats(),
+        "prompt_pools": get_prompt_pool_stats()
+    }
+
+@app.get("/metrics")
+async def metrics():
+    """Expose counters and stage latency histograms in the Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
 @app.get("/sessions")
 async def list_sessions():
-    """List all active session IDs."""
-    return {"sessions": get_all_session_ids()}
+    """List all active session IDs with counts, memory use and evictions."""
+    return {"sessions": get_all_session_ids(), "stats": get_session_stats()}
 
 @app.delete("/sessions/{session_id}")
 async def delete_session(session_id: str):
@@ -33,84 +242,278 @@ async def delete_session(session_id: str):
     clear_session(session_id)
     return {"message": f"Session {session_id} deleted"}
 
-@app.post("/start-interview")
-async def start_interview(request: Request, name: str = Form(...), resume: UploadFile = File(...), job_description: str = Form(None)):
-    """Start a new interview session."""
-    try:
-        logger.debug(f"Request headers: {dict(request.headers)}")
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def _stream_reply(turn: Callable[[], Awaitable[dict]], start: float) -> StreamingResponse:
+    """
+    Run a turn and stream its reply as Server-Sent Events: "token" events append text,
+    "reset" discards the preview, and "done" carries the final JSON payload together
+    with time-to-first-token and total latency measured from the request start.
+    """
+    async def events():
+        queue = asyncio.Queue()
+
+        def sink(event: str, field: str, text: str) -> None:
+            queue.put_nowait((event, {"field": field, "text": text}))
+
+        async def run() -> dict:
+            with stream_tokens(sink):
+                return await turn()
+
+        task = asyncio.create_task(run())
+        task.add_done_callback(lambda _: queue.put_nowait(None))
+        first_token_ms = None
+        while (item := await queue.get()) is not None:
+            event, data = item
+            if event == "token" and first_token_ms is None:
+                first_token_ms = round((time.perf_counter() - start) * 1000, 1)
+            yield _sse(event, data)
+        
         try:
-            raw_body = await request.body()
-            logger.debug(f"Raw request body (first 100 bytes): {raw_body[:100]}")
+            payload = task.result()
+        except HTTPException as e:
+            yield _sse("error", {"status_code": e.status_code, "detail": e.detail})
+            return
         except Exception as e:
-            logger.error(f"Failed to read raw body: {str(e)}")
-        
-        if not resume.filename.endswith(".pdf"):
-            raise HTTPException(status_code=400, detail="Resume must be a PDF file")
-        
-        session_id = str(uuid.uuid4())
-        
-        resume_bytes = await resume.read()
-        resume_text = extract_text_from_pdf(resume_bytes)
+            logger.error(f"Streaming turn failed: {str(e)}")
+            yield _sse("error", {"status_code": 500, "detail": "Failed to generate reply"})
+            return
+        total_ms = round((time.perf_counter() - start) * 1000, 1)
+        logger.info(f"Streamed reply: first token {first_token_ms}ms, total {total_ms}ms")
+        done = {**payload, "ttft_ms": first_token_ms, "total_ms": total_ms}
+        spans = get_trace()
+        if spans is not None:
+            done["trace"] = [{"stage": stage, "ms": round(ms, 1)} for stage, ms in spans]
+        yield _sse("done", done)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def _ingest_documents(session_id: str, resume_bytes: bytes, job_description: Optional[str]) -> None:
+    """Extract, chunk and embed the resume and job description, then build the session profile."""
+    try:
+        resume_text, resume_chunks, resume_embeddings = await asyncio.to_thread(ingest_resume, resume_bytes)
         if not resume_text:
-            raise HTTPException(status_code=400, detail="Failed to extract text from resume")
-        
-        resume_chunks = chunk_text(resume_text)
-        resume_index, resume_chunks = create_index(resume_chunks)
-        if resume_index is None:
-            raise HTTPException(status_code=500, detail="Failed to create index for resume")
+            set_ingestion_status(session_id, "failed", 400, "Failed to extract text from resume")
+            return
+        if resume_embeddings is None:
+            set_ingestion_status(session_id, "failed", 500, "Failed to create index for resume")
+            return
         
         job_desc_text = job_description if job_description else ""
         job_desc_chunks = chunk_text(job_desc_text) if job_desc_text else []
-        job_desc_index = create_index(job_desc_chunks)[0] if job_desc_chunks else None
+        job_desc_embeddings = await asyncio.to_thread(embed_chunks, job_desc_chunks)
+        vectors = SessionVectors.from_embeddings({"resume": resume_embeddings, "job_description": job_desc_embeddings})
         
-        create_session(
-            session_id=session_id,
-            user_name=name,
-            resume_chunks=resume_chunks,
-            resume_index=resume_index,
-            resume_text=resume_text,
-            job_desc_chunks=job_desc_chunks,
-            job_desc_index=job_desc_index,
-            job_desc_text=job_desc_text
-        )
-        set_phase(session_id, "greeting")
-        
-        greeting = generate_greeting(name)
-        log_message(session_id, "ai", greeting)
-        
-        logger.debug(f"Started session: {session_id}, Question: {greeting}")
-        return {
-            "session_id": session_id,
-            "question": greeting,
-            "is_interview_over": False,
-            "audio_url": None
-        }
+        attach_documents(session_id, resume_chunks, resume_text, job_desc_chunks, job_desc_text, vectors)
+        await build_session_profile(session_id)
+        set_ingestion_status(session_id, "ready")
+    except Exception as e:
+        logger.error(f"Ingestion failed for session {session_id}: {str(e)}")
+        set_ingestion_status(session_id, "failed", 500, "Failed to create index for resume")
+
+async def _read_resume(resume: UploadFile) -> bytes:
+    """
+    Check the spooled upload's size and PDF signature, then read it into memory once.
+    The returned bytes are handed to PyMuPDF as-is.
+    """
+    too_large = HTTPException(status_code=413, detail=f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MiB")
+    if resume.size is not None and resume.size > MAX_RESUME_BYTES:
+        raise too_large
+    if PDF_MAGIC not in await resume.read(PDF_HEADER_WINDOW):
+        raise HTTPException(status_code=400, detail="Resume must be a PDF file")
+    await resume.seek(0)
+    resume_bytes = await resume.read(MAX_RESUME_BYTES + 1)
+    if len(resume_bytes) > MAX_RESUME_BYTES:
+        raise too_large
+    return resume_bytes
+
+async def _prepare_interview(request: Request, name: str, resume: UploadFile, job_description: Optional[str]) -> str:
+    """Create the session and start ingesting its documents in the background; returns its ID."""
+    logger.debug(f"Request headers: {dict(request.headers)}")
     
-    except ValueError as e:
-        logger.error(f"Form validation error: {str(e)}")
-        raise HTTPException(
-            status_code=400,
-            detail=f"Invalid form data: {str(e)}. Ensure request is multipart/form-data with 'name' (string), 'resume' (PDF file), and optional 'job_description' (string)."
-        )
+    if not resume.filename.endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Resume must be a PDF file")
+    
+    session_id = str(uuid.uuid4())
+    resume_bytes = await _read_resume(resume)
+    
+    # The greeting does not need the resume, so it is generated while ingestion runs
+    create_session(
+        session_id=session_id,
+        user_name=name,
+        resume_chunks=[],
+        resume_text="",
+        job_desc_chunks=[],
+        job_desc_text=""
+    )
+    set_phase(session_id, "greeting")
+    set_ingestion_status(session_id, "pending")
+    track_ingestion(session_id, asyncio.create_task(_ingest_documents(session_id, resume_bytes, job_description)))
+    return session_id
 
-@app.post("/next-question")
-async def next_question(session_id: str = Form(...), answer: str = Form(...)):
-    """Generate the next question or handle candidate question."""
-    if session_id not in get_all_session_ids():
-        raise HTTPException(status_code=404, detail="Session not found")
+async def _greet(session_id: str, name: str) -> dict:
+    greeting = await generate_greeting(name)
+    await asyncio.to_thread(log_message, session_id, "ai", greeting)
     
+    logger.debug(f"Started session: {session_id}, Question: {greeting}")
+    return {
+        "session_id": session_id,
+        "question": greeting,
+        "is_interview_over": False,
+        "audio_url": None
+    }
+
+def _form_error(e: ValueError) -> HTTPException:
+    logger.error(f"Form validation error: {str(e)}")
+    return HTTPException(
+        status_code=400,
+        detail=f"Invalid form data: {str(e)}. Ensure request is multipart/form-data with 'name' (string), 'resume' (PDF file), and optional 'job_description' (string)."
+    )
+
+@app.post("/start-interview")
+async def start_interview(request: Request, name: str = Form(...), resume: UploadFile = File(...), job_description: str = Form(None)):
+    """Start a new interview session."""
+    try:
+        session_id = await _prepare_interview(request, name, resume, job_description)
+        response = await _greet(session_id, name)
+        # Ingestion that already failed is reported now, as before; a later failure
+        # surfaces on the first /next-question
+        status = get_ingestion_status(session_id)
+        if status["status"] == "failed":
+            clear_session(session_id)
+            raise HTTPException(status_code=status["status_code"], detail=status["detail"])
+        return response
+    except ValueError as e:
+        raise _form_error(e)
+
+@app.post("/start-interview/stream")
+async def start_interview_stream(request: Request, name: str = Form(...), resume: UploadFile = File(...), job_description: str = Form(None)):
+    """Start a new interview session, streaming the greeting as Server-Sent Events."""
+    start = time.perf_counter()
+    try:
+        session_id = await _prepare_interview(request, name, resume, job_description)
+    except ValueError as e:
+        raise _form_error(e)
+    return _stream_reply(lambda: _greet(session_id, name), start)
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 1)
+
+async def _timed(awaitable: Awaitable) -> tuple:
+    start = time.perf_counter()
+    return await awaitable, _elapsed_ms(start)
+
+@app.post("/screen-candidates")
+async def screen_candidates(resumes: List[UploadFile] = File(...), job_description: str = Form(...), names: List[str] = Form(None)):
+    """
+    Create interview sessions for many candidates applying to one job description.
+    The job description is chunked and embedded once; the resumes are read and
+    ingested SCREENING_BATCH_SIZE at a time (extracted in parallel, their chunks
+    encoded together), so only one batch of PDFs is in memory, and the sessions are
+    written in one go. Returns each candidate's session ID and greeting (or why they were rejected)
+    with per-candidate and per-stage timings.
+    """
+    start = time.perf_counter()
+    if len(resumes) > MAX_SCREENING_RESUMES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SCREENING_RESUMES} resumes per request")
+    if names and len(names) != len(resumes):
+        raise HTTPException(status_code=400, detail="Provide one name per resume, or none")
+    names = names or [os.path.splitext(os.path.basename(resume.filename or ""))[0] or f"Candidate {i + 1}" for i, resume in enumerate(resumes)]
+    candidates = [
+        {"name": name, "filename": resume.filename, "session_id": None, "status": "pending", "timings": {}}
+        for name, resume in zip(names, resumes)
+    ]
+    timings = {}
+
+    def reject(i: int, status: str, status_code: int, detail: str) -> None:
+        candidates[i].update({"status": status, "status_code": status_code, "detail": detail})
+
+    stage = time.perf_counter()
+    job_desc_chunks = chunk_text(job_description)
+    job_desc_embeddings = await asyncio.to_thread(embed_chunks, job_desc_chunks)
+    timings["job_description_ms"] = _elapsed_ms(stage)
+    if job_desc_chunks and job_desc_embeddings is None:
+        raise HTTPException(status_code=500, detail="Failed to create index for job description")
+
+    timings["read_ms"] = timings["ingest_ms"] = 0.0
+    new_sessions = []
+    for batch_start in range(0, len(resumes), SCREENING_BATCH_SIZE):
+        stage = time.perf_counter()
+        pdfs = {}
+        for i in range(batch_start, min(batch_start + SCREENING_BATCH_SIZE, len(resumes))):
+            if not (resumes[i].filename or "").endswith(".pdf"):
+                reject(i, "rejected", 400, "Resume must be a PDF file")
+                continue
+            try:
+                pdfs[i] = await _read_resume(resumes[i])
+            except HTTPException as e:
+                reject(i, "rejected", e.status_code, e.detail)
+        timings["read_ms"] += _elapsed_ms(stage)
+
+        stage = time.perf_counter()
+        ingested = await asyncio.to_thread(ingest_resumes, list(pdfs.values()))
+        timings["ingest_ms"] += _elapsed_ms(stage)
+
+        for i, (resume_text, resume_chunks, resume_embeddings, extract_seconds) in zip(pdfs, ingested):
+            candidates[i]["timings"]["extract_ms"] = round(extract_seconds * 1000, 1)
+            if not resume_text:
+                reject(i, "failed", 400, "Failed to extract text from resume")
+            elif resume_embeddings is None:
+                reject(i, "failed", 500, "Failed to create index for resume")
+            else:
+                vectors = SessionVectors.from_embeddings({"resume": resume_embeddings, "job_description": job_desc_embeddings})
+                candidates[i]["session_id"] = str(uuid.uuid4())
+                new_sessions.append((candidates[i]["session_id"], candidates[i]["name"], resume_chunks, resume_text, vectors))
+    timings["read_ms"] = round(timings["read_ms"], 1)
+    timings["ingest_ms"] = round(timings["ingest_ms"], 1)
+    stage = time.perf_counter()
+    await asyncio.to_thread(create_sessions, job_desc_chunks, job_description, new_sessions)
+    timings["sessions_ms"] = _elapsed_ms(stage)
+
+    ready = [candidate for candidate in candidates if candidate["session_id"] is not None]
+    stage = time.perf_counter()
+    profiles = await asyncio.gather(
+        *(_timed(build_session_profile(candidate["session_id"])) for candidate in ready), return_exceptions=True
+    )
+    timings["profiles_ms"] = _elapsed_ms(stage)
+    stage = time.perf_counter()
+    greetings = await asyncio.gather(*(_timed(generate_greeting(candidate["name"])) for candidate in ready))
+    timings["greetings_ms"] = _elapsed_ms(stage)
+
+    for candidate, profile, (greeting, greeting_ms) in zip(ready, profiles, greetings):
+        if isinstance(profile, Exception):
+            # The first question builds the profile again if it is still missing
+            logger.error(f"Profile build failed for session {candidate['session_id']}: {str(profile)}")
+        else:
+            candidate["timings"]["profile_ms"] = profile[1]
+        await asyncio.to_thread(log_message, candidate["session_id"], "ai", greeting)
+        candidate["timings"]["greeting_ms"] = greeting_ms
+        candidate.update({"status": "ready", "question": greeting})
+    timings["total_ms"] = _elapsed_ms(start)
+
+    logger.info(f"Screened {len(candidates)} candidates ({len(ready)} ready) in {timings['total_ms']}ms")
+    return {"job_description_chunks": len(job_desc_chunks), "candidates": candidates, "timings": timings}
+
+async def _answer(session_id: str, answer: str) -> dict:
+    await asyncio.to_thread(log_message, session_id, "user", answer)
+    # Read after logging so the history includes this answer whatever the session store
     history = get_history(session_id)
-    log_message(session_id, "user", answer)
     
     # Check if the answer is a question
-    is_question = bool(re.search(r'\?$|\b(how|what|why|when|where|who|can you|could you|tell me|does|do you)\b', answer.lower().strip(), re.IGNORECASE))
+    is_question = bool(QUESTION_PATTERN.search(answer.lower().strip()))
     current_phase = get_phase(session_id)
     
     # Handle closing phase or candidate questions
     if current_phase == "closing" or is_candidate_questioning(session_id):
-        if answer.lower().strip() in ["no", "nah", "i'm good", "none", "nothing"]:
+        if answer.lower().strip() in NO_MORE_QUESTIONS:
             mark_interview_over(session_id)
-            feedback = generate_feedback(history)
+            inc("turns_total", kind="feedback")
+            feedback = await get_or_generate_feedback(session_id, history)
             logger.debug(f"Generated feedback: {feedback}")
             return {
                 "question": "Thanks for your time! Here's your feedback below.",
@@ -119,9 +522,11 @@ async def next_question(session_id: str = Form(...), answer: str = Form(...)):
                 "audio_url": None
             }
         if is_question:
-            response = generate_answer_to_candidate(answer, history, session_id)
-            log_message(session_id, "ai", response)
+            inc("turns_total", kind="candidate_question")
+            response = await generate_answer_to_candidate(answer, history, session_id)
+            await asyncio.to_thread(log_message, session_id, "ai", response)
             mark_awaiting_candidate_question(session_id, done=False)
+            precompute_feedback(session_id)
             logger.debug(f"Generated candidate answer: {response}")
             return {
                 "question": response,
@@ -129,12 +534,19 @@ async def next_question(session_id: str = Form(...), answer: str = Form(...)):
                 "audio_url": None
             }
     
+    # Questions draw on the session vectors, which may still be building in the background
+    ingestion_error = await wait_for_ingestion(session_id)
+    if ingestion_error:
+        clear_session(session_id)
+        raise HTTPException(status_code=ingestion_error["status_code"], detail=ingestion_error["detail"])
+    
     # Generate next question based on phase
+    inc("turns_total", kind="question")
     if not history or current_phase == "greeting":
-        response = generate_first_response_after_greeting(session_id, answer)
+        response = await generate_first_response_after_greeting(session_id, answer)
         set_phase(session_id, "project")
     elif should_continue_interview(session_id, history):
-        response = generate_followup_question(session_id, history)
+        response = await generate_followup_question(session_id, history)
         phase_map = {
             1: "project",
             2: "project_2",
@@ -147,16 +559,23 @@ async def next_question(session_id: str = Form(...), answer: str = Form(...)):
             9: "role-fit",
             10: "closing"
         }
-        question_count = len([m for m in history if m["role"] == "ai" and m["content"].endswith("?")])
+        question_count = get_question_count(session_id)
         next_phase = phase_map.get(question_count + 1, "closing")
         set_phase(session_id, next_phase)
     else:
-        response = generate_end_of_interview_question()
+        response = await generate_end_of_interview_question()
         set_phase(session_id, "closing")
         mark_awaiting_candidate_question(session_id)
     
-    log_message(session_id, "ai", response)
+    # The phase just answered is finished; compress it while the interview goes on
+    if get_phase(session_id) != current_phase:
+        summarize_phase_in_background(session_id, current_phase)
+    
+    await asyncio.to_thread(log_message, session_id, "ai", response)
     logger.debug(f"Generated question: {response}, Phase: {current_phase}")
+    # The candidate can end the interview from here, so have feedback ready
+    if is_candidate_questioning(session_id):
+        precompute_feedback(session_id)
     
     return {
         "question": response,
@@ -164,17 +583,32 @@ async def next_question(session_id: str = Form(...), answer: str = Form(...)):
         "audio_url": None
     }
 
+@app.post("/next-question")
+async def next_question(session_id: str = Form(...), answer: str = Form(...)):
+    """Generate the next question or handle candidate question."""
+    if not session_exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return await _answer(session_id, answer)
+
+@app.post("/next-question/stream")
+async def next_question_stream(session_id: str = Form(...), answer: str = Form(...)):
+    """Generate the next question, streaming it as Server-Sent Events."""
+    start = time.perf_counter()
+    if not session_exists(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return _stream_reply(lambda: _answer(session_id, answer), start)
+
 @app.post("/feedback")
 async def get_feedback(session_id: str = Form(...)):
     """Generate feedback for a completed interview."""
-    if session_id not in get_all_session_ids():
+    if not session_exists(session_id):
         raise HTTPException(status_code=404, detail="Session not found")
     
     history = get_history(session_id)
     if not history or get_phase(session_id) != "closing":
         raise HTTPException(status_code=400, detail="Interview not completed")
     
-    feedback = generate_feedback(history)
+    feedback = await get_or_generate_feedback(session_id, history)
     logger.debug(f"Generated feedback: {feedback}")
     return {
         "feedback": feedback,
@@ -1,14 +1,40 @@
+import asyncio
+import os
+import threading
+import time
 import uuid
-from typing import Dict, List, Optional, Tuple
-from utils import extract_keywords, search_similar
-from sentence_transformers import SentenceTransformer
+from typing import Callable, Dict, List, Optional, Tuple
+from utils import extract_keywords, search_documents, get_model
+from vector_store import SessionVectors
+from session import Session, estimate_session_bytes, is_question
+from session_store import SessionStore, create_store
+from metrics import inc, span
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-_sessions: Dict[str, dict] = {}
+# Selected by SESSION_STORE / SESSION_DB_PATH; see session_store.py
+_store: SessionStore = create_store()
+
+# Eviction limits; 0 disables a limit
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "3600"))
+SESSION_MAX_COUNT = int(os.getenv("SESSION_MAX_COUNT", "1000"))
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(512 * 1024 * 1024)))
+SESSION_SWEEP_INTERVAL_SECONDS = float(os.getenv("SESSION_SWEEP_INTERVAL_SECONDS", "60"))
+
+# "lazy" computes message keywords and retrieval context only when asked for them
+# (get_message_annotations); "eager" restores annotating every message as it is logged
+MESSAGE_ANNOTATIONS = os.getenv("MESSAGE_ANNOTATIONS", "lazy")
+
+# Session sizes for the byte budget are Session.nbytes, kept by the store (see
+# SessionStore.sizes) so every worker sharing it sees the same totals
+_evictions = {"idle": 0, "max_sessions": 0, "max_bytes": 0}
+_eviction_lock = threading.Lock()
+
+# Background resume/JD ingestion tasks started by this process, by session
+_ingestion_tasks: Dict[str, "asyncio.Task"] = {}
 
 # Defined phase order to align with prompts.py
 PHASE_ORDER = [
@@ -16,46 +42,144 @@ PHASE_ORDER = [
     "problem-solving", "coding", "behavioral", "behavioral_2", "role-fit", "closing"
 ]
 
+def _get(session_id: str) -> Session:
+    """
+    Get the session state, or an empty Session if the session does not exist.
+    """
+    return _store.get(session_id) or Session()
+
+def _save(session_id: str, session: Session) -> None:
+    """
+    Write a new session to the store and enforce the byte budget.
+    """
+    _store.put(session_id, session)
+    _after_write(session_id, session)
+
+def _update(session_id: str, fn: Callable[[Session], Optional[bool]]) -> Optional[Session]:
+    """
+    Change an existing session atomically (see SessionStore.update) and enforce the
+    byte budget. fn returning False skips the write. Returns None if the session
+    does not exist.
+    """
+    written = []
+
+    def apply(session: Session) -> bool:
+        written.append(fn(session) is not False)
+        return written[-1]
+
+    session = _store.update(session_id, apply)
+    if session is not None and written[-1]:
+        _after_write(session_id, session)
+    return session
+
+def _after_write(session_id: str, session: Session) -> None:
+    if SESSION_MAX_BYTES and _store.total_bytes() > SESSION_MAX_BYTES:
+        _enforce_limits(keep=(session_id,))
+
+def _evict(session_id: str, reason: str) -> None:
+    _store.delete(session_id)
+    _ingestion_tasks.pop(session_id, None)
+    with _eviction_lock:
+        _evictions[reason] += 1
+    logger.info(f"Evicted session {session_id} ({reason})")
+
+def _enforce_limits(keep: Tuple[str, ...] = ()) -> None:
+    """
+    Evict least recently used sessions until the count and byte limits hold.
+    Sessions in keep are never evicted.
+    """
+    over_count = len(_store) - SESSION_MAX_COUNT if SESSION_MAX_COUNT else 0
+    over_bytes = _store.total_bytes() - SESSION_MAX_BYTES if SESSION_MAX_BYTES else 0
+    if over_count <= 0 and over_bytes <= 0:
+        return
+    for session_id, size, _ in _store.sizes():
+        if over_count <= 0 and over_bytes <= 0:
+            break
+        if session_id in keep:
+            continue
+        _evict(session_id, "max_sessions" if over_count > 0 else "max_bytes")
+        over_count -= 1
+        over_bytes -= size
+
+def sweep_sessions() -> int:
+    """
+    Evict sessions idle for longer than SESSION_IDLE_TTL_SECONDS, then enforce the
+    count and byte limits. Returns the number of sessions evicted.
+    """
+    before = sum(_evictions.values())
+    if SESSION_IDLE_TTL_SECONDS:
+        for session_id in _store.idle_ids(time.time() - SESSION_IDLE_TTL_SECONDS):
+            _evict(session_id, "idle")
+    _enforce_limits()
+    evicted = sum(_evictions.values()) - before
+    if evicted:
+        logger.info(f"Session sweep evicted {evicted} sessions")
+    return evicted
+
+def get_session_stats() -> dict:
+    """
+    Report session count, estimated bytes (and the part held by chunk vectors), limits
+    and evictions by reason.
+    """
+    sessions = _store.sizes()
+    sizes = [size for _, size, _ in sessions]
+    vector_sizes = [size for _, _, size in sessions if size]
+    with _eviction_lock:
+        evictions = dict(_evictions)
+    return {
+        "count": len(sessions),
+        "bytes": sum(sizes),
+        "largest_session_bytes": max(sizes, default=0),
+        "vector_bytes": sum(vector_sizes),
+        "vector_bytes_per_session": round(sum(vector_sizes) / len(vector_sizes)) if vector_sizes else 0,
+        "max_sessions": SESSION_MAX_COUNT,
+        "max_bytes": SESSION_MAX_BYTES,
+        "idle_ttl_seconds": SESSION_IDLE_TTL_SECONDS,
+        "evictions": evictions
+    }
+
 def create_session(
     session_id: str,
     user_name: str,
     resume_chunks: List[str],
-    resume_index,
     resume_text: str,
     job_desc_chunks: List[str],
-    job_desc_index,
-    job_desc_text: str
+    job_desc_text: str,
+    vectors: Optional[SessionVectors] = None
 ) -> None:
     """
-    Create a new interview session.
-    """
-    _sessions[session_id] = {
-        "user_name": user_name,
-        "history": [],
-        "phase": "greeting",
-        "resume_chunks": resume_chunks,
-        "resume_index": resume_index,
-        "resume_text": resume_text,
-        "job_desc_chunks": job_desc_chunks,
-        "job_desc_index": job_desc_index,
-        "job_desc_text": job_desc_text,
-        "is_active": True,
-        "awaiting_candidate_question": False,
-        "model": SentenceTransformer('all-MiniLM-L6-v2') if resume_chunks else None,
-        "short_answers_count": 0,
-        "asked_topics": [],
-        "current_project": None,
-        "used_acks": [],
-        "tracked_context": [],
-        "used_transitions": []
-    }
+    Create a new interview session. vectors holds the embeddings of the resume and job
+    description chunks, in chunk order.
+    """
+    _save(session_id, Session(user_name, resume_chunks, resume_text, job_desc_chunks, job_desc_text, vectors))
+    _enforce_limits(keep=(session_id,))
+    inc("sessions_created_total")
     logger.debug(f"Created session: {session_id}")
 
+def create_sessions(
+    job_desc_chunks: List[str],
+    job_desc_text: str,
+    candidates: List[Tuple[str, str, List[str], str, Optional[SessionVectors]]]
+) -> None:
+    """
+    Create sessions for many candidates applying to one job description with a single
+    store write. Each candidate is (session_id, user_name, resume_chunks, resume_text,
+    vectors); the job description text and chunks are shared, not copied.
+    """
+    sessions = {
+        session_id: Session(user_name, resume_chunks, resume_text, job_desc_chunks, job_desc_text, vectors)
+        for session_id, user_name, resume_chunks, resume_text, vectors in candidates
+    }
+    _store.put_many(sessions)
+    _enforce_limits(keep=tuple(sessions))
+    inc("sessions_created_total", len(sessions))
+    logger.debug(f"Created {len(sessions)} sessions")
+
 def get_phase(session_id: str) -> str:
     """
     Get the current phase of the session.
     """
-    phase = _sessions.get(session_id, {}).get("phase", "greeting")
+    phase = _get(session_id).phase
     logger.debug(f"Retrieved phase: {phase} for session: {session_id}")
     return phase
 
@@ -63,54 +187,95 @@ def set_phase(session_id: str, phase: str) -> None:
     """
     Set the phase of the session, validating against PHASE_ORDER.
     """
-    if session_id in _sessions:
-        if phase in PHASE_ORDER or phase == "greeting":
-            _sessions[session_id]["phase"] = phase
-            logger.debug(f"Set phase: {phase} for session: {session_id}")
-        else:
-            logger.error(f"Invalid phase: {phase}")
-            raise ValueError(f"Phase {phase} not in {PHASE_ORDER}")
+    if phase not in PHASE_ORDER and phase != "greeting":
+        logger.error(f"Invalid phase: {phase}")
+        raise ValueError(f"Phase {phase} not in {PHASE_ORDER}")
+
+    def apply(session: Session) -> None:
+        session.phase = phase
+
+    if _update(session_id, apply) is not None:
+        logger.debug(f"Set phase: {phase} for session: {session_id}")
+
+def _annotate(session: Session, content: str) -> dict:
+    """
+    Compute a message's keywords and its closest resume and job description chunks.
+    """
+    with span("log_message_annotate"):
+        keywords = extract_keywords(content)
+        # Add context from resume and job description (limited to 3 results for speed)
+        results = search_documents([content], session.vectors, _chunks(session), get_model())
+    return {
+        "keywords": keywords,
+        "context": {
+            "resume": results["resume"][0],
+            "job_description": results["job_description"][0]
+        }
+    }
 
 def log_message(session_id: str, role: str, content: str) -> None:
     """
     Log a message in the session history and track AI questions in asked_topics.
     """
-    if session_id not in _sessions:
+    annotations = {}
+    if MESSAGE_ANNOTATIONS == "eager":
+        # Searched before the update so the session is not held while it runs
+        session = _store.get(session_id)
+        if session is not None:
+            annotations = _annotate(session, content)
+
+    def apply(session: Session) -> None:
+        message = {"role": role, "content": content, "phase": session.phase, **annotations}
+        # Also counts AI questions (question_count)
+        session.add_message(message)
+        
+        # Track short answers
+        if role == "user" and len(content.split()) < 10:
+            session.short_answers_count += 1
+        
+        # Track AI questions in asked_topics to prevent repeats
+        if is_question(role, content):
+            if session.add_asked_topic(content):
+                logger.debug(f"Added to asked_topics: {content[:50]}...")
+
+    if _update(session_id, apply) is None:
         logger.error(f"Session {session_id} not found")
         return
-    
-    session = _sessions[session_id]
-    keywords = extract_keywords(content)
-    message = {"role": role, "content": content, "keywords": keywords}
-    
-    # Add context from resume and job description (limited to 3 results for speed)
-    resume_results = search_similar(content, session.get("resume_index"), session.get("resume_chunks"), session.get("model"))[:3] if session.get("resume_index") else []
-    job_desc_results = search_similar(content, session.get("job_desc_index"), session.get("job_desc_chunks"), session.get("model"))[:3] if session.get("job_desc_index") else []
-    
-    message["context"] = {
-        "resume": resume_results,
-        "job_description": job_desc_results
-    }
-    
-    session["history"].append(message)
-    
-    # Track short answers
-    if role == "user" and len(content.split()) < 10:
-        session["short_answers_count"] = session.get("short_answers_count", 0) + 1
-    
-    # Track AI questions in asked_topics to prevent repeats
-    if role == "ai" and content.endswith("?"):
-        if content not in session["asked_topics"]:
-            session["asked_topics"].append(content)
-            logger.debug(f"Added to asked_topics: {content[:50]}...")
-    
     logger.debug(f"Logged {role}: {content[:50]}...")
 
+def get_message_annotations(session_id: str, position: int) -> Optional[dict]:
+    """
+    Get {"keywords", "context"} for the message at position in the history (negative
+    positions count from the end), computing and storing them on first use.
+    Returns None if the session or message does not exist.
+    """
+    session = _store.get(session_id)
+    if session is None:
+        return None
+    index = position if position >= 0 else len(session.history) + position
+    if not 0 <= index < len(session.history):
+        return None
+    message = session.history[index]
+    if "context" in message:
+        return {"keywords": message["keywords"], "context": message["context"]}
+    # Searched outside the update so the session is not held while it runs; the stored
+    # message is only changed inside it
+    annotations = _annotate(session, message["content"])
+
+    def apply(session: Session) -> bool:
+        if index >= len(session.history) or "context" in session.history[index]:
+            return False
+        session.annotate_message(index, annotations)
+        return True
+
+    _update(session_id, apply)
+    return annotations
+
 def get_history(session_id: str) -> List[dict]:
     """
     Get the session history.
     """
-    history = _sessions.get(session_id, {}).get("history", [])
+    history = _get(session_id).history
     logger.debug(f"Retrieved history length: {len(history)} for session: {session_id}")
     return history
 
@@ -118,13 +283,14 @@ def should_continue_interview(session_id: str, history: List[dict]) -> bool:
     """
     Determine if the interview should continue based on phase and questions.
     """
-    if session_id not in _sessions:
+    session = _store.get(session_id)
+    if session is None:
         logger.error(f"Session {session_id} not found")
         return False
     
-    phase = get_phase(session_id)
-    question_count = len([m for m in history if m["role"] == "ai" and m["content"].endswith("?")])
-    awaiting_question = is_candidate_questioning(session_id)
+    phase = session.phase
+    question_count = session.question_count
+    awaiting_question = session.awaiting_candidate_question
     
     # Continue if not in closing, or in closing with candidate questions
     result = (phase != "closing" or awaiting_question) and question_count < 12  # Allow extra for Q&A
@@ -135,24 +301,28 @@ def mark_interview_over(session_id: str) -> None:
     """
     Mark the interview as over.
     """
-    if session_id in _sessions:
-        _sessions[session_id]["is_active"] = False
-        _sessions[session_id]["awaiting_candidate_question"] = False
+    def apply(session: Session) -> None:
+        session.is_active = False
+        session.awaiting_candidate_question = False
+
+    if _update(session_id, apply) is not None:
         logger.debug(f"Marked interview over: {session_id}")
 
 def mark_awaiting_candidate_question(session_id: str, done: bool = False) -> None:
     """
     Mark the session as awaiting candidate questions.
     """
-    if session_id in _sessions:
-        _sessions[session_id]["awaiting_candidate_question"] = not done
+    def apply(session: Session) -> None:
+        session.awaiting_candidate_question = not done
+
+    if _update(session_id, apply) is not None:
         logger.debug(f"Awaiting candidate question: {not done} for session: {session_id}")
 
 def is_candidate_questioning(session_id: str) -> bool:
     """
     Check if the session is in candidate questioning phase.
     """
-    status = _sessions.get(session_id, {}).get("awaiting_candidate_question", False)
+    status = _get(session_id).awaiting_candidate_question
     logger.debug(f"Candidate questioning: {status} for session: {session_id}")
     return status
 
@@ -160,90 +330,230 @@ def get_all_session_ids() -> List[str]:
     """
     Get all active session IDs.
     """
-    return list(_sessions.keys())
+    return _store.ids()
+
+def session_exists(session_id: str) -> bool:
+    """
+    Check whether a session exists without listing every session ID.
+    """
+    return session_id in _store
+
+def get_question_count(session_id: str) -> int:
+    """
+    Get the number of interview questions asked so far (AI messages ending in "?").
+    """
+    return _get(session_id).question_count
 
 def clear_session(session_id: str) -> None:
     """
     Clear a session.
     """
-    if session_id in _sessions:
-        del _sessions[session_id]
+    if session_id in _store:
+        _store.delete(session_id)
+        task = _ingestion_tasks.pop(session_id, None)
+        if task is not None:
+            task.cancel()
         logger.debug(f"Cleared session: {session_id}")
 
-def get_resume_index(session_id: str) -> Tuple[Optional[object], List[str]]:
+def attach_documents(
+    session_id: str,
+    resume_chunks: List[str],
+    resume_text: str,
+    job_desc_chunks: List[str],
+    job_desc_text: str,
+    vectors: Optional[SessionVectors]
+) -> None:
     """
-    Get the resume index and chunks for the session.
+    Attach ingested resume and job description data to a session created without them.
     """
-    session = _sessions.get(session_id, {})
-    return session.get("resume_index"), session.get("resume_chunks", [])
+    def apply(session: Session) -> None:
+        session.set_documents(resume_chunks, resume_text, job_desc_chunks, job_desc_text, vectors)
+
+    if _update(session_id, apply) is not None:
+        logger.debug(f"Attached documents to session: {session_id}")
+
+def set_ingestion_status(session_id: str, status: str, status_code: Optional[int] = None, detail: Optional[str] = None) -> None:
+    """
+    Record whether the session's documents are "pending", "ready" or "failed".
+    """
+    def apply(session: Session) -> None:
+        session.ingestion = {"status": status, "status_code": status_code, "detail": detail}
+
+    if _update(session_id, apply) is not None:
+        logger.debug(f"Ingestion {status} for session: {session_id}")
+
+def get_ingestion_status(session_id: str) -> dict:
+    """
+    Get the ingestion status of the session's documents.
+    """
+    return _get(session_id).ingestion
+
+def track_ingestion(session_id: str, task: "asyncio.Task") -> None:
+    """
+    Register the background task ingesting a session's documents in this process.
+    """
+    _ingestion_tasks[session_id] = task
+
+    def forget(_):
+        if _ingestion_tasks.get(session_id) is task:
+            del _ingestion_tasks[session_id]
+
+    task.add_done_callback(forget)
 
-def get_job_desc_index(session_id: str) -> Tuple[Optional[object], List[str]]:
+async def wait_for_ingestion(session_id: str, timeout: float = 120.0) -> Optional[dict]:
+    """
+    Wait until the session's documents are ingested. Returns None when they are ready,
+    or the failed status (with status_code and detail) otherwise. Sessions ingested by
+    another worker process are polled through the session store.
+    """
+    task = _ingestion_tasks.get(session_id)
+    if task is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(task), timeout)
+        except Exception as e:
+            logger.error(f"Ingestion for session {session_id} did not finish: {str(e)}")
+            return {"status": "failed", "status_code": 500, "detail": "Failed to create index for resume"}
+    
+    deadline = time.monotonic() + timeout
+    status = get_ingestion_status(session_id)
+    while status["status"] == "pending" and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        status = get_ingestion_status(session_id)
+    if status["status"] == "ready":
+        return None
+    if status["status"] == "pending":
+        return {"status": "failed", "status_code": 500, "detail": "Timed out indexing resume"}
+    return status
+
+def _chunks(session: Session) -> Dict[str, List[str]]:
+    return {"resume": session.resume_chunks, "job_description": session.job_desc_chunks}
+
+def get_session_vectors(session_id: str) -> Tuple[Optional[SessionVectors], Dict[str, List[str]]]:
     """
-    Get the job description index and chunks for the session.
+    Get the session's chunk vectors and the chunk texts per document ("resume",
+    "job_description") for search_documents.
     """
-    session = _sessions.get(session_id, {})
-    return session.get("job_desc_index"), session.get("job_desc_chunks", [])
+    session = _get(session_id)
+    return session.vectors, _chunks(session)
 
 def get_short_answers_count(session_id: str) -> int:
     """
     Get the count of short answers in the session.
     """
-    return _sessions.get(session_id, {}).get("short_answers_count", 0)
+    return _get(session_id).short_answers_count
 
 def get_asked_topics(session_id: str) -> List[str]:
     """
     Get the list of topics discussed in the session.
     """
-    return _sessions.get(session_id, {}).get("asked_topics", [])
+    return _get(session_id).asked_topics
 
 def get_current_project(session_id: str) -> Optional[str]:
     """
     Get the current project being discussed.
     """
-    return _sessions.get(session_id, {}).get("current_project", None)
+    return _get(session_id).current_project
 
 def get_used_acks(session_id: str) -> List[str]:
     """
     Get the list of used acknowledgments.
     """
-    return _sessions.get(session_id, {}).get("used_acks", [])
+    return _get(session_id).used_acks
 
 def add_tracked_context(session_id: str, topic: str) -> None:
     """
     Add a topic to the tracked context.
     """
-    if session_id in _sessions:
-        topics = _sessions[session_id].get("tracked_context", [])
-        if topic not in topics:
-            topics.append(topic)
-            _sessions[session_id]["tracked_context"] = topics
-            logger.debug(f"Added tracked context: {topic}")
+    def apply(session: Session) -> bool:
+        if not session.add_tracked_context(topic):
+            return False
+        logger.debug(f"Added tracked context: {topic}")
+        return True
+
+    _update(session_id, apply)
 
 def track_used_transition(session_id: str, transition: str) -> None:
     """
     Track a used transition.
     """
-    if session_id in _sessions:
-        transitions = _sessions[session_id].get("used_transitions", [])
-        if transition not in transitions:
-            transitions.append(transition)
-            _sessions[session_id]["used_transitions"] = transitions
-            logger.debug(f"Tracked transition: {transition}")
+    def apply(session: Session) -> bool:
+        if not session.add_used_transition(transition):
+            return False
+        logger.debug(f"Tracked transition: {transition}")
+        return True
+
+    _update(session_id, apply)
 
 def get_tracked_context(session_id: str) -> List[str]:
     """
     Get the tracked context topics.
     """
-    return _sessions.get(session_id, {}).get("tracked_context", [])
+    return _get(session_id).tracked_context
 
 def get_resume_text(session_id: str) -> str:
     """
     Get the resume text for the session.
     """
-    return _sessions.get(session_id, {}).get("resume_text", "")
+    return _get(session_id).resume_text
+
+def set_session_profile(session_id: str, profile: dict) -> None:
+    """
+    Store the precomputed candidate profile for the session.
+    """
+    def apply(session: Session) -> None:
+        session.set_profile(profile)
+
+    if _update(session_id, apply) is not None:
+        logger.debug(f"Stored profile for session: {session_id}")
+
+def get_session_profile(session_id: str) -> Optional[dict]:
+    """
+    Get the precomputed candidate profile, or None if it has not been built.
+    """
+    return _get(session_id).profile
+
+def set_session_feedback(session_id: str, feedback: str, history_length: int) -> None:
+    """
+    Cache generated feedback for the session, keyed by the history length it covers.
+    Feedback for a shorter transcript than the cached one is discarded.
+    """
+    def apply(session: Session) -> bool:
+        if session.feedback and session.feedback["history_length"] > history_length:
+            logger.debug(f"Discarded feedback for session: {session_id} at {history_length} messages")
+            return False
+        session.set_feedback(history_length, feedback)
+        logger.debug(f"Cached feedback for session: {session_id} at {history_length} messages")
+        return True
+
+    _update(session_id, apply)
+
+def get_session_feedback(session_id: str, history_length: int) -> Optional[str]:
+    """
+    Get cached feedback if it covers exactly history_length messages, else None.
+    """
+    cached = _get(session_id).feedback
+    if cached and cached["history_length"] == history_length:
+        return cached["text"]
+    return None
+
+def set_phase_summary(session_id: str, phase: str, summary: str) -> None:
+    """
+    Store the summary note for a finished phase.
+    """
+    def apply(session: Session) -> None:
+        session.set_phase_summary(phase, summary)
+
+    if _update(session_id, apply) is not None:
+        logger.debug(f"Stored {phase} summary for session: {session_id}")
+
+def get_phase_summaries(session_id: str) -> Dict[str, str]:
+    """
+    Get the summary notes of finished phases, keyed by phase.
+    """
+    return _get(session_id).phase_summaries
 
 def get_job_desc_text(session_id: str) -> str:
     """
     Get the job description text for the session.
     """
-    return _sessions.get(session_id, {}).get("job_desc_text", "")
\ No newline at end of file
+    return _get(session_id).job_desc_text
\ No newline at end of file
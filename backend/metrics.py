@@ -0,0 +1,150 @@
+# In-process counters, latency histograms and per-request traces, rendered in the
+# Prometheus text format by GET /metrics. Standard library only.
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_HELP = {
+    "stage_duration_seconds": ("histogram", "Time spent in each processing stage."),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route."),
+    "http_requests_total": ("counter", "HTTP requests by route and status code."),
+    "sessions_created_total": ("counter", "Interview sessions created."),
+    "turns_total": ("counter", "Interview turns answered, by kind."),
+    "llm_requests_total": ("counter", "LLM completions started."),
+    "llm_prompt_tokens_total": ("counter", "Estimated prompt tokens sent to the LLM (4 characters per token)."),
+    "llm_completion_tokens_total": ("counter", "Completion tokens received from the LLM (stream chunks)."),
+    "prompt_trimmed_bytes_total": ("counter", "Prompt bytes dropped to fit a token budget, by prompt kind."),
+    "errors_total": ("counter", "Errors by stage."),
+}
+
+Labels = Tuple[Tuple[str, str], ...]
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Labels], float] = {}
+_histograms: Dict[Tuple[str, Labels], List[float]] = {}  # bucket counts..., sum, count
+_gauges = {}
+
+# Spans recorded for the current request when tracing is on: (stage, milliseconds)
+_trace: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("trace", default=None)
+
+def _labels(labels: dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    """
+    Add value to a counter.
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """
+    Record a duration in a histogram.
+    """
+    key = (name, _labels(labels))
+    with _lock:
+        values = _histograms.get(key)
+        if values is None:
+            values = _histograms[key] = [0] * (len(BUCKETS) + 2)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                values[i] += 1
+        values[-2] += seconds
+        values[-1] += 1
+
+def register_gauge(name: str, help_text: str, read) -> None:
+    """
+    Expose a value computed at scrape time by read().
+    """
+    _gauges[name] = (help_text, read)
+
+def record_stage(stage: str, seconds: float) -> None:
+    """
+    Record a stage duration in the stage histogram and the current trace, if any.
+    """
+    observe("stage_duration_seconds", seconds, stage=stage)
+    spans = _trace.get()
+    if spans is not None:
+        spans.append((stage, seconds * 1000))
+
+@contextmanager
+def span(stage: str):
+    """
+    Time the enclosed block as stage; an exception also counts as an error of that stage.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        inc("errors_total", stage=stage)
+        raise
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+def start_trace() -> List[Tuple[str, float]]:
+    """
+    Collect spans for the rest of this context (the current request and work it starts).
+    """
+    spans = []
+    _trace.set(spans)
+    return spans
+
+def get_trace() -> Optional[List[Tuple[str, float]]]:
+    return _trace.get()
+
+def format_server_timing(spans: List[Tuple[str, float]]) -> str:
+    """
+    Render spans as a Server-Timing header value, in the order they finished.
+    """
+    return ", ".join(f"{stage};dur={ms:.1f}" for stage, ms in spans)
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+def _format_value(value: float) -> str:
+    # Full precision: ":g" keeps 6 digits, which flattens rate() on large counters
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def render_prometheus() -> str:
+    """
+    Render all metrics in the Prometheus text exposition format.
+    """
+    with _lock:
+        counters = dict(_counters)
+        histograms = {key: list(values) for key, values in _histograms.items()}
+    lines = []
+    names = sorted({name for name, _ in counters} | {name for name, _ in histograms})
+    for name in names:
+        kind = "counter" if any(metric == name for metric, _ in counters) else "histogram"
+        help_text = _HELP.get(name, (kind, name))[1]
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "counter":
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+            continue
+        for (metric, labels), values in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS, values):
+                lines.append(f"{name}_bucket{_format_labels(labels, (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels, (('le', '+Inf'),))} {values[-1]}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {values[-2]:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {values[-1]}")
+    for name, (help_text, read) in sorted(_gauges.items()):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name} {_format_value(read())}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,88 @@
+# Per-page PDF work that runs inside the extraction process pool. Kept free of the
+# embedding and FAISS imports in utils so pool workers start quickly. PyMuPDF is
+# imported on first use, so the API process only loads it when PDF_WORKERS=0.
+import logging
+import math
+import time
+from io import BytesIO
+try:
+    import pytesseract
+    from PIL import Image
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+def scan_pages(pdf_bytes):
+    """
+    Extract the text layer of every page.
+    Args:
+        pdf_bytes (bytes): Raw PDF file bytes.
+    Returns:
+        list[tuple]: (page_text, width_pt, height_pt) per page; page_text is "" when the
+        page has no text layer and needs OCR.
+    """
+    import fitz  # PyMuPDF
+    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        pages = []
+        for page in pdf_document:
+            page_text = page.get_text("text")
+            pages.append((page_text if page_text.strip() else "", page.rect.width, page.rect.height))
+        return pages
+    finally:
+        pdf_document.close()
+
+def choose_ocr_dpi(width_pt, height_pt, max_dpi, min_dpi, target_pixels):
+    """
+    Pick the highest DPI up to max_dpi whose rendered page stays within target_pixels,
+    but never below min_dpi.
+    """
+    area_sq_in = max((width_pt / 72) * (height_pt / 72), 1e-6)
+    dpi = math.sqrt(target_pixels / area_sq_in)
+    return int(max(min_dpi, min(max_dpi, dpi)))
+
+def ocr_pages(pdf_bytes, pages, deadline=None):
+    """
+    Render and OCR several pages of one PDF, opening it once.
+    Args:
+        pdf_bytes (bytes): Raw PDF file bytes.
+        pages (list[tuple]): (page_num, dpi) per page, in the order to OCR them.
+        deadline (float): Unix time after which the remaining pages are skipped.
+    Returns:
+        dict: Recognized text by page number ("" if OCR failed); skipped pages, and
+        all pages when OCR is unavailable, are missing.
+    """
+    if not OCR_AVAILABLE:
+        return {}
+    import fitz  # PyMuPDF
+    pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+    try:
+        texts = {}
+        for page_num, dpi in pages:
+            if deadline is not None and time.time() > deadline:
+                logger.warning(f"OCR time budget exhausted at page {page_num + 1}")
+                break
+            texts[page_num] = _ocr_page(pdf_document, page_num, dpi)
+        return texts
+    finally:
+        pdf_document.close()
+
+def _ocr_page(pdf_document, page_num, dpi):
+    import fitz  # PyMuPDF
+    try:
+        page = pdf_document[page_num]
+        pix = page.get_pixmap(matrix=fitz.Matrix(dpi / 72, dpi / 72))
+        img = Image.open(BytesIO(pix.tobytes("png")))
+        ocr_text = pytesseract.image_to_string(img)
+        if ocr_text.strip():
+            logger.debug(f"Page {page_num + 1}: OCR extracted {len(ocr_text)} characters at {dpi} DPI")
+        else:
+            logger.debug(f"Page {page_num + 1}: OCR found no text")
+        return ocr_text
+    except Exception as ocr_e:
+        logger.error(f"Page {page_num + 1}: OCR failed: {str(ocr_e)}")
+        return ""
@@ -0,0 +1,94 @@
+# Token budgets for prompts that grow over an interview: sections are filled in
+# priority order until the budget runs out, and near-duplicate chunks are dropped.
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from utils import estimate_tokens
+
+# Largest follow-up question prompt, in estimated tokens; 0 disables the budget
+FOLLOWUP_PROMPT_TOKEN_BUDGET = int(os.getenv("FOLLOWUP_PROMPT_TOKEN_BUDGET", "700"))
+# Chunks whose word sets overlap at least this much (Jaccard) count as duplicates
+CHUNK_DEDUP_THRESHOLD = float(os.getenv("CHUNK_DEDUP_THRESHOLD", "0.8"))
+
+WORD = re.compile(r'\w+')
+
+def dedupe_chunks(chunks: List[str], threshold: float = CHUNK_DEDUP_THRESHOLD) -> Tuple[List[str], List[str]]:
+    """
+    Drop chunks that are near-identical to an earlier one: same words, or one chunk's
+    words contained in the other's. Returns (kept, dropped), each in input order.
+    """
+    kept, kept_words, dropped = [], [], []
+    for chunk in chunks:
+        words = set(WORD.findall(chunk.lower()))
+        duplicate = any(
+            words <= other or (words | other and len(words & other) / len(words | other) >= threshold)
+            for other in kept_words
+        )
+        if duplicate:
+            dropped.append(chunk)
+        else:
+            kept.append(chunk)
+            kept_words.append(words)
+    return kept, dropped
+
+def _truncate(text: str, max_chars: int) -> str:
+    if max_chars <= 0:
+        return ""
+    cut = text[:max_chars].rsplit(" ", 1)[0] if " " in text[:max_chars] else text[:max_chars]
+    return cut.rstrip() + "…"
+
+class PromptBudget:
+    """
+    Fit the variable sections of a prompt into a token budget.
+
+    The fixed part of the prompt is charged first. Sections are then added highest
+    priority first; each takes whole items, in the order given, while they fit and
+    drops the rest. A truncate section cuts the first item that does not fit instead,
+    so it is never left empty while any budget remains. budget <= 0 keeps everything.
+    """
+
+    def __init__(self, budget: int, fixed: str = ""):
+        self.budget = budget
+        self.remaining = budget - estimate_tokens(fixed) if budget > 0 else None
+        self.fixed_tokens = estimate_tokens(fixed)
+        self.tokens: Dict[str, int] = {}
+        self.trimmed_bytes = 0
+        self.trimmed_tokens = 0
+
+    def _drop(self, text: str) -> None:
+        self.trimmed_bytes += len(text.encode("utf-8"))
+        self.trimmed_tokens += estimate_tokens(text)
+
+    def add(self, name: str, items: List[str], separator: str = "\n", reverse: bool = False,
+            truncate: bool = False, dropped: Optional[List[str]] = None) -> str:
+        """
+        Add a section from items in priority order and return its text. reverse renders
+        the kept items in the opposite order (e.g. newest first in, oldest first out).
+        dropped items (such as near-duplicates) are counted as trimmed.
+        """
+        for item in dropped or []:
+            self._drop(item)
+        kept = []
+        for item in items:
+            cost = estimate_tokens(item + separator)
+            if self.remaining is None or cost <= self.remaining:
+                kept.append(item)
+                if self.remaining is not None:
+                    self.remaining -= cost
+            elif truncate and self.remaining > 0:
+                cut = _truncate(item, self.remaining * 4 - len(separator) - 1)
+                if cut:
+                    kept.append(cut)
+                    self.remaining -= estimate_tokens(cut + separator)
+                self._drop(item[len(cut) - 1:] if cut else item)
+                truncate = False
+            else:
+                self._drop(item)
+        text = separator.join(reversed(kept) if reverse else kept)
+        self.tokens[name] = estimate_tokens(text)
+        return text
+
+    def summary(self) -> str:
+        sections = ", ".join(f"{name}={tokens}" for name, tokens in self.tokens.items())
+        return f"fixed={self.fixed_tokens}, {sections}"
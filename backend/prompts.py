@@ -1,73 +1,214 @@
+import asyncio
+import os
 import random
 import re
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Optional, Tuple
+from llm import complete_chat, stream_chat
 from memory import (
-    get_job_desc_index, get_phase, get_resume_index, get_short_answers_count,
+    get_phase, get_session_vectors, get_short_answers_count,
     log_message, get_history, get_asked_topics, get_current_project,
-    get_resume_text, get_job_desc_text, should_continue_interview, set_phase
+    get_resume_text, get_job_desc_text, should_continue_interview, set_phase,
+    get_session_profile, set_session_profile, wait_for_ingestion,
+    get_session_feedback, set_session_feedback, get_phase_summaries, set_phase_summary,
+    PHASE_ORDER
 )
-from utils import search_similar, extract_keywords
-from sentence_transformers import SentenceTransformer
+from utils import search_documents, extract_keywords, get_model, estimate_tokens
+from prompt_budget import FOLLOWUP_PROMPT_TOKEN_BUDGET, PromptBudget, dedupe_chunks
+from metrics import inc
 import logging
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-load_dotenv()
-DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
-
-# Initialize DeepSeek client
-client = OpenAI(api_key=DEEPSEEK_API_KEY, base_url="https://api.deepseek.com")
+# Phase summaries: completion size, and how long feedback waits for in-flight ones
+PHASE_SUMMARY_MAX_TOKENS = int(os.getenv("PHASE_SUMMARY_MAX_TOKENS", "80"))
+PHASE_SUMMARY_WAIT_SECONDS = float(os.getenv("PHASE_SUMMARY_WAIT_SECONDS", "5"))
+# Background feedback waits this long before calling the LLM, so a transcript the
+# candidate's next question supersedes is dropped without costing a completion
+FEEDBACK_PRECOMPUTE_DELAY_SECONDS = float(os.getenv("FEEDBACK_PRECOMPUTE_DELAY_SECONDS", "2"))
 
-# Initialize SentenceTransformer model
-MODEL = SentenceTransformer('all-MiniLM-L6-v2')
+# Greeting and wrap-up variant pools: variants kept, and lookups before a variant is
+# replaced; PROMPT_POOL_SIZE=0 makes every greeting and wrap-up a live LLM call
+PROMPT_POOL_SIZE = int(os.getenv("PROMPT_POOL_SIZE", "8"))
+PROMPT_POOL_MAX_USES = int(os.getenv("PROMPT_POOL_MAX_USES", "50"))
+# Replies used when the LLM call fails
+FALLBACK_QUESTION = "Sorry, something went wrong—let’s try another question!"
+FALLBACK_FEEDBACK = "Unable to generate feedback."
+# Stands in for the candidate's name in pooled greetings
+NAME_PLACEHOLDER = "{name}"
 
 # Random female recruiter names
 RECRUITER_NAME = random.choice([
     "Emma", "Zoe", "Ava", "Sophia", "Mia", "Luna", "Olivia", "Isabella", "Charlotte", "Amelia"
 ])
 
-def clean_response(text: str, is_greeting: bool = False, is_first_response: bool = False, is_feedback: bool = False) -> str:
-    logger.debug(f"Raw response: {text}")
-    text = text.strip()
+FOCUS_OPTIONS = {
+    "project": "Ask about a specific project or role from resume (e.g., What did you do at Hexaware?).",
+    "project_2": "Ask about a different project or experience from resume.",
+    "technical": "Ask about a technical skill (e.g., How did you use Python?).",
+    "technical_2": "Ask about applying a skill in a scenario (e.g., Optimizing a query?).",
+    "problem-solving": "Ask about a challenge they overcame (e.g., Solving a tough bug?).",
+    "coding": "Ask a verbal coding question (e.g., Design a function for...).",
+    "behavioral": "Ask about teamwork or collaboration (e.g., Working with a team?).",
+    "behavioral_2": "Ask about leadership or initiative (e.g., Leading a project?).",
+    "role-fit": "Ask about motivation for the role (e.g., Why this job?).",
+    "closing": "Thank them and ask if they have questions about the role."
+}
+
+# Extra retrieval terms per phase, added to the resume/JD keywords in the session profile
+PHASE_QUERY_TERMS = {
+    "project": ["project", "built", "developed"],
+    "project_2": ["experience", "role", "internship"],
+    "technical": ["skills", "technologies", "tools"],
+    "technical_2": ["implemented", "optimized", "performance"],
+    "problem-solving": ["challenge", "issue", "solved"],
+    "coding": ["algorithm", "code", "data"],
+    "behavioral": ["team", "collaborated", "stakeholders"],
+    "behavioral_2": ["led", "initiative", "mentored"],
+    "role-fit": ["responsibilities", "requirements", "mission"],
+    "closing": ["team", "role"]
+}
+
+# Phrase rules applied in order by strip_phrases: (pattern, replacement, guards). A rule
+# only runs when one of its guards occurs in the lowercased text (None: always runs),
+# which skips most regex scans on a typical reply without changing the result.
+PHRASE_RULES = [
     # Remove AI-related and robotic phrases
-    text = re.sub(r"(?i)^.*\bI['’]?m an AI\b.*", "", text)
-    text = re.sub(r"<[^>]+>", "", text)
-    text = re.sub(r"\[.*?\]", "", text)
-    text = re.sub(r"(?i)(here is the output|output:|here's (my|the) (attempt|response|start)|note:).*?(?=\w|$)", "", text)
-    text = re.sub(r"(?i)\(.*?(recruiter|interview|response|phase).*?\)", "", text)
+    (re.compile(r"(?i)^.*\bI['’]?m an AI\b.*"), "", ("an ai",)),
+    (re.compile(r"<[^>]+>"), "", ("<",)),
+    (re.compile(r"\[.*?\]"), "", ("[",)),
+    (re.compile(r"(?i)(here is the output|output:|here's (my|the) (attempt|response|start)|note:).*?(?=\w|$)"), "", ("output", "here's", "note:")),
+    (re.compile(r"(?i)\(.*?(recruiter|interview|response|phase).*?\)"), "", ("(",)),
     # Remove overly casual or exaggerated phrases
-    text = re.sub(r"(?i)(haha|lol|like a champ|rock star|super|mega|ultra|wizardry|magic|just-works)", "", text)
-    text = re.sub(r"^[^\w\s]+", "", text)
+    (re.compile(r"(?i)(haha|lol|like a champ|rock star|super|mega|ultra|wizardry|magic|just-works)"), "",
+     ("haha", "lol", "like a champ", "rock star", "super", "mega", "ultra", "wizardry", "magic", "just-works")),
+    (re.compile(r"^[^\w\s]+"), "", None),
     # Remove generic fluff
-    text = re.sub(r"(?i)(great question|let['’]?s get started|excited to (chat|be here)|i['’]?m (with you|excited|here).*?(today|interview)|hello)", "", text)
-    text = re.sub(r"(?i)(wow|that['’]?s|this is|I['’]?m) (really |so |quite )?(amazing|impressive|fascinating|interesting|great)[^!.]*[!.]", "", text)
-    text = re.sub(r"(?i)let['’]?s (dive into|jump into|explore|unpack|that |the )?", "", text)
-    
-    # Ensure question mark for follow-ups, but not for feedback or answers
-    if not is_greeting and not is_first_response and not is_feedback and not text.endswith("?"):
-        text = f"{text}?"
+    (re.compile(r"(?i)(great question|let['’]?s get started|excited to (chat|be here)|i['’]?m (with you|excited|here).*?(today|interview)|hello)"), "",
+     ("great question", "let", "excited", "with you", "here", "hello")),
+    (re.compile(r"(?i)(wow|that['’]?s|this is|I['’]?m) (really |so |quite )?(amazing|impressive|fascinating|interesting|great)[^!.]*[!.]"), "", ("amazing", "impressive", "fascinating", "interesting", "great")),
+    (re.compile(r"(?i)let['’]?s (dive into|jump into|explore|unpack|that |the )?"), "", ("let",)),
+]
+# Characters re.IGNORECASE matches to ASCII letters that str.lower() does not produce
+GUARD_FOLD = str.maketrans({"ı": "i", "İ": "i", "ſ": "s", "\u212a": "k"})
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+WHITESPACE = re.compile(r'\s+')
+
+def _fold(text: str) -> str:
+    return text.lower() if text.isascii() else text.translate(GUARD_FOLD).lower()
+
+def strip_phrases(text: str) -> str:
+    lowered = _fold(text)
+    for pattern, replacement, guards in PHRASE_RULES:
+        if guards is not None:
+            for guard in guards:
+                if guard in lowered:
+                    break
+            else:
+                continue
+        text, count = pattern.subn(replacement, text)
+        if count:
+            lowered = _fold(text)
+    return text
+
+def clean_response(text: str, is_greeting: bool = False, is_first_response: bool = False, is_feedback: bool = False) -> str:
+    logger.debug(f"Raw response: {text}")
+    text = strip_phrases(text.strip())
     
-    # Limit to 1 sentence and 25 words for questions
+    # Questions: end with a question mark, keep 1 sentence and 25 words
     if not is_greeting and not is_first_response and not is_feedback:
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        words = text.split()
-        if len(words) > 25:
-            text = " ".join(words[:25]) + ( "?" if "?" not in text else "")
+        if not text.endswith("?"):
+            text = f"{text}?"
+        sentences = SENTENCE_SPLIT.split(text)
         if len(sentences) > 1:
-            question_indices = [i for i, s in enumerate(sentences) if "?" in s]
-            if question_indices:
-                text = sentences[question_indices[0]]
-            else:
-                text = sentences[0]
+            # The chosen sentence replaces any word-limited text
+            text = next((s for s in sentences if "?" in s), sentences[0])
+        else:
+            words = text.split()
+            if len(words) > 25:
+                text = " ".join(words[:25]) + ( "?" if "?" not in text else "")
     
-    return re.sub(r'\s+', ' ', text).strip()
+    return WHITESPACE.sub(' ', text).strip()
+
+class IncrementalCleaner:
+    """
+    Apply clean_response rules to a completion while it streams in.
+
+    feed() returns display events: ("token", text) appends to what the client has shown,
+    ("reset", "") tells it to discard the preview because a later rule removed text that
+    was already sent. The trailing partial word is held back so phrase rules only see
+    whole words. For questions only the current candidate sentence is shown, capped at
+    25 words, and streaming stops at the first complete sentence with a question mark.
+    clean_response on the full text remains the authoritative final reply.
+    """
 
-def run_deepseek_prompt(user_prompt: str, is_greeting: bool = False, is_first_response: bool = False, is_feedback: bool = False) -> str:
+    def __init__(self, is_greeting: bool = False, is_first_response: bool = False, is_feedback: bool = False):
+        self.is_question = not (is_greeting or is_first_response or is_feedback)
+        self.raw = ""
+        self.emitted = ""
+        self.done = False
+
+    def feed(self, delta: str) -> List[Tuple[str, str]]:
+        if self.done:
+            return []
+        self.raw += delta
+        stable_end = max(self.raw.rfind(" "), self.raw.rfind("\n"))
+        if stable_end <= 0:
+            return []
+        return self._emit(self._preview(self.raw[:stable_end]))
+
+    def finish(self) -> List[Tuple[str, str]]:
+        if self.done:
+            return []
+        events = self._emit(self._preview(self.raw))
+        self.done = True
+        return events
+
+    def _preview(self, text: str) -> str:
+        text = strip_phrases(text.strip())
+        if self.is_question:
+            sentences = [s for s in SENTENCE_SPLIT.split(text.strip()) if s]
+            complete = sentences if text.rstrip().endswith((".", "!", "?")) else sentences[:-1]
+            questions = [s for s in complete if "?" in s]
+            if questions:
+                text = questions[0]
+                self.done = True
+            elif sentences:
+                # Finished non-question sentences are dropped when a question follows
+                text = sentences[-1] if len(sentences) > len(complete) else sentences[0]
+            words = text.split()
+            if len(words) >= 25:
+                text = " ".join(words[:25])
+                self.done = True
+        return WHITESPACE.sub(' ', text).strip()
+
+    def _emit(self, preview: str) -> List[Tuple[str, str]]:
+        if preview.startswith(self.emitted):
+            delta = preview[len(self.emitted):]
+            self.emitted = preview
+            return [("token", delta)] if delta else []
+        self.emitted = preview
+        return [("reset", "")] + ([("token", preview)] if preview else [])
+
+# Receives ("token" | "reset", field, text) display events while a reply streams
+_token_sink: ContextVar[Optional[Callable[[str, str, str], None]]] = ContextVar("token_sink", default=None)
+
+@contextmanager
+def stream_tokens(sink: Callable[[str, str, str], None]):
+    """
+    Forward cleaned reply tokens produced in this context to sink as they arrive.
+    """
+    token = _token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+async def run_deepseek_prompt(user_prompt: str, is_greeting: bool = False, is_first_response: bool = False, is_feedback: bool = False) -> str:
     system_prompt = f"""
 You are {RECRUITER_NAME}, a friendly female recruiter conducting a Zoom job interview.
 - Use a warm, professional, conversational tone, like chatting with a colleague (e.g., "That’s interesting!", "Nice work!").
@@ -81,28 +222,191 @@ You are {RECRUITER_NAME}, a friendly female recruiter conducting a Zoom job inte
 - For feedback, provide detailed, constructive comments tied to the conversation (max 150 words).
 - Questions end with a question mark unless feedback.
 """
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
+    max_tokens = 250 if is_feedback else 150
+    sink = _token_sink.get()
     try:
-        stream = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            temperature=0.7,
-            max_tokens=250 if is_feedback else 150,
-            stream=True
-        )
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                full_response += chunk.choices[0].delta.content
+        if sink is None:
+            full_response = await complete_chat(messages, max_tokens=max_tokens, temperature=0.7)
+        else:
+            field = "feedback" if is_feedback else "question"
+            cleaner = IncrementalCleaner(is_greeting, is_first_response, is_feedback)
+            parts = []
+            start = time.perf_counter()
+            first_token_at = None
+            async for delta in stream_chat(messages, max_tokens=max_tokens, temperature=0.7):
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(delta)
+                for event, text in cleaner.feed(delta):
+                    sink(event, field, text)
+            for event, text in cleaner.finish():
+                sink(event, field, text)
+            full_response = "".join(parts)
+            if first_token_at is not None:
+                logger.info(f"LLM stream: first token {(first_token_at - start) * 1000:.0f}ms, total {(time.perf_counter() - start) * 1000:.0f}ms")
         logger.debug(f"Raw response full model output: {full_response}")
         return clean_response(full_response, is_greeting, is_first_response, is_feedback)
     except Exception as e:
         logger.error(f"Deepseek API failed: {str(e)}")
-        return "Sorry, something went wrong—let’s try another question!" if not is_feedback else "Unable to generate feedback."
+        return FALLBACK_FEEDBACK if is_feedback else FALLBACK_QUESTION
+
+def _texts(results: list) -> List[str]:
+    return [r["text"] for r in results]
+
+def _merge_context(*groups: List[str], limit: int = 3) -> List[str]:
+    """
+    Merge retrieved chunk lists in priority order, dropping duplicates.
+    """
+    return list(dict.fromkeys(text for group in groups for text in group))[:limit]
+
+def _build_profile(session_id: str) -> dict:
+    resume_text = get_resume_text(session_id)
+    job_desc_text = get_job_desc_text(session_id)
+    vectors, chunks = get_session_vectors(session_id)
+    model = get_model()
+
+    resume_keywords = extract_keywords(resume_text)
+    job_desc_keywords = extract_keywords(job_desc_text)
+    base_keywords = list(dict.fromkeys(resume_keywords[:3] + job_desc_keywords[:2]))
+
+    phases = list(FOCUS_OPTIONS)
+    queries = [", ".join(resume_keywords[:5])] + [
+        ", ".join(dict.fromkeys(base_keywords + PHASE_QUERY_TERMS.get(phase, [])))
+        for phase in phases
+    ]
+    # Query 0 feeds the first response (resume only); the phase queries follow
+    results = search_documents(queries, vectors, chunks, model)
+    resume_results, job_desc_results = results["resume"], results["job_description"]
+
+    phase_contexts = {
+        phase: {"resume": _texts(resume_results[i + 1]), "job_description": _texts(job_desc_results[i + 1])}
+        for i, phase in enumerate(phases)
+    }
+    # Resume chunks that retrieve best for project and experience phases are the candidates
+    project_chunks = _merge_context(phase_contexts["project"]["resume"], phase_contexts["project_2"]["resume"], limit=4)
+    projects = [re.split(r'(?<=[.!?])\s+', chunk)[0][:160] for chunk in project_chunks]
 
-def generate_greeting(user_name: str) -> str:
+    return {
+        "resume_keywords": resume_keywords,
+        "job_desc_keywords": job_desc_keywords,
+        "base_keywords": base_keywords,
+        "first_response_context": _texts(resume_results[0]),
+        "phase_contexts": phase_contexts,
+        "projects": projects
+    }
+
+async def build_session_profile(session_id: str) -> dict:
+    """
+    Precompute keywords, per-phase retrieval contexts and project candidates for a session
+    so per-turn prompts only add context for the latest answer.
+    """
+    profile = await asyncio.to_thread(_build_profile, session_id)
+    set_session_profile(session_id, profile)
+    logger.debug(f"Built profile for session {session_id}: {len(profile['projects'])} projects, keywords {profile['base_keywords']}")
+    return profile
+
+async def get_or_build_profile(session_id: str) -> dict:
+    # Ingestion builds the profile; wait for it rather than racing it
+    await wait_for_ingestion(session_id)
+    profile = get_session_profile(session_id)
+    if profile is None:
+        profile = await build_session_profile(session_id)
+    return profile
+
+class VariantPool:
+    """
+    Pre-generated, validated replies to a fixed prompt, so the reply is a lookup
+    instead of an LLM round-trip. fill() tops the pool up to size; each variant is
+    retired after max_uses lookups and refilled in the background, so the wording
+    keeps changing over time.
+    """
+
+    def __init__(self, name: str, generate: Callable, validate: Callable[[str], Optional[str]], size: int, max_uses: int):
+        self.name = name
+        self.generate = generate
+        self.validate = validate
+        self.size = size
+        self.max_uses = max_uses
+        self.variants: Dict[str, int] = {}  # variant -> uses
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+        self._filling: Optional[asyncio.Task] = None
+
+    async def fill(self) -> None:
+        attempts = 0
+        while len(self.variants) < self.size and attempts < self.size * 2:
+            attempts += 1
+            raw = await self.generate()
+            if raw == FALLBACK_QUESTION:
+                logger.warning(f"{self.name} pool fill stopped: LLM call failed")
+                break
+            variant = self.validate(raw)
+            if variant is None:
+                self.rejected += 1
+            else:
+                self.variants.setdefault(variant, 0)
+        logger.debug(f"{self.name} pool filled: {len(self.variants)} variants after {attempts} generations")
+
+    def refill_in_background(self) -> Optional[asyncio.Task]:
+        """
+        Start topping the pool up unless a fill is already running, and return the fill
+        task (None when pooling is off). Every fill goes through here, so there is never
+        more than one per pool.
+        """
+        if self.size <= 0:
+            return None
+        if self._filling is None or self._filling.done():
+            async def run() -> None:
+                _token_sink.set(None)
+                await self.fill()
+            
+            self._filling = asyncio.create_task(run())
+        return self._filling
+
+    def take(self) -> Optional[str]:
+        """
+        Get a random variant, or None (and start a refill) if the pool is empty.
+        """
+        if not self.variants:
+            self.misses += 1
+            self.refill_in_background()
+            return None
+        self.hits += 1
+        variant = random.choice(list(self.variants))
+        self.variants[variant] += 1
+        if self.variants[variant] >= self.max_uses:
+            del self.variants[variant]
+            self.refill_in_background()
+        return variant
+
+    def stats(self) -> dict:
+        return {"variants": len(self.variants), "size": self.size, "hits": self.hits, "misses": self.misses, "rejected": self.rejected}
+
+def _emit_pooled(text: str) -> str:
+    """Send a pooled reply to the stream sink, if any, as a single token."""
+    sink = _token_sink.get()
+    if sink is not None:
+        sink("token", "question", text)
+    return text
+
+def _validate_greeting(text: str) -> Optional[str]:
+    text = clean_response(text, is_greeting=True)
+    if text.count(NAME_PLACEHOLDER) != 1 or not text.startswith(f"Hi {NAME_PLACEHOLDER}") or len(text.split()) > 25:
+        return None
+    return text
+
+def _validate_wrap_up(text: str) -> Optional[str]:
+    text = clean_response(text)
+    if "{" in text or "question" not in text.lower() or len(text.split()) > 25:
+        return None
+    return text
+
+async def _generate_greeting_live(user_name: str) -> str:
     logger.debug(f"Generating greeting for user: {user_name}")
     prompt = f"""
 As {RECRUITER_NAME}, greet candidate {user_name} for a Zoom interview.
@@ -110,22 +414,52 @@ As {RECRUITER_NAME}, greet candidate {user_name} for a Zoom interview.
 - Keep it warm, concise, natural (e.g., "Hi {user_name}, nice to meet you! How’s your day going?").
 - One sentence, max 25 words.
 """
-    response = run_deepseek_prompt(prompt, is_greeting=True)
+    return await run_deepseek_prompt(prompt, is_greeting=True)
+
+async def _generate_wrap_up_live() -> str:
+    prompt = f"""
+As {RECRUITER_NAME}, wrap up the Zoom interview.
+- Thank the candidate warmly and ask if they have questions about the role or team.
+- Example: "Thanks for chatting! Any questions about the role?"
+- One sentence, max 25 words.
+"""
+    return await run_deepseek_prompt(prompt)
+
+greeting_pool = VariantPool(
+    "greeting", lambda: _generate_greeting_live(NAME_PLACEHOLDER), _validate_greeting, PROMPT_POOL_SIZE, PROMPT_POOL_MAX_USES
+)
+wrap_up_pool = VariantPool(
+    "wrap_up", _generate_wrap_up_live, _validate_wrap_up, PROMPT_POOL_SIZE, PROMPT_POOL_MAX_USES
+)
+
+async def fill_prompt_pools() -> None:
+    """
+    Fill the greeting and wrap-up pools (a no-op when PROMPT_POOL_SIZE is 0).
+    """
+    fills = [task for task in (greeting_pool.refill_in_background(), wrap_up_pool.refill_in_background()) if task is not None]
+    if fills:
+        await asyncio.gather(*fills)
+
+def get_prompt_pool_stats() -> dict:
+    return {pool.name: pool.stats() for pool in (greeting_pool, wrap_up_pool)}
+
+async def generate_greeting(user_name: str) -> str:
+    template = greeting_pool.take()
+    if template is not None:
+        return _emit_pooled(template.replace(NAME_PLACEHOLDER, user_name))
+    response = await _generate_greeting_live(user_name)
     if not re.search(rf"\b{user_name}\b", response, re.IGNORECASE):
         logger.warning(f"User name '{user_name}' not in greeting: {response}")
         response = f"Hi {user_name}, {response.lstrip('Hi ,')}"
     return response
 
-def generate_first_response_after_greeting(session_id: str, user_response: str) -> str:
+async def generate_first_response_after_greeting(session_id: str, user_response: str) -> str:
     user_response_clean = user_response.strip().lower()
     asked_how = bool(re.search(r'\bhow\s+(are\s+you|you\s+doing|about\s+you)\b\??', user_response_clean))
     logger.debug(f"Asked how: {asked_how}, User response: {user_response}")
 
-    resume_text = get_resume_text(session_id)
-    r_idx, r_chunks = get_resume_index(session_id)
-    resume_keywords = extract_keywords(resume_text)[:5]
-    resume_ctx = [r["text"] for r in search_similar(", ".join(resume_keywords), r_idx, r_chunks, MODEL)] if r_idx else []
-    context_str = "\n".join(resume_ctx)
+    profile = await get_or_build_profile(session_id)
+    context_str = "\n".join(profile["first_response_context"])
     logger.debug(f"Resume context for first response: {context_str}")
 
     prompt = f"""
@@ -136,9 +470,32 @@ As {RECRUITER_NAME}, reply to candidate’s greeting: "{user_response}".
 - Resume context: {context_str}
 - One sentence, max 25 words, ending with a question mark.
 """
-    return run_deepseek_prompt(prompt, is_first_response=True)
+    return await run_deepseek_prompt(prompt, is_first_response=True)
+
+# Follow-up question prompt; recent, context and topics are fitted to the token budget
+FOLLOWUP_TEMPLATE = """
+As {recruiter}, ask a follow-up question in a Zoom interview.
+Latest exchange:
+{recent}
+
+Resume/job context:
+{context}
 
-def generate_followup_question(session_id: str, history: list) -> str:
+Topics discussed:
+{topics}
+
+Current project:
+{project}
+
+Ask one question (1 sentence, max 25 words):
+- Focus: {focus}
+- Use details from answer (e.g., {keywords}), resume, or job description.
+- Sound warm, conversational (e.g., "That’s interesting! How...").
+- Avoid repeats, slang, fluff.
+- End with a question mark.
+"""
+
+async def generate_followup_question(session_id: str, history: list) -> str:
     phase = get_phase(session_id)
     short_ct = get_short_answers_count(session_id)
     
@@ -149,107 +506,125 @@ As {RECRUITER_NAME}, notice candidate’s short answers.
 - Keep it warm, conversational.
 - One sentence, max 25 words.
 """
-        return run_deepseek_prompt(prompt)
+        return await run_deepseek_prompt(prompt)
 
-    r_idx, r_chunks = get_resume_index(session_id)
-    j_idx, j_chunks = get_job_desc_index(session_id)
-    recent = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in history[-2:])
+    profile = await get_or_build_profile(session_id)
+    vectors, chunks = get_session_vectors(session_id)
+    recent_messages = [f"{m['role'].capitalize()}: {m['content']}" for m in history[-2:]]
     asked_topics = get_asked_topics(session_id)
-    current_project = get_current_project(session_id)
-    resume_text = get_resume_text(session_id)
-    job_desc_text = get_job_desc_text(session_id)
+    phase_context = profile["phase_contexts"].get(phase, {"resume": [], "job_description": []})
+    project_index = 1 if phase == "project_2" else 0
+    current_project = get_current_project(session_id) or (
+        profile["projects"][project_index] if len(profile["projects"]) > project_index else None
+    )
 
     latest_answer = history[-1]["content"] if history and history[-1]["role"] == "user" else ""
     answer_keywords = extract_keywords(latest_answer)
     
-    resume_keywords = answer_keywords[:3] + extract_keywords(resume_text)[:3] + extract_keywords(job_desc_text)[:2]
-    resume_keywords = list(dict.fromkeys(resume_keywords))[:8]
-    resume_ctx = [r["text"] for r in search_similar(", ".join(resume_keywords), r_idx, r_chunks, MODEL)] if r_idx else []
-    jd_ctx = [r["text"] for r in search_similar(", ".join(resume_keywords), j_idx, j_chunks, MODEL)] if j_idx else []
+    # Only the latest answer needs a fresh search; the phase context was retrieved at start
+    answer_query = ", ".join(list(dict.fromkeys(answer_keywords[:3] + profile["base_keywords"]))[:8])
+    answer_resume_ctx, answer_jd_ctx = [], []
+    if answer_keywords:
+        answer_results = await asyncio.to_thread(search_documents, [answer_query], vectors, chunks, get_model())
+        answer_resume_ctx = _texts(answer_results["resume"][0])
+        answer_jd_ctx = _texts(answer_results["job_description"][0])
+    resume_ctx = _merge_context(answer_resume_ctx, phase_context["resume"])
+    jd_ctx = _merge_context(answer_jd_ctx, phase_context["job_description"])
 
     logger.debug(f"Resume context: {resume_ctx}")
     logger.debug(f"Job description context: {jd_ctx}")
 
-    focus_options = {
-        "project": "Ask about a specific project or role from resume (e.g., What did you do at Hexaware?).",
-        "project_2": "Ask about a different project or experience from resume.",
-        "technical": "Ask about a technical skill (e.g., How did you use Python?).",
-        "technical_2": "Ask about applying a skill in a scenario (e.g., Optimizing a query?).",
-        "problem-solving": "Ask about a challenge they overcame (e.g., Solving a tough bug?).",
-        "coding": "Ask a verbal coding question (e.g., Design a function for...).",
-        "behavioral": "Ask about teamwork or collaboration (e.g., Working with a team?).",
-        "behavioral_2": "Ask about leadership or initiative (e.g., Leading a project?).",
-        "role-fit": "Ask about motivation for the role (e.g., Why this job?).",
-        "closing": "Thank them and ask if they have questions about the role."
-    }
-    focus = focus_options.get(phase, "Ask about a detail from their answer or resume.")
+    focus = FOCUS_OPTIONS.get(phase, "Ask about a detail from their answer or resume.")
 
     # Avoid repeating topics
-    if recent.split("\n")[-1].startswith("Ai:"):
-        last_question = recent.split("\n")[-1].replace("Ai: ", "").strip()
+    if recent_messages and recent_messages[-1].startswith("Ai:"):
+        last_question = recent_messages[-1].replace("Ai: ", "").strip()
         if last_question in asked_topics:
             logger.warning(f"Repeated question detected: {last_question}")
-            focus = f"Ask about a new topic from resume or job description, avoiding {', '.join(asked_topics)}."
+            focus = "Ask about a new topic from resume or job description, avoiding the topics discussed."
 
-    context_str = "\n".join(resume_ctx + jd_ctx)
-    logger.debug(f"Session: {session_id}, Phase: {phase}, Recent: {recent}, Keywords: {answer_keywords}")
+    logger.debug(f"Session: {session_id}, Phase: {phase}, Recent: {recent_messages}, Keywords: {answer_keywords}")
 
-    prompt = f"""
-As {RECRUITER_NAME}, ask a follow-up question in a Zoom interview.
-Latest exchange:
-{recent}
-
-Resume/job context:
-{context_str}
-
-Topics discussed:
-{', '.join(asked_topics)}
-
-Current project:
-{current_project or 'None'}
+    fields = {
+        "recruiter": RECRUITER_NAME, "project": current_project or "None", "focus": focus,
+        "keywords": ", ".join(answer_keywords) or "none"
+    }
+    # Latest exchange first (newest message first), then context, then the topic list
+    budget = PromptBudget(FOLLOWUP_PROMPT_TOKEN_BUDGET, FOLLOWUP_TEMPLATE.format(recent="", context="", topics="", **fields))
+    recent = budget.add("recent", recent_messages[::-1], reverse=True, truncate=True)
+    context_chunks, duplicates = dedupe_chunks(resume_ctx + jd_ctx)
+    context_str = budget.add("context", context_chunks, dropped=duplicates)
+    topics = budget.add("topics", asked_topics[::-1], separator=", ", reverse=True)
+    prompt = FOLLOWUP_TEMPLATE.format(recent=recent, context=context_str, topics=topics, **fields)
 
-Ask one question (1 sentence, max 25 words):
-- Focus: {focus}
-- Use details from answer (e.g., {', '.join(answer_keywords) or 'none'}), resume, or job description.
-- Sound warm, conversational (e.g., "That’s interesting! How...").
-- Avoid repeats, slang, fluff.
-- End with a question mark.
-"""
-    response = run_deepseek_prompt(prompt)
+    logger.info(f"followup prompt sections: {budget.summary()}; trimmed {budget.trimmed_bytes} bytes, {len(duplicates)} duplicate chunks")
+    _record_prompt_tokens("followup", budget.trimmed_tokens, prompt)
+    if budget.trimmed_bytes:
+        inc("prompt_trimmed_bytes_total", budget.trimmed_bytes, kind="followup")
+    response = await run_deepseek_prompt(prompt)
     return response
 
-def generate_end_of_interview_question() -> str:
-    prompt = f"""
-As {RECRUITER_NAME}, wrap up the Zoom interview.
-- Thank the candidate warmly and ask if they have questions about the role or team.
-- Example: "Thanks for chatting! Any questions about the role?"
-- One sentence, max 25 words.
-"""
-    return run_deepseek_prompt(prompt)
+async def generate_end_of_interview_question() -> str:
+    variant = wrap_up_pool.take()
+    if variant is not None:
+        return _emit_pooled(variant)
+    return await _generate_wrap_up_live()
 
-def generate_answer_to_candidate(candidate_question: str, history: list, session_id: str) -> str:
+async def generate_answer_to_candidate(candidate_question: str, history: list, session_id: str) -> str:
     convo = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in history[-4:])
-    job_desc_text = get_job_desc_text(session_id)
+    # Only the parts of the job description relevant to the question, not all of it
+    vectors, chunks = get_session_vectors(session_id)
+    job_desc_results = (await asyncio.to_thread(
+        search_documents, [candidate_question], vectors, chunks, get_model(), documents=("job_description",)
+    ))["job_description"][0]
+    job_desc_context = "\n".join(_texts(job_desc_results))
     prompt = f"""
 As {RECRUITER_NAME}, answer candidate’s question: "{candidate_question}".
 Recent convo:
 {convo}
 Job description:
-{job_desc_text}
+{job_desc_context}
 
 Reply in 1-2 sentences, max 40 words:
 - Use a warm, conversational tone, like answering a colleague.
 - Tie to the role, team, or job description if relevant (e.g., "We use agile sprints...").
 - End with: "Any other questions?"
 """
-    response = run_deepseek_prompt(prompt)
+    _record_prompt_tokens("candidate_answer", estimate_tokens(get_job_desc_text(session_id)) - estimate_tokens(job_desc_context), prompt)
+    response = await run_deepseek_prompt(prompt)
     if not response.endswith("Any other questions?"):
         response += " Any other questions?"
     set_phase(session_id, "closing")
     return response
 
-def generate_feedback(history: list) -> str:
-    convo = "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in history)
+def _format_convo(messages: list) -> str:
+    return "\n".join(f"{m['role'].capitalize()}: {m['content']}" for m in messages)
+
+def _summarized_convo(history: list, summaries: Dict[str, str]) -> str:
+    """
+    The conversation in PHASE_ORDER with each summarized phase replaced by its note
+    when the note is shorter. Other phases (and untagged messages) stay verbatim.
+    """
+    sections = []
+    untagged = [m for m in history if m.get("phase") not in PHASE_ORDER]
+    if untagged:
+        sections.append(_format_convo(untagged))
+    for phase in PHASE_ORDER:
+        messages = [m for m in history if m.get("phase") == phase]
+        if not messages:
+            continue
+        verbatim = _format_convo(messages)
+        note = f"[{phase} summary] {summaries[phase]}" if phase in summaries else None
+        sections.append(note if note is not None and len(note) < len(verbatim) else verbatim)
+    return "\n".join(sections)
+
+async def generate_feedback(history: list, session_id: Optional[str] = None) -> str:
+    """
+    Generate end-of-interview feedback. With a session_id, finished phases are given
+    as their summary notes rather than verbatim, which bounds the prompt size.
+    """
+    summaries = await wait_for_phase_summaries(session_id) if session_id else {}
+    convo = _summarized_convo(history, summaries) if summaries else _format_convo(history)
     prompt = f"""
 As {RECRUITER_NAME}, provide detailed feedback after a Zoom interview.
 Conversation:
@@ -262,4 +637,179 @@ Conversation:
 - Use a warm, constructive tone, like a friendly email.
 - Max 150 words.
 """
-    return run_deepseek_prompt(prompt, is_feedback=True)
\ No newline at end of file
+    if summaries:
+        _record_prompt_tokens("feedback", estimate_tokens(_format_convo(history)) - estimate_tokens(convo), prompt)
+    return await run_deepseek_prompt(prompt, is_feedback=True)
+
+# Prompt sizes with and without summaries/retrieval/token budgets, per prompt kind
+_prompt_tokens: Dict[str, Dict[str, int]] = {}
+
+def _record_prompt_tokens(kind: str, saved: int, prompt: str) -> None:
+    after = estimate_tokens(prompt)
+    before = after + saved
+    stats = _prompt_tokens.setdefault(kind, {"prompts": 0, "tokens_before": 0, "tokens_after": 0})
+    stats["prompts"] += 1
+    stats["tokens_before"] += before
+    stats["tokens_after"] += after
+    logger.info(f"{kind} prompt: ~{before} tokens unbounded, ~{after} tokens sent")
+
+def get_prompt_stats() -> dict:
+    """
+    Report estimated prompt tokens before and after summarization/retrieval/budgeting, per prompt kind.
+    """
+    return {kind: dict(stats) for kind, stats in _prompt_tokens.items()}
+
+# Background phase summaries per session: phase -> task
+_summary_tasks: Dict[str, Dict[str, "asyncio.Task"]] = {}
+
+async def summarize_phase(session_id: str, phase: str) -> Optional[str]:
+    """
+    Compress the messages of a finished phase into a short note and store it on the session.
+    """
+    messages = [m for m in get_history(session_id) if m.get("phase") == phase]
+    if not any(m["role"] == "user" for m in messages):
+        return None
+    prompt = f"""
+Summarize the candidate's answers in the {phase} part of an interview as one note, max 40 words.
+Conversation:
+{_format_convo(messages)}
+
+Cover: topics discussed, specific evidence (tools, results), strengths, gaps. No greeting, no advice.
+"""
+    messages = [
+        {"role": "system", "content": "You write terse interviewer notes."},
+        {"role": "user", "content": prompt}
+    ]
+    try:
+        summary = (await complete_chat(messages, max_tokens=PHASE_SUMMARY_MAX_TOKENS, temperature=0.3)).strip()
+    except Exception as e:
+        logger.error(f"Summarizing {phase} failed for session {session_id}: {str(e)}")
+        return None
+    if summary:
+        set_phase_summary(session_id, phase, summary)
+    return summary or None
+
+def summarize_phase_in_background(session_id: str, phase: str) -> None:
+    """
+    Start summarizing a finished phase unless it is already summarized or in flight.
+    """
+    if phase == "greeting" or phase in get_phase_summaries(session_id):
+        return
+    tasks = _summary_tasks.setdefault(session_id, {})
+    if phase in tasks:
+        return
+    
+    async def run() -> Optional[str]:
+        _token_sink.set(None)
+        return await summarize_phase(session_id, phase)
+    
+    task = asyncio.create_task(run())
+    tasks[phase] = task
+    
+    def forget(_) -> None:
+        session_tasks = _summary_tasks.get(session_id, {})
+        if session_tasks.get(phase) is task:
+            del session_tasks[phase]
+            if not session_tasks:
+                _summary_tasks.pop(session_id, None)
+    
+    task.add_done_callback(forget)
+    logger.debug(f"Summarizing {phase} for session {session_id}")
+
+async def wait_for_phase_summaries(session_id: str, timeout: Optional[float] = None) -> Dict[str, str]:
+    """
+    Wait briefly for in-flight phase summaries, then return all stored ones.
+    """
+    tasks = list(_summary_tasks.get(session_id, {}).values())
+    if tasks:
+        await asyncio.wait(tasks, timeout=PHASE_SUMMARY_WAIT_SECONDS if timeout is None else timeout)
+    return get_phase_summaries(session_id)
+
+# In-flight feedback generation per session: (transcript length, task, event that
+# ends the precompute delay early)
+_feedback_tasks: Dict[str, Tuple[int, "asyncio.Task", asyncio.Event]] = {}
+
+def _feedback_transcript(history: list) -> list:
+    """
+    The history through the last interviewer message; a closing "no" from the
+    candidate after it does not change the feedback.
+    """
+    for i in range(len(history) - 1, -1, -1):
+        if history[i]["role"] == "ai":
+            return history[:i + 1]
+    return history
+
+def _start_feedback(session_id: str, transcript: list, delay: float = 0.0) -> "asyncio.Task":
+    """
+    Get the task generating feedback for transcript, starting one after delay seconds
+    if none is in flight for it. An in-flight task for an older transcript is
+    cancelled, since its result would never be used.
+    """
+    length = len(transcript)
+    inflight = _feedback_tasks.get(session_id)
+    if inflight is not None:
+        inflight_length, inflight_task, start_now = inflight
+        if inflight_length == length:
+            if not delay:
+                start_now.set()
+            return inflight_task
+        inflight_task.cancel()
+        logger.debug(f"Cancelled feedback for session {session_id} at {inflight_length} messages")
+    
+    start_now = asyncio.Event()
+    
+    async def run() -> str:
+        _token_sink.set(None)  # Never stream into the request that started this
+        if delay:
+            try:
+                await asyncio.wait_for(start_now.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+        feedback = await generate_feedback(transcript, session_id)
+        # The fallback means the LLM call failed; leave the cache empty so a retry regenerates
+        if feedback != FALLBACK_FEEDBACK:
+            set_session_feedback(session_id, feedback, length)
+        return feedback
+    
+    task = asyncio.create_task(run())
+    _feedback_tasks[session_id] = (length, task, start_now)
+    
+    def forget(done: "asyncio.Task") -> None:
+        if _feedback_tasks.get(session_id, (None, None, None))[1] is done:
+            del _feedback_tasks[session_id]
+        if not done.cancelled() and done.exception() is not None:
+            logger.error(f"Feedback generation failed for session {session_id}: {str(done.exception())}")
+    
+    task.add_done_callback(forget)
+    return task
+
+def precompute_feedback(session_id: str) -> None:
+    """
+    Start generating feedback for the current transcript in the background, unless
+    it is already cached or in flight. The LLM call waits FEEDBACK_PRECOMPUTE_DELAY_SECONDS
+    and is cancelled if a newer transcript replaces this one first.
+    """
+    transcript = _feedback_transcript(get_history(session_id))
+    if get_session_feedback(session_id, len(transcript)) is None:
+        _start_feedback(session_id, transcript, FEEDBACK_PRECOMPUTE_DELAY_SECONDS)
+        logger.debug(f"Precomputing feedback for session {session_id} at {len(transcript)} messages")
+
+async def get_or_generate_feedback(session_id: str, history: Optional[list] = None) -> str:
+    """
+    Get feedback for the session: cached, awaited from an in-flight precompute, or
+    generated now (and cached) if neither exists.
+    """
+    transcript = _feedback_transcript(history if history is not None else get_history(session_id))
+    cached = get_session_feedback(session_id, len(transcript))
+    if cached is not None:
+        logger.debug(f"Feedback cache hit for session {session_id}")
+        return cached
+    while True:
+        task = _start_feedback(session_id, transcript)
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # Superseded by a newer transcript (not this request being cancelled): use it
+            if asyncio.current_task().cancelling() or not task.cancelled():
+                raise
+            transcript = _feedback_transcript(get_history(session_id))
@@ -0,0 +1,212 @@
+# Per-interview session state: a slotted object with running counters and set-backed
+# membership, so per-turn bookkeeping does not scan the history or topic lists.
+import json
+from typing import Dict, List, Optional
+
+from vector_store import SessionVectors
+
+def is_question(role: str, content: str) -> bool:
+    """
+    Whether a message counts as an interview question.
+    """
+    return role == "ai" and content.endswith("?")
+
+def estimate_session_bytes(session: "Session") -> int:
+    """
+    Estimate the memory held by a session: texts, chunks, history, chunk vectors and
+    the derived payloads (profile, cached feedback, phase summaries, tracked lists).
+    Walks the whole session; Session.nbytes keeps the same figure up to date.
+    """
+    size = session._document_bytes()
+    size += sum(_message_bytes(message) for message in session.history)
+    for items in (session.asked_topics, session.tracked_context, session.used_transitions, session.used_acks):
+        size += sum(len(item) for item in items)
+    size += sum(len(summary) for summary in session.phase_summaries.values())
+    size += _profile_bytes(session.profile)
+    if session.feedback is not None:
+        size += len(session.feedback["text"])
+    return size
+
+class Session:
+    """
+    State of one interview session.
+
+    FIELDS are the persisted attributes; to_state() / from_state() convert them to and
+    from a plain dict for stores that serialize sessions. question_count, nbytes (see
+    estimate_session_bytes) and the membership sets behind asked_topics, tracked_context
+    and used_transitions are kept up to date by the add_* and set_* methods, so those
+    fields must only be changed through them.
+    """
+
+    FIELDS = (
+        "user_name", "history", "phase", "resume_chunks", "resume_text", "job_desc_chunks",
+        "job_desc_text", "vectors", "is_active", "awaiting_candidate_question",
+        "short_answers_count", "question_count", "asked_topics", "current_project", "used_acks",
+        "tracked_context", "used_transitions", "profile", "ingestion", "feedback", "phase_summaries",
+        "nbytes"
+    )
+    __slots__ = FIELDS + ("_asked_topic_set", "_tracked_context_set", "_used_transition_set")
+
+    def __init__(
+        self,
+        user_name: str = "",
+        resume_chunks: Optional[List[str]] = None,
+        resume_text: str = "",
+        job_desc_chunks: Optional[List[str]] = None,
+        job_desc_text: str = "",
+        vectors: Optional[SessionVectors] = None
+    ):
+        self.user_name = user_name
+        self.history: List[dict] = []
+        self.phase = "greeting"
+        self.resume_chunks = resume_chunks if resume_chunks is not None else []
+        self.resume_text = resume_text
+        self.job_desc_chunks = job_desc_chunks if job_desc_chunks is not None else []
+        self.job_desc_text = job_desc_text
+        self.vectors = vectors
+        self.is_active = True
+        self.awaiting_candidate_question = False
+        self.short_answers_count = 0
+        self.question_count = 0
+        self.asked_topics: List[str] = []
+        self.current_project: Optional[str] = None
+        self.used_acks: List[str] = []
+        self.tracked_context: List[str] = []
+        self.used_transitions: List[str] = []
+        self.profile: Optional[dict] = None
+        self.ingestion = {"status": "ready"}
+        self.feedback: Optional[dict] = None
+        self.phase_summaries: Dict[str, str] = {}
+        self._asked_topic_set = set()
+        self._tracked_context_set = set()
+        self._used_transition_set = set()
+        self.nbytes = self._document_bytes()
+
+    def _document_bytes(self) -> int:
+        size = len(self.resume_text) + len(self.job_desc_text)
+        size += sum(len(chunk) for chunk in self.resume_chunks)
+        size += sum(len(chunk) for chunk in self.job_desc_chunks)
+        if self.vectors is not None:
+            size += self.vectors.nbytes
+        return size
+
+    def add_message(self, message: dict) -> None:
+        """
+        Append a message to the history and count it if it is a question.
+        """
+        self.history.append(message)
+        self.nbytes += _message_bytes(message)
+        if is_question(message["role"], message["content"]):
+            self.question_count += 1
+
+    def annotate_message(self, index: int, annotations: dict) -> None:
+        """
+        Add keywords and retrieval context to the message at index.
+        """
+        message = self.history[index]
+        self.nbytes -= _message_bytes(message)
+        message.update(annotations)
+        self.nbytes += _message_bytes(message)
+
+    def set_documents(
+        self,
+        resume_chunks: List[str],
+        resume_text: str,
+        job_desc_chunks: List[str],
+        job_desc_text: str,
+        vectors: Optional[SessionVectors]
+    ) -> None:
+        """
+        Replace the resume and job description texts, chunks and chunk vectors.
+        """
+        self.nbytes -= self._document_bytes()
+        self.resume_chunks = resume_chunks
+        self.resume_text = resume_text
+        self.job_desc_chunks = job_desc_chunks
+        self.job_desc_text = job_desc_text
+        self.vectors = vectors
+        self.nbytes += self._document_bytes()
+
+    def set_profile(self, profile: dict) -> None:
+        """
+        Replace the precomputed candidate profile.
+        """
+        self.nbytes += _profile_bytes(profile) - _profile_bytes(self.profile)
+        self.profile = profile
+
+    def set_feedback(self, history_length: int, text: str) -> None:
+        """
+        Replace the cached feedback, which covers the first history_length messages.
+        """
+        if self.feedback is not None:
+            self.nbytes -= len(self.feedback["text"])
+        self.feedback = {"history_length": history_length, "text": text}
+        self.nbytes += len(text)
+
+    def set_phase_summary(self, phase: str, summary: str) -> None:
+        """
+        Store the summary note of a finished phase.
+        """
+        self.nbytes += len(summary) - len(self.phase_summaries.get(phase, ""))
+        self.phase_summaries[phase] = summary
+
+    def add_asked_topic(self, topic: str) -> bool:
+        """
+        Add a topic to asked_topics; returns False if it was already there.
+        """
+        return self._add_unique(self.asked_topics, self._asked_topic_set, topic)
+
+    def add_tracked_context(self, topic: str) -> bool:
+        """
+        Add a topic to tracked_context; returns False if it was already there.
+        """
+        return self._add_unique(self.tracked_context, self._tracked_context_set, topic)
+
+    def add_used_transition(self, transition: str) -> bool:
+        """
+        Add a transition to used_transitions; returns False if it was already there.
+        """
+        return self._add_unique(self.used_transitions, self._used_transition_set, transition)
+
+    def _add_unique(self, items: List[str], seen: set, value: str) -> bool:
+        if value in seen:
+            return False
+        seen.add(value)
+        items.append(value)
+        self.nbytes += len(value)
+        return True
+
+    def to_state(self) -> dict:
+        """
+        The persisted fields as a dict; values are shared, not copied.
+        """
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "Session":
+        """
+        Rebuild a session from to_state() output. Missing fields keep their defaults,
+        and the counters and sets are rebuilt for state written before they existed.
+        """
+        session = cls()
+        for field in cls.FIELDS:
+            if field in state:
+                setattr(session, field, state[field])
+        if "question_count" not in state:
+            session.question_count = sum(is_question(m["role"], m["content"]) for m in session.history)
+        if "nbytes" not in state:
+            session.nbytes = estimate_session_bytes(session)
+        session._asked_topic_set = set(session.asked_topics)
+        session._tracked_context_set = set(session.tracked_context)
+        session._used_transition_set = set(session.used_transitions)
+        return session
+
+def _message_bytes(message: dict) -> int:
+    size = len(message["content"]) + 64
+    for results in message.get("context", {}).values():
+        size += sum(len(r["text"]) + 32 for r in results)
+    return size
+
+def _profile_bytes(profile: Optional[dict]) -> int:
+    # Nested lists of retrieved chunks; its JSON length is a close measure of its text
+    return len(json.dumps(profile)) if profile is not None else 0
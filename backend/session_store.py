@@ -0,0 +1,355 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from session import Session
+from vector_store import SessionVectors
+
+# Set up logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Session fields holding SessionVectors; stored as serialized blobs, not JSON
+INDEX_FIELDS = ("vectors",)
+
+class SessionStore(ABC):
+    """
+    Interface for where interview sessions live.
+
+    get() returns the Session (or None). Backends that keep sessions outside the
+    process copy on get, so a mutation is only persisted once it is written back;
+    changes to an existing session go through update(), since a get() then put()
+    can overwrite a concurrent write with a stale copy.
+    """
+
+    @abstractmethod
+    def get(self, session_id: str) -> Optional[Session]:
+        ...
+
+    @abstractmethod
+    def put(self, session_id: str, session: Session) -> None:
+        ...
+
+    def put_many(self, sessions: Dict[str, Session]) -> None:
+        """
+        Write several sessions at once; backends with transactions use a single one.
+        """
+        for session_id, session in sessions.items():
+            self.put(session_id, session)
+
+    @abstractmethod
+    def update(self, session_id: str, fn: Callable[[Session], Optional[bool]]) -> Optional[Session]:
+        """
+        Apply fn to the session and write it back atomically, so concurrent updates to
+        the same session are not lost. fn returning False skips the write. Returns the
+        updated session, or None (without calling fn) if it does not exist.
+        """
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+    @abstractmethod
+    def ids(self) -> List[str]:
+        ...
+
+    @abstractmethod
+    def idle_ids(self, cutoff: float) -> List[str]:
+        """
+        Session IDs not used since the Unix timestamp cutoff.
+        """
+
+    @abstractmethod
+    def sizes(self) -> List[Tuple[str, int, int]]:
+        """
+        (session_id, Session.nbytes, bytes of its vectors) for every session, ordered
+        from least to most recently used, as last written by any process.
+        """
+
+    @abstractmethod
+    def total_bytes(self) -> int:
+        """
+        Sum of Session.nbytes over all sessions.
+        """
+
+    def __len__(self) -> int:
+        return len(self.ids())
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sessions in a process-local dict; get() returns the live object.
+    Both get() and put() count as a use for LRU order and idle time.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Session] = {}
+        self._last_used: "OrderedDict[str, float]" = OrderedDict()
+        # Sum of Session.nbytes, adjusted by put(), update() and delete()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+
+    def _touch(self, session_id: str) -> None:
+        with self._lock:
+            self._last_used[session_id] = time.time()
+            self._last_used.move_to_end(session_id)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._touch(session_id)
+        return session
+
+    def put(self, session_id: str, session: Session) -> None:
+        with self._lock:
+            previous = self._sessions.get(session_id)
+            self._total_bytes += session.nbytes - (previous.nbytes if previous is not None else 0)
+            self._sessions[session_id] = session
+        self._touch(session_id)
+
+    def update(self, session_id: str, fn: Callable[[Session], Optional[bool]]) -> Optional[Session]:
+        with self._update_lock:
+            session = self.get(session_id)
+            if session is not None:
+                before = session.nbytes
+                fn(session)
+                with self._lock:
+                    self._total_bytes += session.nbytes - before
+            return session
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            if session is not None:
+                self._total_bytes -= session.nbytes
+            self._last_used.pop(session_id, None)
+
+    def ids(self) -> List[str]:
+        return list(self._sessions.keys())
+
+    def idle_ids(self, cutoff: float) -> List[str]:
+        idle = []
+        with self._lock:
+            for session_id, last_used in self._last_used.items():
+                if last_used >= cutoff:
+                    break
+                idle.append(session_id)
+        return idle
+
+    def sizes(self) -> List[Tuple[str, int, int]]:
+        with self._lock:
+            sessions = [(session_id, self._sessions.get(session_id)) for session_id in self._last_used]
+        return [
+            (session_id, session.nbytes, session.vectors.nbytes if session.vectors is not None else 0)
+            for session_id, session in sessions if session is not None
+        ]
+
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions in a SQLite file shared by every worker process on the host.
+    Only put() counts as a use for LRU order and idle time (every turn writes).
+
+    Plain state (Session.to_state) is stored as JSON and rewritten on every put().
+    Session vectors never change after ingestion, so they are written once with
+    SessionVectors.to_bytes and deserialized objects are cached per process. Each
+    row also carries the session's byte sizes, so every worker sees the same totals.
+    """
+
+    def __init__(self, path: str, index_cache_size: int = 256):
+        self.path = path
+        self._local = threading.local()
+        self._index_cache = OrderedDict()
+        self._index_cache_size = index_cache_size
+        self._cache_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL, "
+                "nbytes INTEGER NOT NULL DEFAULT 0, vector_bytes INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            for column in ("nbytes", "vector_bytes"):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE sessions ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            # LRU order plus the sizes, so idle_ids(), sizes() and total_bytes() never read
+            # the state column; it replaces the index on updated_at alone
+            conn.execute("DROP INDEX IF EXISTS sessions_updated_at")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS sessions_lru ON sessions (updated_at, session_id, nbytes, vector_bytes)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS session_indexes ("
+                "session_id TEXT NOT NULL, field TEXT NOT NULL, data BLOB NOT NULL, "
+                "PRIMARY KEY (session_id, field))"
+            )
+        logger.info(f"Using SQLite session store at {path}")
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _cached_index(self, key):
+        with self._cache_lock:
+            index = self._index_cache.get(key)
+            if index is not None:
+                self._index_cache.move_to_end(key)
+            return index
+
+    def _cache_index(self, key, index) -> None:
+        with self._cache_lock:
+            self._index_cache[key] = index
+            self._index_cache.move_to_end(key)
+            while len(self._index_cache) > self._index_cache_size:
+                self._index_cache.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[Session]:
+        return self._read(self._connection(), session_id)
+
+    def _read(self, conn: sqlite3.Connection, session_id: str) -> Optional[Session]:
+        row = conn.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        if row is None:
+            return None
+        state = json.loads(row[0])
+        for field in INDEX_FIELDS:
+            state[field] = None
+            if not state.pop(f"has_{field}", False):
+                continue
+            index = self._cached_index((session_id, field))
+            if index is None:
+                blob = conn.execute(
+                    "SELECT data FROM session_indexes WHERE session_id = ? AND field = ?", (session_id, field)
+                ).fetchone()
+                if blob is None:
+                    logger.error(f"Missing {field} for session {session_id}")
+                    continue
+                index = SessionVectors.from_bytes(blob[0])
+                self._cache_index((session_id, field), index)
+            state[field] = index
+        return Session.from_state(state)
+
+    def _write(self, conn: sqlite3.Connection, session_id: str, session: Session) -> list:
+        """Write one session inside the caller's transaction; returns the indexes it wrote."""
+        state = {key: value for key, value in session.to_state().items() if key not in INDEX_FIELDS}
+        new_indexes = []
+        for field in INDEX_FIELDS:
+            index = getattr(session, field)
+            state[f"has_{field}"] = index is not None
+            if index is not None and self._cached_index((session_id, field)) is not index:
+                new_indexes.append((session_id, field, index))
+
+        for _, field, index in new_indexes:
+            conn.execute(
+                "INSERT OR REPLACE INTO session_indexes (session_id, field, data) VALUES (?, ?, ?)",
+                (session_id, field, index.to_bytes())
+            )
+        vector_bytes = session.vectors.nbytes if session.vectors is not None else 0
+        conn.execute(
+            "INSERT OR REPLACE INTO sessions (session_id, state, updated_at, nbytes, vector_bytes) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (session_id, json.dumps(state), time.time(), session.nbytes, vector_bytes)
+        )
+        return new_indexes
+
+    def put(self, session_id: str, session: Session) -> None:
+        self.put_many({session_id: session})
+
+    def put_many(self, sessions: Dict[str, Session]) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            new_indexes = [
+                written for session_id, session in sessions.items()
+                for written in self._write(conn, session_id, session)
+            ]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for session_id, field, index in new_indexes:
+            self._cache_index((session_id, field), index)
+
+    def update(self, session_id: str, fn: Callable[[Session], Optional[bool]]) -> Optional[Session]:
+        conn = self._connection()
+        # The write lock is taken before reading, so no other writer can slip in between
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            session = self._read(conn, session_id)
+            new_indexes = []
+            if session is not None and fn(session) is not False:
+                new_indexes = self._write(conn, session_id, session)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        for _, field, index in new_indexes:
+            self._cache_index((session_id, field), index)
+        return session
+
+    def delete(self, session_id: str) -> None:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("DELETE FROM session_indexes WHERE session_id = ?", (session_id,))
+        conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+        conn.execute("COMMIT")
+        with self._cache_lock:
+            for field in INDEX_FIELDS:
+                self._index_cache.pop((session_id, field), None)
+
+    def ids(self) -> List[str]:
+        return [row[0] for row in self._connection().execute("SELECT session_id FROM sessions")]
+
+    def idle_ids(self, cutoff: float) -> List[str]:
+        rows = self._connection().execute(
+            "SELECT session_id FROM sessions WHERE updated_at < ? ORDER BY updated_at", (cutoff,)
+        )
+        return [row[0] for row in rows]
+
+    def sizes(self) -> List[Tuple[str, int, int]]:
+        rows = self._connection().execute(
+            "SELECT session_id, nbytes, vector_bytes FROM sessions ORDER BY updated_at"
+        )
+        return [tuple(row) for row in rows]
+
+    def total_bytes(self) -> int:
+        return self._connection().execute("SELECT COALESCE(SUM(nbytes), 0) FROM sessions").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def __contains__(self, session_id: str) -> bool:
+        row = self._connection().execute("SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return row is not None
+
+def create_store(backend: Optional[str] = None, path: Optional[str] = None) -> SessionStore:
+    """
+    Create the session store selected by SESSION_STORE ("memory" or "sqlite").
+    """
+    backend = (backend or os.getenv("SESSION_STORE", "memory")).lower()
+    if backend == "memory":
+        return InMemorySessionStore()
+    if backend == "sqlite":
+        return SQLiteSessionStore(path or os.getenv("SESSION_DB_PATH", "sessions.db"))
+    raise ValueError(f"Unknown session store: {backend}")
@@ -1,76 +1,422 @@
-import fitz  # PyMuPDF
+import hashlib
 import logging
-from io import BytesIO
-try:
-    import pytesseract
-    from PIL import Image
-    OCR_AVAILABLE = True
-except ImportError:
-    OCR_AVAILABLE = False
-from sentence_transformers import SentenceTransformer
-import faiss
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pdf_worker import OCR_AVAILABLE, scan_pages, choose_ocr_dpi, ocr_pages
 import numpy as np
+from embedding_batcher import EmbeddingBatcher
+from metrics import inc, span
+from vector_store import DOCUMENTS
+import os
 import re
+import threading
+import time
 
 # Set up logging
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def extract_text_from_pdf(pdf_bytes):
+# PDF extraction pool size (0 runs extraction in the calling thread) and OCR limits
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "120"))
+# Render budget per page: a US Letter page at 300 DPI
+OCR_TARGET_PIXELS = int(os.getenv("OCR_TARGET_PIXELS", str(2550 * 3300)))
+# Rough Tesseract throughput per worker, used to fit OCR into the time budget
+OCR_PIXELS_PER_SECOND = float(os.getenv("OCR_PIXELS_PER_SECOND", "4000000"))
+PDF_TIME_BUDGET_SECONDS = float(os.getenv("PDF_TIME_BUDGET_SECONDS", "20"))
+
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+
+# Embedding model shared by every session, index and prompt in this process
+EMBEDDING_MODEL_NAME = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# Inference backend: "torch" (default), "onnx" or "onnx-int8" (ONNX Runtime, needs the
+# sentence-transformers[onnx] extra). EMBEDDING_ONNX_FILE overrides the model file
+# loaded from the model repository, e.g. onnx/model_qint8_arm64.onnx on ARM hosts
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_FILE = os.getenv("EMBEDDING_ONNX_FILE")
+ONNX_MODEL_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_quint8_avx2.onnx"}
+# Embeddings from different backends are close but not identical, so on-disk caches
+# key them separately; the torch backend keeps the plain model name
+EMBEDDING_MODEL_ID = EMBEDDING_MODEL_NAME if EMBEDDING_BACKEND == "torch" else f"{EMBEDDING_MODEL_NAME}@{EMBEDDING_BACKEND}"
+
+# Concurrent encode calls are batched for up to this long; 0 encodes each call directly
+EMBEDDING_BATCH_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "2"))
+EMBEDDING_MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "64"))
+
+_models = {}
+_model_load_seconds = {}
+_models_lock = threading.Lock()
+_batchers = {}
+
+def load_embedding_model(model_name=EMBEDDING_MODEL_NAME, backend=None):
+    """
+    Load a SentenceTransformer for model_name on the given backend (default
+    EMBEDDING_BACKEND). Every backend returns the same embedding dimension, so
+    indexes built with one can be searched with another.
+    """
+    backend = (backend or EMBEDDING_BACKEND).lower()
+    # Imported here: sentence_transformers pulls in torch, which takes seconds
+    from sentence_transformers import SentenceTransformer
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend in ONNX_MODEL_FILES:
+        file_name = EMBEDDING_ONNX_FILE or ONNX_MODEL_FILES[backend]
+        return SentenceTransformer(model_name, backend="onnx", model_kwargs={"file_name": file_name})
+    raise ValueError(f"Unknown embedding backend: {backend}")
+
+def get_model(model_name=EMBEDDING_MODEL_NAME):
+    """
+    Get the process-wide SentenceTransformer for model_name, loading it on first use.
+    Safe to call from multiple threads; concurrent first calls load the model only once.
+    """
+    model = _models.get(model_name)
+    if model is not None:
+        return model
+    
+    with _models_lock:
+        model = _models.get(model_name)
+        if model is None:
+            start = time.perf_counter()
+            model = load_embedding_model(model_name)
+            _model_load_seconds[model_name] = time.perf_counter() - start
+            _models[model_name] = model
+            logger.info(f"Loaded embedding model {model_name} ({EMBEDDING_BACKEND}) in {_model_load_seconds[model_name]:.2f}s")
+    return model
+
+def warmup_models(model_names=None):
+    """
+    Load the embedding models and run one encode so the first request does not pay for it.
+    """
+    for model_name in model_names or [EMBEDDING_MODEL_NAME]:
+        get_model(model_name).encode(["warmup"], convert_to_numpy=True)
+        get_batcher(model_name)
+        logger.info(f"Warmed up embedding model {model_name}")
+
+def get_rss_bytes():
+    """
+    Get the resident set size of the current process in bytes (0 if unavailable).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    try:
+        import resource
+        import sys
+        # ru_maxrss is the peak, in KiB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return 0
+
+def get_model_stats():
+    """
+    Report loaded embedding models, their parameter memory and the process RSS.
+    """
+    models = {}
+    for model_name, model in list(_models.items()):
+        param_bytes = sum(p.numel() * p.element_size() for p in model.parameters())
+        models[model_name] = {
+            "parameter_bytes": param_bytes,
+            "load_seconds": round(_model_load_seconds.get(model_name, 0.0), 3)
+        }
+    return {
+        "models": models,
+        "backend": EMBEDDING_BACKEND,
+        "rss_bytes": get_rss_bytes(),
+        "embedding_cache": _embedding_cache.stats(),
+        "batchers": {model_name: batcher.stats() for model_name, batcher in list(_batchers.items())}
+    }
+
+def get_batcher(model_name=EMBEDDING_MODEL_NAME):
+    """
+    Get the shared micro-batching worker for model_name, or None if batching is disabled.
+    """
+    if EMBEDDING_BATCH_WAIT_MS <= 0:
+        return None
+    batcher = _batchers.get(model_name)
+    if batcher is not None:
+        return batcher
+    
+    model = get_model(model_name)
+    with _models_lock:
+        batcher = _batchers.get(model_name)
+        if batcher is None:
+            batcher = EmbeddingBatcher(
+                model,
+                max_batch_size=EMBEDDING_MAX_BATCH_SIZE,
+                max_wait_ms=EMBEDDING_BATCH_WAIT_MS,
+                name=f"embedding-batcher-{model_name}"
+            )
+            _batchers[model_name] = batcher
+    return batcher
+
+class EmbeddingCache:
+    """
+    Byte-bounded LRU cache of embeddings keyed by model name and a hash of the text.
+    """
+    # Rough per-entry cost of the key, OrderedDict slot and ndarray header
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(model_name, text):
+        return model_name, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+    def get(self, key):
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return embedding
+
+    def put(self, key, embedding):
+        size = embedding.nbytes + self.ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.current_bytes -= previous.nbytes + self.ENTRY_OVERHEAD
+            self._entries[key] = embedding
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.current_bytes -= evicted.nbytes + self.ENTRY_OVERHEAD
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.current_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+_embedding_cache = EmbeddingCache(int(os.getenv("EMBEDDING_CACHE_MAX_BYTES", str(64 * 1024 * 1024))))
+
+def _model_name_for(model):
+    """
+    Find the registry name of a model instance, or None if it was not loaded via get_model.
+    """
+    for model_name, registered in list(_models.items()):
+        if registered is model:
+            return model_name
+    return None
+
+def encode_texts(texts, model=None):
+    """
+    Encode texts to a float32 matrix, serving repeated texts from the embedding cache.
+    Args:
+        texts (list[str]): Texts to encode.
+        model: Model instance; defaults to the shared registry model.
+    Returns:
+        np.ndarray: One embedding row per text, in input order.
+    """
+    model = model if model is not None else get_model()
+    model_name = _model_name_for(model)
+    if model_name is None:
+        # Unregistered models have no stable name to key on, so bypass the cache
+        return model.encode(texts, convert_to_numpy=True)
+    
+    keys = [EmbeddingCache.key(model_name, text) for text in texts]
+    rows = [_embedding_cache.get(key) for key in keys]
+    missing = {}
+    for i, row in enumerate(rows):
+        if row is None:
+            missing.setdefault(texts[i], []).append(i)
+    
+    if missing:
+        batcher = get_batcher(model_name)
+        with span("encode"):
+            if batcher is not None:
+                encoded = batcher.encode(list(missing))
+            else:
+                encoded = model.encode(list(missing), convert_to_numpy=True)
+        for (text, positions), embedding in zip(missing.items(), encoded):
+            embedding = np.ascontiguousarray(embedding, dtype=np.float32)
+            embedding.setflags(write=False)
+            _embedding_cache.put(keys[positions[0]], embedding)
+            for i in positions:
+                rows[i] = embedding
+        logger.debug(f"Embedding cache: {len(texts) - len(missing)} hits, {len(missing)} encoded")
+    
+    return np.vstack(rows).astype(np.float32, copy=False)
+
+def _get_pdf_pool():
+    """
+    Get the shared PDF extraction process pool, creating it on first use.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                # spawn: forking a process that already runs torch threads can deadlock
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=PDF_WORKERS,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+                logger.info(f"Started PDF extraction pool with {PDF_WORKERS} workers")
+    return _pdf_pool
+
+def _discard_pdf_pool(pool):
+    """
+    Drop a broken pool so the next caller starts a fresh one; a no-op if another
+    thread has already replaced it.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_pdf_pool():
+    """
+    Stop the PDF extraction pool, if it was started.
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is not None:
+            _pdf_pool.shutdown(cancel_futures=True)
+            _pdf_pool = None
+
+def _plan_ocr_dpi(page_sizes, workers, budget_seconds):
+    """
+    Choose a DPI per OCR page: as sharp as the page size allows, scaled down together
+    when the projected OCR time would not fit in the time budget.
+    """
+    dpis = [choose_ocr_dpi(w, h, OCR_MAX_DPI, OCR_MIN_DPI, OCR_TARGET_PIXELS) for w, h in page_sizes]
+    pixels = sum((w / 72 * dpi) * (h / 72 * dpi) for (w, h), dpi in zip(page_sizes, dpis))
+    projected = pixels / OCR_PIXELS_PER_SECOND / max(workers, 1)
+    if budget_seconds > 0 and projected > budget_seconds:
+        scale = (budget_seconds / projected) ** 0.5
+        dpis = [max(OCR_MIN_DPI, int(dpi * scale)) for dpi in dpis]
+        logger.debug(f"OCR projected {projected:.1f}s over budget; scaling DPI by {scale:.2f}")
+    return dpis
+
+def _ocr_page_seconds(page_size, dpi):
+    width, height = page_size
+    return (width / 72 * dpi) * (height / 72 * dpi) / OCR_PIXELS_PER_SECOND
+
+def extract_text_from_pdf(pdf_bytes, workers=None):
     """
     Extract text from a PDF file using PyMuPDF, with OCR fallback for image-based PDFs.
+    Pages without a text layer are rendered and OCR'd in parallel in a process pool;
+    pages still unfinished when PDF_TIME_BUDGET_SECONDS runs out are skipped.
     Args:
         pdf_bytes (bytes): Raw PDF file bytes.
+        workers (int): Pool size override; 0 runs everything in the calling thread.
     Returns:
         str: Extracted text, or empty string if extraction fails.
     """
-    try:
-        # Open PDF from bytes
-        pdf_document = fitz.open(stream=pdf_bytes, filetype="pdf")
-        text = ""
-        
-        # Iterate through pages
-        for page_num in range(pdf_document.page_count):
-            page = pdf_document[page_num]
-            page_text = page.get_text("text")
-            if page_text.strip():
-                text += page_text + "\n"
-                logger.debug(f"Page {page_num + 1}: Extracted {len(page_text)} characters")
-            else:
-                logger.debug(f"Page {page_num + 1}: No text found")
-                
-                # Try OCR if available and no text extracted
-                if OCR_AVAILABLE:
-                    try:
-                        # Convert page to image
-                        pix = page.get_pixmap(matrix=fitz.Matrix(300/72, 300/72))  # 300 DPI
-                        img = Image.open(BytesIO(pix.tobytes("png")))
-                        ocr_text = pytesseract.image_to_string(img)
-                        if ocr_text.strip():
-                            text += ocr_text + "\n"
-                            logger.debug(f"Page {page_num + 1}: OCR extracted {len(ocr_text)} characters")
-                        else:
-                            logger.debug(f"Page {page_num + 1}: OCR found no text")
-                    except Exception as ocr_e:
-                        logger.error(f"Page {page_num + 1}: OCR failed: {str(ocr_e)}")
-        
-        pdf_document.close()
-        
-        if not text.strip():
-            logger.error("No text extracted from PDF")
+    with span("pdf_extract"):
+        text = _extract_text_from_pdf(pdf_bytes, workers)
+    if not text:
+        inc("errors_total", stage="pdf_extract")
+    return text
+
+def _extract_text_from_pdf(pdf_bytes, workers):
+    workers = PDF_WORKERS if workers is None else workers
+    # One retry: a worker dying (OOM, a MuPDF crash) breaks the whole pool, not this PDF
+    for attempt in range(2):
+        pool = _get_pdf_pool() if workers > 0 else None
+        try:
+            return _extract_pages(pdf_bytes, workers, pool)
+        except BrokenProcessPool as e:
+            logger.error(f"PDF extraction pool failed (attempt {attempt + 1} of 2): {str(e)}")
+            inc("errors_total", stage="pdf_pool")
+            _discard_pdf_pool(pool)
+        except RuntimeError as e:
+            # PyMuPDF's document errors (FileDataError and friends) subclass RuntimeError;
+            # fitz.fitz.DocumentError no longer exists in current releases
+            logger.error(f"PDF document error: {str(e)}")
             return ""
-        
-        logger.debug(f"Total extracted text: {len(text)} characters")
-        return text.strip()
+        except Exception as e:
+            logger.error(f"PDF extraction failed: {str(e)}")
+            return ""
+    return ""
+
+def _extract_pages(pdf_bytes, workers, pool):
+    start = time.perf_counter()
+    if workers > 0:
+        pages = pool.submit(scan_pages, pdf_bytes).result(timeout=PDF_TIME_BUDGET_SECONDS or None)
+    else:
+        pages = scan_pages(pdf_bytes)
+    texts = [page_text for page_text, _, _ in pages]
     
-    except fitz.fitz.DocumentError as e:
-        logger.error(f"PDF document error: {str(e)}")
-        if "password" in str(e).lower():
-            return ""  # Specific handling for password-protected PDFs
-        return ""
-    except Exception as e:
-        logger.error(f"PDF extraction failed: {str(e)}")
+    ocr_page_nums = [i for i, page_text in enumerate(texts) if not page_text]
+    for page_num, page_text in enumerate(texts):
+        if page_text:
+            logger.debug(f"Page {page_num + 1}: Extracted {len(page_text)} characters")
+        else:
+            logger.debug(f"Page {page_num + 1}: No text found")
+    
+    # Try OCR if available and no text extracted
+    if ocr_page_nums and OCR_AVAILABLE:
+        remaining = PDF_TIME_BUDGET_SECONDS - (time.perf_counter() - start) if PDF_TIME_BUDGET_SECONDS else 0
+        dpis = _plan_ocr_dpi([pages[i][1:] for i in ocr_page_nums], workers, remaining)
+        planned = list(zip(ocr_page_nums, dpis))
+        # Workers skip the pages left when the deadline passes, so a timeout keeps the rest
+        deadline = time.time() + remaining if PDF_TIME_BUDGET_SECONDS else None
+        if workers > 0:
+            # One task per worker, pages dealt round-robin, so each worker receives and
+            # opens the PDF once rather than once per page
+            batches = [planned[i::workers] for i in range(min(workers, len(planned)))]
+            futures = [pool.submit(ocr_pages, pdf_bytes, batch, deadline) for batch in batches]
+            # A worker can be one page into overtime when the deadline passes
+            grace = max(_ocr_page_seconds(pages[page_num][1:], dpi) for page_num, dpi in planned)
+            done, pending = wait(futures, timeout=remaining + grace if PDF_TIME_BUDGET_SECONDS else None)
+            for future in pending:
+                future.cancel()
+            for future in done:
+                try:
+                    for page_num, page_text in future.result().items():
+                        texts[page_num] = page_text
+                except BrokenProcessPool:
+                    raise
+                except Exception as ocr_e:
+                    logger.error(f"OCR failed: {str(ocr_e)}")
+            if pending:
+                logger.warning(f"OCR time budget exhausted; {len(pending)} of {len(batches)} workers did not finish")
+        else:
+            for page_num, page_text in ocr_pages(pdf_bytes, planned, deadline).items():
+                texts[page_num] = page_text
+    
+    text = "".join(page_text + "\n" for page_text in texts if page_text.strip())
+    if not text.strip():
+        logger.error("No text extracted from PDF")
         return ""
+    
+    logger.debug(f"Total extracted text: {len(text)} characters in {time.perf_counter() - start:.2f}s")
+    return text.strip()
 
 def chunk_text(text, max_chunk_size=512):
     """
@@ -96,48 +442,58 @@ def chunk_text(text, max_chunk_size=512):
     logger.debug(f"Created {len(chunks)} chunks")
     return chunks
 
-def create_index(chunks):
+def embed_chunks(chunks):
     """
-    Create a FAISS index for text chunks.
+    Encode document chunks for the session vector store.
+    Returns:
+        np.ndarray: One float32 row per chunk, or None if there are no chunks or encoding fails.
     """
     if not chunks:
-        return None, []
+        return None
     
     try:
-        model = SentenceTransformer('all-MiniLM-L6-v2')
-        embeddings = model.encode(chunks, convert_to_numpy=True)
-        
-        dimension = embeddings.shape[1]
-        index = faiss.IndexFlatL2(dimension)
-        index.add(embeddings)
-        
-        logger.debug(f"Created FAISS index with {len(chunks)} chunks")
-        return index, chunks
+        with span("embed_chunks"):
+            embeddings = encode_texts(chunks)
+        logger.debug(f"Embedded {len(chunks)} chunks")
+        return embeddings
     except Exception as e:
-        logger.error(f"Failed to create index: {str(e)}")
-        return None, []
+        logger.error(f"Failed to embed chunks: {str(e)}")
+        return None
 
-def search_similar(query, index, chunks, model, top_k=3):
+def search_documents(queries, vectors, chunks, model, top_k=3, documents=DOCUMENTS):
     """
-    Search for similar text chunks.
+    Search a session's documents for every query with one encode and one pass over the
+    session vectors.
+    Args:
+        queries (list[str]): Query texts.
+        vectors (SessionVectors): The session's vectors; None finds nothing.
+        chunks (dict): Chunk texts per document name.
+        documents (tuple): Document names to search.
+    Returns:
+        dict: Document name -> one result list per query, each result
+        {"text", "distance"}, nearest first.
     """
-    if not index or not chunks:
-        return []
+    empty = {document: [[] for _ in queries] for document in documents}
+    if vectors is None or not queries:
+        return empty
     
     try:
-        query_embedding = model.encode([query], convert_to_numpy=True)
-        distances, indices = index.search(query_embedding, top_k)
-        
-        results = []
-        for idx, distance in zip(indices[0], distances[0]):
-            if idx < len(chunks):
-                results.append({"text": chunks[idx], "distance": float(distance)})
+        query_embeddings = encode_texts(list(queries), model)
+        with span("vector_search"):
+            found = vectors.search(query_embeddings, top_k, documents)
         
-        logger.debug(f"Search returned {len(results)} results")
+        results = {
+            document: [
+                [{"text": chunks[document][i], "distance": distance} for i, distance in rows]
+                for rows in found[document]
+            ]
+            for document in documents
+        }
+        logger.debug(f"Search returned results for {len(queries)} queries in {', '.join(documents)}")
         return results
     except Exception as e:
         logger.error(f"Search failed: {str(e)}")
-        return []
+        return empty
 
 def extract_keywords(text):
     """
@@ -156,4 +512,10 @@ def extract_keywords(text):
         return keywords[:20]  # Limit to top 20
     except Exception as e:
         logger.error(f"Keyword extraction failed: {str(e)}")
-        return []
\ No newline at end of file
+        return []
+
+def estimate_tokens(text):
+    """
+    Estimate the LLM token count of text (about 4 characters per token for English).
+    """
+    return (len(text) + 3) // 4 if text else 0
@@ -0,0 +1,112 @@
+# Per-session chunk vectors for retrieval: the resume and job description rows of a
+# session in one contiguous array with a document-tag column, searched with NumPy.
+import io
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Storage precision of session vectors: "float16" (default) or "int8" (one float32
+# scale per row). Distances are computed in float32 either way
+VECTOR_STORE_DTYPE = os.getenv("VECTOR_STORE_DTYPE", "float16").lower()
+
+# Documents a session can search, in storage order; a row's tag is its position here
+DOCUMENTS = ("resume", "job_description")
+
+class SessionVectors:
+    """
+    Chunk embeddings for one session, stored compactly and searched in one pass.
+
+    Rows are grouped by document in DOCUMENTS order, so row i of a document is chunk i
+    of that document. Distances are squared L2 like faiss.IndexFlatL2, measured to the
+    stored (rounded) vectors: one matmul scores every query against every row of every
+    document, and each document's top-k is taken from its slice.
+    """
+
+    def __init__(self, vectors: np.ndarray, scales: Optional[np.ndarray], tags: np.ndarray):
+        self.vectors = vectors
+        self.scales = scales
+        self.tags = tags
+        rows = self._dequantize()
+        self.norms = np.einsum("ij,ij->i", rows, rows)
+        self.ranges = {
+            document: (int(np.searchsorted(tags, code, "left")), int(np.searchsorted(tags, code, "right")))
+            for code, document in enumerate(DOCUMENTS)
+        }
+
+    @classmethod
+    def from_embeddings(cls, documents: Dict[str, Optional[np.ndarray]], dtype: Optional[str] = None) -> Optional["SessionVectors"]:
+        """
+        Build from float embeddings per document name (missing or empty documents are
+        allowed). Returns None when no document has any rows.
+        """
+        dtype = (dtype or VECTOR_STORE_DTYPE).lower()
+        parts = [
+            (code, np.asarray(documents[document], dtype=np.float32))
+            for code, document in enumerate(DOCUMENTS)
+            if documents.get(document) is not None and len(documents[document])
+        ]
+        if not parts:
+            return None
+        matrix = np.concatenate([rows for _, rows in parts])
+        tags = np.concatenate([np.full(len(rows), code, dtype=np.uint8) for code, rows in parts])
+        if dtype == "float16":
+            return cls(matrix.astype(np.float16), None, tags)
+        if dtype == "int8":
+            scales = np.abs(matrix).max(axis=1) / 127
+            scales[scales == 0] = 1.0
+            vectors = np.rint(matrix / scales[:, None]).astype(np.int8)
+            return cls(vectors, scales.astype(np.float32), tags)
+        raise ValueError(f"Unknown vector store dtype: {dtype}")
+
+    def _dequantize(self) -> np.ndarray:
+        rows = self.vectors.astype(np.float32)
+        if self.scales is not None:
+            rows *= self.scales[:, None]
+        return rows
+
+    def count(self, document: str) -> int:
+        start, stop = self.ranges[document]
+        return stop - start
+
+    @property
+    def nbytes(self) -> int:
+        scales = self.scales.nbytes if self.scales is not None else 0
+        return self.vectors.nbytes + scales + self.norms.nbytes + self.tags.nbytes
+
+    def search(self, query_embeddings: np.ndarray, top_k: int = 3, documents=DOCUMENTS) -> Dict[str, List[List[Tuple[int, float]]]]:
+        """
+        Find the top_k nearest chunks of each document for every query row.
+        Returns:
+            dict: document name -> one list per query of (chunk index, distance), nearest first.
+        """
+        queries = np.asarray(query_embeddings, dtype=np.float32).reshape(-1, self.vectors.shape[1])
+        dots = self.vectors @ queries.T
+        if self.scales is not None:
+            dots *= self.scales[:, None]
+        distances = self.norms[:, None] - 2 * dots + np.einsum("ij,ij->i", queries, queries)[None, :]
+        np.maximum(distances, 0, out=distances)
+
+        results = {}
+        for document in documents:
+            start, stop = self.ranges[document]
+            block = distances[start:stop]
+            order = np.argsort(block, axis=0, kind="stable")[:top_k]
+            results[document] = [
+                [(int(i), float(block[i, q])) for i in order[:, q]]
+                for q in range(len(queries))
+            ]
+        return results
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        arrays = {"vectors": self.vectors, "tags": self.tags}
+        if self.scales is not None:
+            arrays["scales"] = self.scales
+        np.savez(buffer, **arrays)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "SessionVectors":
+        with np.load(io.BytesIO(data)) as arrays:
+            return cls(arrays["vectors"], arrays["scales"] if "scales" in arrays else None, arrays["tags"])